@@ -1,7 +1,20 @@
 import os
+import time
+import logging
+import resource
 import subprocess
 import argparse
 
+# Set by --profile: subprocess stages then run under cProfile, writing <PROFILE_DIR>/<stage>.prof
+PROFILE_DIR = None
+
+
+def python_command(stage):
+    if PROFILE_DIR is None:
+        return "python"
+    return f'python -m cProfile -o "{os.path.join(PROFILE_DIR, stage + ".prof")}"'
+
+
 def run_tokenizer(project_dir, input_path, tokenizer_output, lang):
     print("\n[1/6] Running tokenizer...")
     # try several known tokenizer locations / filenames (case-insensitive)
@@ -21,7 +34,7 @@ def run_tokenizer(project_dir, input_path, tokenizer_output, lang):
             "\nPlease ensure the tokenizer script exists or update all.py to point to the correct file."
         )
 
-    cmd = f'python "{tokenizer_script}" --input "{input_path}" --output "{tokenizer_output}" --lang {lang}'
+    cmd = f'{python_command("tokenized")} "{tokenizer_script}" --input "{input_path}" --output "{tokenizer_output}" --lang {lang}'
     print(f"→ {cmd}")
     subprocess.run(cmd, shell=True, check=True)
     print("✅ Tokenizer completed.\n")
@@ -32,13 +45,13 @@ def run_create_conll(project_dir, tokenizer_output, conll_output):
     create_conll_script = os.path.join(project_dir, "pos_tag", "create_conll.py")
     if not os.path.exists(create_conll_script):
         raise FileNotFoundError(f"❌ CoNLL script not found at: {create_conll_script}")
-    cmd = f'python "{create_conll_script}" "{tokenizer_output}" "{conll_output}"'
+    cmd = f'{python_command("conll")} "{create_conll_script}" "{tokenizer_output}" "{conll_output}"'
     print(f"→ {cmd}")
     subprocess.run(cmd, shell=True, check=True)
     print("✅ CoNLL file created.\n")
 
 
-def run_pos_tag(project_dir, conll_input, pos_output, model_path):
+def run_pos_tag(project_dir, conll_input, pos_output, model_path, tagger_args=""):
     print("[3/6] Running POS Tagger...")
     pos_tag_dir = os.path.join(project_dir, "pos_tag")
     run_pos_script = os.path.join(pos_tag_dir, "run_pos_new.py")
@@ -46,13 +59,13 @@ def run_pos_tag(project_dir, conll_input, pos_output, model_path):
         raise FileNotFoundError(f"❌ POS script not found at: {run_pos_script}")
 
     # Run from inside pos_tag folder so encoding_dict.pickle is found
-    cmd = f'python "{run_pos_script}" --input "{conll_input}" --output "{pos_output}" --model "{model_path}"'
+    cmd = f'{python_command("pos")} "{run_pos_script}" --input "{conll_input}" --output "{pos_output}" --model "{model_path}"{tagger_args}'
     print(f"→ {cmd}")
     subprocess.run(cmd, shell=True, check=True, cwd=pos_tag_dir)
     print("✅ POS tagging completed.\n")
 
 
-def run_chunk_tag(project_dir, pos_input, chunk_output, model_path):
+def run_chunk_tag(project_dir, pos_input, chunk_output, model_path, tagger_args=""):
     print("[4/6] Running Chunk Tagger...")
     chunk_tag_dir = os.path.join(project_dir, "chunk_tag")
     chunk_script = os.path.join(chunk_tag_dir, "generate_features.py")
@@ -60,7 +73,7 @@ def run_chunk_tag(project_dir, pos_input, chunk_output, model_path):
         raise FileNotFoundError(f"❌ Chunk script not found at: {chunk_script}")
 
     # Run from inside chunk_tag folder so chunk_encoding_dict.pickle is found
-    cmd = f'python "{chunk_script}" --input "{pos_input}" --output "{chunk_output}" --model "{model_path}"'
+    cmd = f'{python_command("chunk")} "{chunk_script}" --input "{pos_input}" --output "{chunk_output}" --model "{model_path}"{tagger_args}'
     print(f"→ {cmd}")
     subprocess.run(cmd, shell=True, check=True, cwd=chunk_tag_dir)
     print("✅ Chunk tagging completed.\n")
@@ -74,7 +87,7 @@ def run_ssf_conversion(project_dir, chunk_input, ssf_output):
         raise FileNotFoundError(f"❌ SSF conversion script not found at: {ssf_script}")
 
     # opr=1 for chunking
-    cmd = f'python "{ssf_script}" --input "{chunk_input}" --output "{ssf_output}" --opr 1'
+    cmd = f'{python_command("ssf")} "{ssf_script}" --input "{chunk_input}" --output "{ssf_output}" --opr 1'
     print(f"→ {cmd}")
     subprocess.run(cmd, shell=True, check=True)
     print("✅ SSF conversion completed.\n")
@@ -92,12 +105,77 @@ def run_check_pos(project_dir, ssf_input, final_output):
         raise FileNotFoundError(f"❌ Category map not found at: {category_map}")
 
     # Run from project_dir so paradigms folder can be found
-    cmd = f'python "{check_pos_script}" "{category_map}" "{ssf_input}" "{final_output}"'
+    cmd = f'{python_command("check")} "{check_pos_script}" "{category_map}" "{ssf_input}" "{final_output}"'
     print(f"→ {cmd}")
     subprocess.run(cmd, shell=True, check=True, cwd=project_dir)
     print("✅ Check POS completed.\n")
 
 
+def run_cached(cache, stage, force, input_path, output_path, run, model_path=None, params=None):
+    """Run one file-to-file stage, or copy its output from the stage cache if its key is cached."""
+    if cache is None:
+        run()
+        return
+    from stage_cache import model_fingerprint
+
+    with open(input_path, "r", encoding="utf-8", newline="") as f:
+        key = cache.key(stage, f.read(), model_fingerprint(model_path) if model_path else None, params)
+    cached = cache.get(key) if stage not in force else None
+    if cached is not None:
+        print(f"   {stage}: from stage cache → {output_path}\n")
+        with open(output_path, "w", encoding="utf-8", newline="") as out:
+            out.write(cached)
+        return
+    run()
+    with open(output_path, "r", encoding="utf-8", newline="") as f:
+        cache.put(key, f.read())
+
+
+def run_measured(metrics, stage, run):
+    """Run a subprocess stage, adding its wall time, the child's CPU time and peak RSS to metrics."""
+    if metrics is None:
+        run()
+        return
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    run()
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss of RUSAGE_CHILDREN is the largest child so far, not only this one
+    metrics.add(stage, wall, after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime,
+                after.ru_maxrss / 1024)
+
+
+def run_in_process(project_dir, args, cache, force, metrics):
+    print(f"\n[1/6 - 6/6] Running all stages in-process{' (streaming)' if args.stream else ''}...")
+    from pipeline import Pipeline, use_project_dir
+    use_project_dir()
+
+    tag_cache = None
+    if not args.no_tag_cache:
+        from tag_cache import SentenceTagCache
+        tag_cache = SentenceTagCache(args.tag_cache)
+    # Models are loaded only if a stage that needs them is not cached
+    pipeline = Pipeline(os.path.join(project_dir, args.pos_model), os.path.join(project_dir, args.chunk_model),
+                        args.lang, preload=False, tag_cache=tag_cache, metrics=metrics)
+    try:
+        with open(os.path.join(project_dir, args.input), "r", encoding="utf-8") as f, \
+                open(os.path.join(project_dir, args.output), "w", encoding="utf-8") as out:
+            if args.stream:
+                pipeline.stream(f, out, batch_sentences=args.stream_batch, queue_size=args.queue_size)
+            else:
+                pipeline.run(f.read(), out, intermediate_dir=project_dir if args.keep_intermediate else None,
+                             cache=cache, force=force)
+    finally:
+        pipeline.close()
+        if tag_cache is not None:
+            tag_cache.close()
+    for view in pipeline.tag_caches:
+        print(view.summary())
+    print(pipeline.checker.summary())
+    print("✅ All stages completed.\n")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Unified pipeline: Tokenizer + CoNLL + POS Tagger + Chunk Tagger + SSF Conversion + Check POS")
     parser.add_argument("--input", default="Input.txt", help="Path to input text file")
@@ -105,7 +183,38 @@ def main():
     parser.add_argument("--pos-model", default=os.path.join("pos_tag", "xlm-base-2"), help="POS Model folder path")
     parser.add_argument("--chunk-model", default=os.path.join("chunk_tag", "checkpoint-18381"), help="Chunk Model folder path")
     parser.add_argument("--lang", required=True, help="Language code (e.g., 0/1/2)")
+    parser.add_argument("--keep-intermediate", action="store_true",
+                        help="Also write every stage's output (tokenized, CoNLL, POS, chunk, SSF files)")
+    parser.add_argument("--subprocess", action="store_true",
+                        help="Run each stage as a separate python process, as before (always writes intermediate files)")
+    parser.add_argument("--stage-cache", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".stage_cache"),
+                        help="Directory of cached stage outputs (tokenized ... SSF), keyed by input, code and model")
+    parser.add_argument("--stage-cache-size", type=float, default=200,
+                        help="Stage cache size limit in MB (least recently used outputs are evicted)")
+    parser.add_argument("--no-stage-cache", action="store_true", help="Run every stage without the stage cache")
+    parser.add_argument("--force-stage", action="append", default=[],
+                        choices=["tokenized", "conll", "pos", "chunk", "ssf", "all"],
+                        help="Rerun this stage even if its output is cached (repeatable; 'all' for every stage)")
+    parser.add_argument("--tag-cache", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "tag_cache.sqlite"),
+                        help="SQLite cache of the POS and chunk labels of each sentence, keyed by model")
+    parser.add_argument("--no-tag-cache", action="store_true", help="Run the models on every sentence")
+    parser.add_argument("--metrics", default=None, metavar="PATH",
+                        help="Write per-stage wall/CPU time, throughput, peak RSS and model load time as JSON")
+    parser.add_argument("--profile", default=None, metavar="DIR",
+                        help="Run each stage under cProfile, writing DIR/<stage>.prof")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Level of the taggers' log messages (DEBUG logs every sentence)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Run the stages concurrently on sentence batches (bounded memory; no stage cache)")
+    parser.add_argument("--stream-batch", type=int, default=64, help="Sentences per batch with --stream")
+    parser.add_argument("--queue-size", type=int, default=4,
+                        help="Batches a --stream stage may get ahead of the next one")
     args = parser.parse_args()
+    if args.stream and (args.subprocess or args.keep_intermediate or args.profile):
+        parser.error("--stream cannot be combined with --subprocess, --keep-intermediate or --profile")
+    if args.stream_batch < 1 or args.queue_size < 1:
+        parser.error("--stream-batch and --queue-size must be at least 1")
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s")
 
     project_dir = os.path.dirname(os.path.abspath(__file__))
     print(f"📂 Project directory: {project_dir}")
@@ -121,23 +230,71 @@ def main():
     chunk_output = os.path.join(project_dir, "chunk_output.txt")
     ssf_output = os.path.join(project_dir, "ssf_output.txt")
 
-    # Run the complete pipeline
-    run_tokenizer(project_dir, os.path.join(project_dir, args.input), tokenizer_output, args.lang)
-    run_create_conll(project_dir, tokenizer_output, conll_output)
-    run_pos_tag(project_dir, conll_output, pos_output, os.path.join(project_dir, args.pos_model))
-    run_chunk_tag(project_dir, pos_output, chunk_output, os.path.join(project_dir, args.chunk_model))
-    run_ssf_conversion(project_dir, chunk_output, ssf_output)
-    run_check_pos(project_dir, ssf_output, os.path.join(project_dir, args.output))
+    cache = None
+    if not (args.no_stage_cache or args.stream):
+        from stage_cache import StageCache
+        cache = StageCache(args.stage_cache, max_bytes=int(args.stage_cache_size * 1024 * 1024))
+    force = {"tokenized", "conll", "pos", "chunk", "ssf"} if "all" in args.force_stage else set(args.force_stage)
+
+    metrics = None
+    if args.metrics or args.profile:
+        from instrumentation import PipelineMetrics
+        metrics = PipelineMetrics(os.path.abspath(args.profile) if args.profile and not args.subprocess else None)
+        if args.profile and args.subprocess:
+            global PROFILE_DIR
+            PROFILE_DIR = os.path.abspath(args.profile)
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    if args.subprocess:
+        # Run the complete pipeline
+        input_path = os.path.join(project_dir, args.input)
+        pos_model = os.path.join(project_dir, args.pos_model)
+        chunk_model = os.path.join(project_dir, args.chunk_model)
+        tagger_args = " --no-tag-cache" if args.no_tag_cache else f' --tag-cache "{os.path.abspath(args.tag_cache)}"'
+        tagger_args += f" --log-level {args.log_level}"
+        stages = [
+            ("tokenized", input_path, tokenizer_output,
+             lambda: run_tokenizer(project_dir, input_path, tokenizer_output, args.lang), None, args.lang),
+            ("conll", tokenizer_output, conll_output,
+             lambda: run_create_conll(project_dir, tokenizer_output, conll_output), None, None),
+            ("pos", conll_output, pos_output,
+             lambda: run_pos_tag(project_dir, conll_output, pos_output, pos_model, tagger_args), pos_model, None),
+            ("chunk", pos_output, chunk_output,
+             lambda: run_chunk_tag(project_dir, pos_output, chunk_output, chunk_model, tagger_args), chunk_model, None),
+            ("ssf", chunk_output, ssf_output,
+             lambda: run_ssf_conversion(project_dir, chunk_output, ssf_output), None, None),
+        ]
+        for stage, stage_input, stage_output, run, model_path, params in stages:
+            run_measured(metrics, stage, lambda: run_cached(cache, stage, force, stage_input, stage_output, run,
+                                                            model_path=model_path, params=params))
+            if stage == "conll" and metrics is not None:
+                from instrumentation import corpus_volume
+                with open(conll_output, "r", encoding="utf-8") as f:
+                    metrics.set_volume(*corpus_volume(f))
+        run_measured(metrics, "check",
+                     lambda: run_check_pos(project_dir, ssf_output, os.path.join(project_dir, args.output)))
+    else:
+        run_in_process(project_dir, args, cache, force, metrics)
+    if cache is not None:
+        print(cache.summary())
+    if metrics is not None:
+        print("\n".join(metrics.table()))
+        if args.metrics:
+            metrics.write(args.metrics)
+            print(f"📊 Metrics: {os.path.abspath(args.metrics)}")
+        if args.profile:
+            print(f"⏱️ Profiles: {os.path.abspath(args.profile)}/<stage>.prof")
 
     print(f"\n🎉 Complete pipeline finished successfully!")
-    print(f"📄 Intermediate files:")
-    print(f"   - Tokenized: {tokenizer_output}")
-    print(f"   - CoNLL: {conll_output}")
-    print(f"   - POS Tagged: {pos_output}")
-    print(f"   - Chunk Tagged: {chunk_output}")
-    print(f"   - SSF Format: {ssf_output}")
+    if args.subprocess or args.keep_intermediate:
+        print(f"📄 Intermediate files:")
+        print(f"   - Tokenized: {tokenizer_output}")
+        print(f"   - CoNLL: {conll_output}")
+        print(f"   - POS Tagged: {pos_output}")
+        print(f"   - Chunk Tagged: {chunk_output}")
+        print(f"   - SSF Format: {ssf_output}")
     print(f"📝 Final output: {os.path.join(project_dir, args.output)}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
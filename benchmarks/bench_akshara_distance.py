@@ -0,0 +1,110 @@
+"""Benchmark: WX-letter vs akshara edit distance, latency and suggestion quality.
+
+Queries are paradigm forms with either WX letter noise (random insert /
+delete / substitute) or akshara noise (a vowel sign swapped, an akshara
+dropped or doubled). Quality is the share of queries whose source form is
+the top suggestion (recall@1) or among the top three (recall@3).
+
+Run from the project directory:
+    python benchmarks/bench_akshara_distance.py --queries 100
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "check_pos"))
+
+from akshara import AKSHARA, segment  # noqa: E402
+from bench_fuzzy_search import perturb  # noqa: E402
+from fuzzy_search import get_fuzzy_index  # noqa: E402
+from levenshtein import edit_distance  # noqa: E402
+from lexicon_store import get_lexicon  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS  # noqa: E402
+from transliterate import VOWEL_SIGNS  # noqa: E402
+
+SIGNS = sorted(set(VOWEL_SIGNS.values()) | {"a"})
+
+# (label, engine, units, vowel_sign_cost)
+MODES = [
+    ("wx", "symspell", "wx", None),
+    ("akshara", "symspell", "akshara", None),
+    ("akshara+vowel0.5", "bktree", "akshara", 0.5),
+]
+
+
+def akshara_noise(word, rng):
+    """One akshara-level typo: swap a vowel sign, drop an akshara or double one."""
+    parts = segment(word)
+    i = rng.randrange(len(parts))
+    op = rng.choice("sdi") if len(parts) > 1 else "s"
+    if op == "s":
+        match = AKSHARA.fullmatch(parts[i])
+        if match and match.group(1):
+            vowels = [v for v in SIGNS if v != match.group(2)]
+            parts[i] = match.group(1) + rng.choice(vowels)
+        else:
+            op = "i"
+    if op == "d":
+        del parts[i]
+    elif op == "i":
+        parts.insert(i, parts[i])
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WX vs akshara edit distance benchmark")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per category and noise kind")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--categories", nargs="+", default=sorted(PARADIGM_FOLDERS), choices=sorted(PARADIGM_FOLDERS))
+    args = parser.parse_args()
+
+    lexicon = get_lexicon()
+    rng = random.Random(args.seed)
+
+    print(f"{'cat':<4}{'noise':<9}{'mode':<18}{'len':>6}{'us/pair':>9}{'ms/query':>10}{'build s':>9}{'R@1':>7}{'R@3':>7}")
+    for category in args.categories:
+        paradigm_dir = PARADIGM_FOLDERS[category]
+        forms = sorted({e.token for e in lexicon.entries(paradigm_dir)})
+        sources = [rng.choice(forms) for _ in range(args.queries)]
+        noise = {
+            "wx": [perturb(w, rng, rng.randint(1, 2)) for w in sources],
+            "akshara": [akshara_noise(w, rng) for w in sources],
+        }
+        sample = rng.sample(forms, min(200, len(forms)))
+
+        for label, engine, units, cost in MODES:
+            start = time.perf_counter()
+            index = get_fuzzy_index(lexicon, paradigm_dir, engine, units=units, vowel_sign_cost=cost)
+            build_time = time.perf_counter() - start
+            if units == "akshara":
+                codec = index.codec
+                encode = codec.encode
+                distance = codec.weighted_distance(cost) if cost is not None else edit_distance
+            else:
+                encode = str
+                distance = edit_distance
+            pairs = [(encode(a), encode(b)) for a in sample[:40] for b in sample]
+            start = time.perf_counter()
+            for a, b in pairs:
+                distance(a, b)
+            pair_time = (time.perf_counter() - start) / len(pairs)
+            mean_len = sum(len(encode(f)) for f in sample) / len(sample)
+
+            for kind, queries in noise.items():
+                top1 = top3 = 0
+                start = time.perf_counter()
+                for source, query in zip(sources, queries):
+                    words = [w for _, w, _ in index.closest(query, top_n=3)]
+                    top1 += bool(words) and words[0] == source
+                    top3 += source in words
+                query_time = (time.perf_counter() - start) / len(queries)
+                print(f"{category:<4}{kind:<9}{label:<18}{mean_len:>6.1f}{pair_time * 1e6:>9.2f}"
+                      f"{query_time * 1000:>10.2f}{build_time:>9.2f}"
+                      f"{top1 / len(queries):>7.2f}{top3 / len(queries):>7.2f}")
+                build_time = 0.0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark: one query against a block of forms, per-pair loop vs NumPy batch.
+
+Run from the project directory:
+    python benchmarks/bench_batched_distance.py --sizes 1000 10000 50000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "check_pos"))
+
+from batched_distance import PackedForms  # noqa: E402
+from bench_fuzzy_search import perturb  # noqa: E402
+from levenshtein import edit_distance  # noqa: E402
+from lexicon_store import get_lexicon  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched edit distance benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tokens = [e.token for d in PARADIGM_FOLDERS.values() for e in get_lexicon().entries(d)]
+    print(f"{'forms':>7}{'loop ms/q':>12}{'numpy ms/q':>12}{'pack s':>9}{'speedup':>9}  same")
+    for size in args.sizes:
+        # Sample with replacement so sizes beyond the lexicon are still meaningful
+        forms = [rng.choice(tokens) for _ in range(size)]
+        queries = [perturb(rng.choice(tokens), rng, rng.randint(1, 3)) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        packed = PackedForms(forms)
+        pack_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [[edit_distance(q, f) for f in forms] for q in queries]
+        loop_time = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        got = [packed.distances(q).tolist() for q in queries]
+        numpy_time = (time.perf_counter() - start) / len(queries)
+
+        print(f"{size:>7}{loop_time * 1000:>12.2f}{numpy_time * 1000:>12.2f}{pack_time:>9.2f}"
+              f"{loop_time / numpy_time:>9.1f}  {'yes' if got == expected else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
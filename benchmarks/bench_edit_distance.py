@@ -0,0 +1,73 @@
+"""Micro-benchmark: per-pair cost of the edit-distance kernel.
+
+Compares the old recursive memoized EDIT-DISTANCE with the iterative
+kernel in check_pos/levenshtein.py (unbounded and banded).
+
+Run from the project directory:
+    python benchmarks/bench_edit_distance.py --pairs 2000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "check_pos"))
+
+from bench_fuzzy_search import perturb  # noqa: E402
+from levenshtein import edit_distance  # noqa: E402
+from lexicon_store import get_lexicon  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS  # noqa: E402
+
+
+def recursive_edit_distance(s, t, memo=None):
+    """The recursive memoized implementation check_pos used before (reference only)."""
+    if memo is None:
+        memo = {}
+    key = (s, t)
+    if key in memo:
+        return memo[key]
+    if len(s) == 0:
+        return len(t)
+    if len(t) == 0:
+        return len(s)
+    ka = recursive_edit_distance(s[:-1], t[:-1], memo)
+    kb = recursive_edit_distance(s[:-1], t, memo) + 1
+    kc = recursive_edit_distance(s, t[:-1], memo) + 1
+    kd = ka if s[-1] == t[-1] else ka + 1
+    c = min(kb, kc, kd)
+    memo[key] = c
+    return c
+
+
+def time_pairs(fn, pairs):
+    start = time.perf_counter()
+    out = [fn(a, b) for a, b in pairs]
+    return out, (time.perf_counter() - start) / len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Edit-distance kernel micro-benchmark")
+    parser.add_argument("--pairs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tokens = [e.token for d in PARADIGM_FOLDERS.values() for e in get_lexicon().entries(d)]
+    # Realistic pairs: a misspelled form against an arbitrary lexicon form
+    pairs = [(perturb(rng.choice(tokens), rng, rng.randint(1, 3)), rng.choice(tokens)) for _ in range(args.pairs)]
+
+    expected, base = time_pairs(recursive_edit_distance, pairs)
+    print(f"{'kernel':<24}{'us/pair':>10}{'speedup':>9}  same")
+    print(f"{'recursive (old)':<24}{base * 1e6:>10.1f}{1:>9.1f}  -")
+
+    got, t = time_pairs(edit_distance, pairs)
+    print(f"{'iterative':<24}{t * 1e6:>10.1f}{base / t:>9.1f}  {'yes' if got == expected else 'NO'}")
+    for k in (1, 2, 3, 5):
+        got, t = time_pairs(lambda a, b: edit_distance(a, b, k), pairs)
+        same = all(g == min(e, k + 1) for g, e in zip(got, expected))
+        print(f"{'banded max_distance=' + str(k):<24}{t * 1e6:>10.1f}{base / t:>9.1f}  {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark the closest-word search engines against the brute-force scan.
+
+Run from the project directory:
+    python benchmarks/bench_fuzzy_search.py --queries 20 --engines bktree
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "check_pos"))
+
+from fuzzy_search import FUZZY_ENGINES  # noqa: E402
+from levenshtein import edit_distance  # noqa: E402
+from lexicon_store import get_lexicon  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS  # noqa: E402
+
+WX_LETTERS = "aAiIuUeEoOkKgGcCjJtTdDNwWxXnpPbBmyrlvSRsh"
+
+
+def perturb(word, rng, edits):
+    """Apply `edits` random single-character insert/delete/substitute operations."""
+    for _ in range(edits):
+        op = rng.choice("ids") if len(word) > 1 else "i"
+        i = rng.randrange(len(word) + (op == "i"))
+        if op == "i":
+            word = word[:i] + rng.choice(WX_LETTERS) + word[i:]
+        elif op == "d":
+            word = word[:i] + word[i + 1:]
+        else:
+            word = word[:i] + rng.choice(WX_LETTERS) + word[i + 1:]
+    return word
+
+
+def make_queries(entries, n, rng):
+    """Misspelled paradigm forms (1-3 edits), reproducible for a given seed."""
+    return [perturb(rng.choice(entries).token, rng, rng.randint(1, 3)) for _ in range(n)]
+
+
+def time_engine(index, queries, top_n, max_distance):
+    results = []
+    start = time.perf_counter()
+    for q in queries:
+        results.append(index.closest(q, top_n=top_n, max_distance=max_distance))
+    return results, (time.perf_counter() - start) / max(len(queries), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy search engine benchmark on the shipped paradigms")
+    parser.add_argument("--queries", type=int, default=20, help="Queries per category")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--max-distance", type=int, default=None)
+    parser.add_argument("--categories", nargs="+", default=sorted(PARADIGM_FOLDERS), choices=sorted(PARADIGM_FOLDERS))
+    parser.add_argument("--engines", nargs="+", default=[e for e in FUZZY_ENGINES if e != "brute"],
+                        choices=sorted(FUZZY_ENGINES))
+    args = parser.parse_args()
+
+    lexicon = get_lexicon()
+    rng = random.Random(args.seed)
+    print(f"{'category':<9}{'engine':<10}{'forms':>8}{'build s':>10}{'ms/query':>11}{'speedup':>9}  same")
+    for category in args.categories:
+        paradigm_dir = PARADIGM_FOLDERS[category]
+        entries = lexicon.entries(paradigm_dir)
+        queries = make_queries(entries, args.queries, rng)
+
+        brute = FUZZY_ENGINES["brute"](entries, edit_distance)
+        expected, brute_time = time_engine(brute, queries, args.top_n, args.max_distance)
+        print(f"{category:<9}{'brute':<10}{len(entries):>8}{0:>10.2f}{brute_time * 1000:>11.2f}{1:>9.1f}  -")
+
+        for engine in args.engines:
+            start = time.perf_counter()
+            # Built the way check_pos builds it (e.g. SymSpell reads its deletes from the artifact)
+            index = FUZZY_ENGINES[engine].from_lexicon(lexicon, paradigm_dir, edit_distance)
+            build_time = time.perf_counter() - start
+            got, engine_time = time_engine(index, queries, args.top_n, args.max_distance)
+            speedup = brute_time / engine_time if engine_time else float("inf")
+            print(f"{category:<9}{engine:<10}{len(entries):>8}{build_time:>10.2f}{engine_time * 1000:>11.2f}"
+                  f"{speedup:>9.1f}  {'yes' if got == expected else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Check and time hot reloading of edited paradigm files.
+
+Copies the paradigm folders to a temporary directory, serves lookups and
+closest-word queries from a WatchedLexicon in a loop, appends a new form
+to one verb file and waits until it is served. Reports the reload time
+and the request latency while the reload ran.
+
+Run from the project directory:
+    python benchmarks/bench_hot_reload.py
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "check_pos"))
+
+from fuzzy_search import get_fuzzy_index  # noqa: E402
+from lexicon_watch import WatchedLexicon  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS  # noqa: E402
+
+NEW_LINE = "kaliwYYYnu kali(V6)+wa_#_PAST+anu_a_3SM\n"
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot reload check and benchmark")
+    parser.add_argument("--poll", type=float, default=0.2, help="Polling interval in seconds")
+    parser.add_argument("--engine", default="symspell")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="paradigms_")
+    try:
+        folders = {}
+        for category, paradigm_dir in PARADIGM_FOLDERS.items():
+            folders[category] = os.path.join(tmp, os.path.basename(paradigm_dir))
+            shutil.copytree(paradigm_dir, folders[category])
+        verb_dir = folders["v"]
+        target = os.path.join(verb_dir, "kaliV6_word_split.txt")
+
+        lexicon = WatchedLexicon(folders, poll_interval=args.poll)
+        get_fuzzy_index(lexicon, verb_dir, args.engine)
+        lexicon.start()
+
+        latencies = []
+        served = threading.Event()
+        stop = threading.Event()
+
+        def serve():
+            while not stop.is_set():
+                start = time.perf_counter()
+                found = lexicon.lookup("kaliwYYYnu", verb_dir)
+                get_fuzzy_index(lexicon, verb_dir, args.engine).closest("kaliwanna")
+                latencies.append(time.perf_counter() - start)
+                if found:
+                    served.set()
+
+        worker = threading.Thread(target=serve)
+        worker.start()
+        time.sleep(1.0)
+        before = len(latencies)
+        time.sleep(0.01)    # make sure the new mtime differs
+        with open(target, "a", encoding="utf-8") as f:
+            f.write(NEW_LINE)
+        edited = time.perf_counter()
+        ok = served.wait(timeout=30)
+        visible = time.perf_counter() - edited
+        stop.set()
+        worker.join()
+        lexicon.stop()
+
+        steady = latencies[:before]
+        during = latencies[before:]
+        print(f"new form served: {'yes' if ok else 'NO'} after {visible:.2f}s (poll interval {args.poll}s)")
+        print(f"request latency before edit: p50 {percentile(steady, 50) * 1000:.2f} ms, "
+              f"max {max(steady) * 1000:.2f} ms ({len(steady)} requests)")
+        if during:
+            print(f"request latency during reload: p50 {percentile(during, 50) * 1000:.2f} ms, "
+                  f"max {max(during) * 1000:.2f} ms ({len(during)} requests)")
+        sys.exit(0 if ok else 1)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
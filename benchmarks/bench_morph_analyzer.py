@@ -0,0 +1,94 @@
+"""Benchmark and check: suffix-trie analyzer vs the expanded paradigm lexicon.
+
+For each category the analyzer must regenerate exactly the expanded entries
+and give the same lookup result for every form (and for near-miss
+non-forms); memory and lookup time are then compared. A root added from
+an --extra-roots file must then be recognized and suggested by the
+stem-suffix engine (bIrannnu -> bIrannu), and the lexicon's plain
+analyzer must not see it.
+
+Run from the project directory:
+    python benchmarks/bench_morph_analyzer.py
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "check_pos"))
+
+from bench_fuzzy_search import perturb  # noqa: E402
+from fuzzy_search import StemSuffixIndex, get_fuzzy_index  # noqa: E402
+from morph_analyzer import SuffixTrieAnalyzer, roots_file_key  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS, ParadigmLexicon  # noqa: E402
+
+
+def traced(build):
+    """Return (result, bytes allocated by build()) measured with tracemalloc."""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def check_extra_roots():
+    """True if a root added like Uru is recognized and suggested, and only with the roots file."""
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", encoding="utf-8", delete=False) as f:
+        f.write("n bIru Uru\n")
+    try:
+        lexicon = ParadigmLexicon(PARADIGM_FOLDERS)
+        paradigm_dir = PARADIGM_FOLDERS["n"]
+        key = roots_file_key(f.name)
+        analyzer = SuffixTrieAnalyzer.from_lexicon(lexicon, paradigm_dir, f.name, key)
+        index = get_fuzzy_index(lexicon, paradigm_dir, StemSuffixIndex.name, extra_roots=f.name, roots_key=key)
+        closest = index.closest("bIrannnu", top_n=1)
+    finally:
+        os.unlink(f.name)
+    return (bool(analyzer.lookup("bIrannu"))
+            and not SuffixTrieAnalyzer.from_lexicon(lexicon, paradigm_dir).lookup("bIrannu")
+            and [(form, d) for _, form, d in closest] == [("bIrannu", 1)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suffix-trie analyzer benchmark")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'cat':<4}{'entries':>8}{'classes':>8}{'lexicon MB':>12}{'analyzer MB':>13}"
+          f"{'dict us':>9}{'trie us':>9}  same")
+    failed = False
+    for category, paradigm_dir in PARADIGM_FOLDERS.items():
+        lexicon, lexicon_size = traced(lambda: ParadigmLexicon({category: paradigm_dir}).load_all())
+        entries = lexicon.entries(paradigm_dir)
+        analyzer, analyzer_size = traced(lambda: SuffixTrieAnalyzer.from_entries(entries))
+
+        forms = list(dict.fromkeys(e.token for e in entries))
+        queries = forms + [perturb(rng.choice(forms), rng, 1) for _ in range(len(forms))]
+        same = list(analyzer.expand()) == entries
+
+        start = time.perf_counter()
+        expected = [lexicon.lookup(q, paradigm_dir) for q in queries]
+        dict_time = (time.perf_counter() - start) / len(queries)
+        start = time.perf_counter()
+        got = [analyzer.lookup(q) for q in queries]
+        trie_time = (time.perf_counter() - start) / len(queries)
+        same = same and got == expected
+        failed = failed or not same
+
+        print(f"{category:<4}{len(entries):>8}{len(analyzer.classes):>8}{lexicon_size / 2**20:>12.2f}"
+              f"{analyzer_size / 2**20:>13.2f}{dict_time * 1e6:>9.2f}{trie_time * 1e6:>9.2f}"
+              f"  {'yes' if same else 'NO'}")
+
+    same = check_extra_roots()
+    failed = failed or not same
+    print(f"extra root bIru (like Uru) suggested for bIrannnu: {'yes' if same else 'NO'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Benchmark every stage of the Kannada pipeline and compare against a stored baseline.
+
+The corpus is synthetic and reproducible for a given --seed: --sentences
+sentences of paradigm forms (transliterated to Kannada) mixed with words
+and whole sentences of Input.txt and sample_input.txt. The POS and chunk
+stages run a tiny randomly initialised BERT token-classification model
+(character word pieces, one label per tag of each encoding dict) that is
+built offline in a temporary folder and loaded like the real checkpoints,
+so the suite needs no download and times the pipeline code rather than
+XLM-R.
+
+Every repetition runs the in-process pipeline (tokenizer, CoNLL, POS,
+chunk, SSF, check_pos) on CPU under instrumentation.PipelineMetrics, with
+the check cache cleared; the first --warmup runs (which load the models
+and build the lexicon indexes) are not counted. The median wall time of
+each stage and of the whole run is reported. With --stream the pipeline
+runs in streaming mode (Pipeline.stream), where the stages overlap.
+
+--save-baseline stores the results; --baseline compares against them and
+exits with status 1 if a stage (or the whole run) is slower than its
+baseline by more than --threshold and by more than --min-delta seconds.
+
+Run from the project directory:
+    python benchmarks/bench_pipeline.py --sentences 500 --save-baseline pipeline_baseline.json
+    python benchmarks/bench_pipeline.py --sentences 500 --baseline pipeline_baseline.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_DIR)
+
+from pipeline import Pipeline, tokenizer, use_project_dir  # noqa: E402
+from instrumentation import PipelineMetrics, peak_rss_mb  # noqa: E402
+from eval_suggestions import git_revision  # noqa: E402
+from lexicon_store import get_lexicon  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS  # noqa: E402
+from transliterate import KannadaWX  # noqa: E402
+import run_pos_new  # noqa: E402
+import generate_features  # noqa: E402
+
+SAMPLE_INPUTS = ["Input.txt", "sample_input.txt"]
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+SETTINGS_COMPARED = ("sentences", "seed", "batch_size", "threads", "stream")
+
+
+def sample_sentences(paths):
+    """The sentences of the sample inputs, as lists of words (tokenized like the pipeline does)."""
+    sentences = []
+    for path in paths:
+        with open(os.path.join(PROJECT_DIR, path), "r", encoding="utf-8") as f:
+            sentences += tokenizer.split_sentences(f.read(), tokenizer.language_type("kn"))
+    return [sentence for sentence in sentences if sentence]
+
+
+def make_corpus(lexicon, n, seed, samples):
+    """n sentences (one per line), the same for a given seed and lexicon.
+
+    One sentence in ten is a sample sentence as is; the others are 4-14
+    words, mostly paradigm forms of random categories, with some words of
+    the sample sentences, ending in a full stop.
+    """
+    rng = random.Random(seed)
+    converter = KannadaWX()
+    forms = sorted({e.token for folder in sorted(set(PARADIGM_FOLDERS.values())) for e in lexicon.entries(folder)})
+    sample_words = sorted({word for sentence in samples for word in sentence if word not in ".।"})
+    lines = []
+    for _ in range(n):
+        if rng.random() < 0.1:
+            lines.append(" ".join(rng.choice(samples)))
+            continue
+        words = [converter.wx2utf(rng.choice(forms)) if rng.random() < 0.8 else rng.choice(sample_words)
+                 for _ in range(rng.randint(4, 14))]
+        lines.append(" ".join(words) + " .")
+    return "\n".join(lines) + "\n"
+
+
+def build_tiny_model(directory, num_labels, alphabet, seed):
+    """Save a random 1-layer BERT token classifier with a character word-piece vocabulary to directory."""
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import BertConfig, BertForTokenClassification, PreTrainedTokenizerFast
+
+    vocab = {token: i for i, token in enumerate(SPECIAL_TOKENS + alphabet + ["##" + c for c in alphabet])}
+    word_pieces = Tokenizer(models.WordPiece(vocab, unk_token="[UNK]", max_input_chars_per_word=200))
+    # Words are split on spaces only, as the XLM-R sentencepiece tokenizer does
+    word_pieces.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    word_pieces.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", vocab["[CLS]"]), ("[SEP]", vocab["[SEP]"])])
+    tokenizer_ = PreTrainedTokenizerFast(tokenizer_object=word_pieces, unk_token="[UNK]", pad_token="[PAD]",
+                                         cls_token="[CLS]", sep_token="[SEP]", mask_token="[MASK]")
+
+    torch.manual_seed(seed)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=1024, num_labels=num_labels,
+                        id2label={i: f"LABEL_{i}" for i in range(num_labels)},
+                        label2id={f"LABEL_{i}": i for i in range(num_labels)})
+    BertForTokenClassification(config).save_pretrained(directory)
+    tokenizer_.save_pretrained(directory)
+    return directory
+
+
+def run_benchmark(args):
+    start = time.perf_counter()
+    lexicon = get_lexicon()
+    lexicon_load = time.perf_counter() - start
+    corpus = make_corpus(lexicon, args.sentences, args.seed, sample_sentences(SAMPLE_INPUTS))
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    model_dir = tempfile.mkdtemp(prefix="tiny_models_")
+    try:
+        alphabet = sorted(set(corpus) - set(" \n"))
+        pos_model = build_tiny_model(os.path.join(model_dir, "pos"), len(run_pos_new.load_encoding_dict()),
+                                     alphabet, args.seed)
+        chunk_model = build_tiny_model(os.path.join(model_dir, "chunk"),
+                                       len(generate_features.load_encoding_dict()), alphabet, args.seed)
+
+        start = time.perf_counter()
+        pipeline = Pipeline(pos_model, chunk_model, "kn", log=lambda message: None,
+                            batch_size=args.batch_size, preload=False)
+        setup = lexicon_load + time.perf_counter() - start
+
+        runs = []
+        for _ in range(args.warmup + args.repeat):
+            pipeline.metrics = PipelineMetrics()
+            pipeline.checker.cache.clear()
+            start = time.perf_counter()
+            if args.stream:
+                pipeline.stream(io.StringIO(corpus), io.StringIO(), batch_sentences=args.stream_batch)
+            else:
+                pipeline.run(corpus, io.StringIO())
+            pipeline.metrics.add("end_to_end", time.perf_counter() - start, 0.0, peak_rss_mb())
+            runs.append(pipeline.metrics.report())
+        pipeline.close()
+    finally:
+        shutil.rmtree(model_dir, ignore_errors=True)
+
+    first, timed = runs[0], runs[args.warmup:]
+    stages = {}
+    for name in timed[0]["stages"]:
+        if name.endswith("_model_load"):
+            continue
+        seconds = [run["stages"][name]["wall_s"] for run in timed if name in run["stages"]]
+        median = statistics.median(seconds)
+        stages[name] = {"median_s": round(median, 4), "min_s": round(min(seconds), 4),
+                        "tokens_per_s": round(first["tokens"] / median, 1) if median else None}
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {"sentences": args.sentences, "seed": args.seed, "batch_size": args.batch_size,
+                     "threads": args.threads, "stream": args.stream, "repeat": args.repeat,
+                     "warmup": args.warmup},
+        "corpus": {"sentences": first["sentences"], "tokens": first["tokens"]},
+        "setup_s": round(setup, 4),
+        "model_load_s": {name: run_stage["wall_s"] for name, run_stage in first["stages"].items()
+                         if name.endswith("_model_load")},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stages": stages,
+    }
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Print the current medians against the baseline's; returns the names of regressed stages."""
+    regressions = []
+    print(f"{'stage':<17}{'baseline s':>12}{'current s':>12}{'change':>9}")
+    for name, stage in results["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            print(f"{name:<17}{'-':>12}{stage['median_s']:>12.4f}")
+            continue
+        before, now = base["median_s"], stage["median_s"]
+        change = (now - before) / before if before else 0.0
+        regressed = now > before * (1 + threshold) and now - before > min_delta
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<17}{before:>12.4f}{now:>12.4f}{change:>+9.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage and end-to-end pipeline benchmark with baseline comparison")
+    parser.add_argument("--sentences", type=int, default=500, help="Sentences in the synthetic corpus")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--batch-size", type=int, default=16, help="Sentences per padded forward pass")
+    parser.add_argument("--threads", type=int, default=1, help="torch CPU threads (0: torch's default)")
+    parser.add_argument("--stream", action="store_true", help="Run the stages concurrently (Pipeline.stream)")
+    parser.add_argument("--stream-batch", type=int, default=64, help="Sentences per batch with --stream")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs; the medians are reported")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs first (model load, index builds)")
+    parser.add_argument("--baseline", default=None, help="Compare against this stored result")
+    parser.add_argument("--save-baseline", default=None, help="Store the result here as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown (0.25 = 25%%) that counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="Slowdowns of at most this many seconds are ignored (timer noise)")
+    parser.add_argument("--report", default=None, help="Also write the result as JSON here")
+    args = parser.parse_args()
+    if args.repeat < 1 or args.warmup < 0:
+        parser.error("--repeat must be at least 1 and --warmup at least 0")
+
+    use_project_dir()
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        differing = [key for key in SETTINGS_COMPARED if baseline["settings"].get(key) != getattr(args, key)]
+        if differing:
+            sys.exit(f"The baseline was recorded with different {', '.join(differing)}: {baseline['settings']}")
+
+    results = run_benchmark(args)
+    print(f"{results['corpus']['sentences']} sentences, {results['corpus']['tokens']} tokens; "
+          f"setup {results['setup_s']:.2f} s, model load "
+          + ", ".join(f"{name} {seconds:.2f} s" for name, seconds in results["model_load_s"].items())
+          + f"; peak RSS {results['peak_rss_mb']:.0f} MB")
+    print(f"{'stage':<17}{'median s':>10}{'min s':>10}{'tokens/s':>12}")
+    for name, stage in results["stages"].items():
+        print(f"{name:<17}{stage['median_s']:>10.4f}{stage['min_s']:>10.4f}{stage['tokens_per_s'] or 0:>12.0f}")
+
+    for path in (args.report, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as out:
+                json.dump(results, out, indent=2)
+            print(f"Result → {path}")
+
+    if baseline is not None:
+        print(f"\nAgainst {args.baseline} (revision {baseline.get('revision')}, {baseline['created']}):")
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            sys.exit(f"Slower than the baseline: {', '.join(regressions)}")
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark and check: native Kannada <-> WX tables vs wxconv.
+
+Every paradigm form (and every word of the sample inputs) is converted both
+ways and compared with wxconv's output, then both converters are timed.
+
+Run from the project directory:
+    python benchmarks/bench_transliterate.py
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "check_pos"))
+
+from wxconv import WXC  # noqa: E402
+from lexicon_store import get_lexicon  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS  # noqa: E402
+from transliterate import KannadaWX, fast_utf2wx, fast_wx2utf  # noqa: E402
+
+SAMPLE_FILES = ["Input.txt", "sample_input.txt", "ssf_output.txt"]
+
+
+def sample_words(paths):
+    words = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                words.extend(w for w in line.split() if any("ಀ" <= c <= "೿" for c in w))
+    return list(dict.fromkeys(words))
+
+
+def check(label, items, native, reference):
+    """Compare native(x) with reference(x); None from native means 'uses the fallback'."""
+    mismatches = fast = 0
+    for item in items:
+        got = native(item)
+        if got is None:
+            continue
+        fast += 1
+        expected = reference(item)
+        if got != expected:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  MISMATCH {label}: {item!r} -> {got!r}, wxconv {expected!r}")
+    print(f"{label:<28}{len(items):>8} words, {fast:>8} on the fast path, {mismatches} mismatches")
+    return mismatches
+
+
+def timed(convert, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            convert(item)
+    return (time.perf_counter() - start) / (repeat * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transliteration check and benchmark")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    to_wx = WXC(order="utf2wx", lang="kan")
+    to_utf = WXC(order="wx2utf", lang="kan")
+
+    forms = list(dict.fromkeys(e.token for d in PARADIGM_FOLDERS.values() for e in get_lexicon().entries(d)))
+    kannada_forms = [to_utf.convert(f) for f in forms]
+    words = sample_words(SAMPLE_FILES)
+
+    bad = check("paradigm forms wx2utf", forms, fast_wx2utf, to_utf.convert)
+    bad += check("paradigm forms utf2wx", kannada_forms, fast_utf2wx, to_wx.convert)
+    bad += check("sample words utf2wx", words, fast_utf2wx, to_wx.convert)
+
+    print(f"\n{'direction':<10}{'wxconv us/word':>16}{'native us/word':>16}{'memoized us/word':>18}")
+    for label, items, reference, native in (("utf2wx", kannada_forms, to_wx.convert, fast_utf2wx),
+                                            ("wx2utf", forms, to_utf.convert, fast_wx2utf)):
+        converter = KannadaWX()
+        memoized = converter.utf2wx if label == "utf2wx" else converter.wx2utf
+        memoized_items = items * 10     # a document repeats words; model that with 10 passes
+        print(f"{label:<10}{timed(reference, items, args.repeat):>16.2f}{timed(native, items, args.repeat):>16.2f}"
+              f"{timed(memoized, memoized_items, args.repeat):>18.2f}")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
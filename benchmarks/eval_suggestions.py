@@ -0,0 +1,215 @@
+"""Evaluate suggestion quality against latency and memory for every fuzzy search engine.
+
+Misspellings are generated from paradigm forms with controlled edit
+operations:
+    exact      the form itself (exercises the exact-match path)
+    sub, ins, del, swap
+               one WX letter substituted / inserted / deleted, or two
+               adjacent letters transposed
+    wx2        two random WX letter edits
+    akshara    one akshara-level typo (vowel sign swapped, akshara dropped
+               or doubled)
+Each query goes through check_pos.check_word (exact lookup, then fuzzy
+search) and counts as found at k if its source form is among the first k
+suggestions (or is the exact match). A misspelling that happens to be
+another valid form is a "real-word" error and is never found.
+
+Every engine runs in its own subprocess, so its peak RSS is measured
+without the other engines' indexes. Results are printed as a table and
+written as JSON (--report) so runs can be compared over time.
+
+Run from the project directory:
+    python benchmarks/eval_suggestions.py --queries 30 --report suggestion_eval.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "check_pos"))
+
+from bench_akshara_distance import akshara_noise  # noqa: E402
+from bench_fuzzy_search import WX_LETTERS, perturb  # noqa: E402
+from check_pos import check_word  # noqa: E402
+from fuzzy_search import FUZZY_ENGINES, WEIGHTED_ENGINES, get_fuzzy_index  # noqa: E402
+from lexicon_store import DEFAULT_ARTIFACT_PATH, lexicon_fingerprint, open_lexicon  # noqa: E402
+from paradigm_lexicon import PARADIGM_FOLDERS  # noqa: E402
+
+NOISE_KINDS = ["exact", "sub", "ins", "del", "swap", "wx2", "akshara"]
+RECALL_AT = (1, 3, 5)
+
+
+def misspell(word, rng, kind):
+    """Apply one controlled edit operation (see the module docstring) to a WX word."""
+    if kind == "exact":
+        return word
+    if kind == "wx2":
+        return perturb(word, rng, 2)
+    if kind == "akshara":
+        return akshara_noise(word, rng)
+    if kind == "swap" and len(word) > 1:
+        i = rng.randrange(len(word) - 1)
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == "del" and len(word) > 1:
+        i = rng.randrange(len(word))
+        return word[:i] + word[i + 1:]
+    if kind == "sub":
+        i = rng.randrange(len(word))
+        return word[:i] + rng.choice(WX_LETTERS.replace(word[i], "")) + word[i + 1:]
+    i = rng.randrange(len(word) + 1)
+    return word[:i] + rng.choice(WX_LETTERS) + word[i:]
+
+
+def make_queries(lexicon, categories, kinds, n, seed):
+    """[(category, kind, source form, misspelling), ...], the same for a given seed and lexicon."""
+    rng = random.Random(seed)
+    queries = []
+    for category in categories:
+        forms = sorted({e.token for e in lexicon.entries(PARADIGM_FOLDERS[category])})
+        if not forms:
+            continue
+        for kind in kinds:
+            for _ in range(n):
+                source = rng.choice(forms)
+                queries.append((category, kind, source, misspell(source, rng, kind)))
+    return queries
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def summarize(rows):
+    """Recall@k, real-word rate and latency over rows of (found_rank, real_word, seconds)."""
+    seconds = [s for _, _, s in rows]
+    summary = {"queries": len(rows)}
+    for k in RECALL_AT:
+        summary[f"recall@{k}"] = round(sum(rank is not None and rank < k for rank, _, _ in rows) / len(rows), 4)
+    summary["real_word"] = round(sum(real for _, real, _ in rows) / len(rows), 4)
+    summary["mean_ms"] = round(sum(seconds) / len(seconds) * 1000, 3)
+    summary["p95_ms"] = round(percentile(seconds, 95) * 1000, 3)
+    return summary
+
+
+def evaluate_engine(args):
+    """Run every query through check_word with one engine; returns its report section."""
+    lexicon = open_lexicon(args.lexicon)
+    load_rss = peak_rss_mb()
+    queries = make_queries(lexicon, args.categories, args.kinds, args.queries, args.seed)
+    top_n = max(RECALL_AT)
+
+    build = {}
+    for category in dict.fromkeys(c for c, _, _, _ in queries):
+        start = time.perf_counter()
+        get_fuzzy_index(lexicon, PARADIGM_FOLDERS[category], args.worker, units=args.distance_units,
+                        vowel_sign_cost=args.vowel_sign_cost).warm_up()
+        build[category] = round(time.perf_counter() - start, 3)
+
+    rows = {}
+    for category, kind, source, query in queries:
+        start = time.perf_counter()
+        matches, closest = check_word(query, PARADIGM_FOLDERS[category], lexicon, top_n=top_n,
+                                      max_distance=args.max_distance, engine=args.worker,
+                                      category=category, units=args.distance_units,
+                                      vowel_sign_cost=args.vowel_sign_cost)
+        seconds = time.perf_counter() - start
+        if matches:
+            rank = 0 if any(m[2] == source for m in matches) else None
+            real_word = rank is None
+        else:
+            words = [w for _, w, _ in closest]
+            rank = words.index(source) if source in words else None
+            real_word = False
+        rows.setdefault((category, kind), []).append((rank, real_word, seconds))
+
+    return {
+        "build_s": build,
+        "load_rss_mb": round(load_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "overall": summarize([row for kind_rows in rows.values() for row in kind_rows]),
+        "by_kind": {kind: summarize([r for (_, k), kind_rows in rows.items() if k == kind for r in kind_rows])
+                    for kind in args.kinds if any(k == kind for _, k in rows)},
+        "by_category": {f"{category}/{kind}": summarize(kind_rows) for (category, kind), kind_rows in rows.items()},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggestion quality / latency / memory evaluation")
+    parser.add_argument("--queries", type=int, default=30, help="Queries per category and noise kind")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--categories", nargs="+", default=sorted(PARADIGM_FOLDERS), choices=sorted(PARADIGM_FOLDERS))
+    parser.add_argument("--kinds", nargs="+", default=NOISE_KINDS, choices=NOISE_KINDS)
+    parser.add_argument("--engines", nargs="+", default=list(FUZZY_ENGINES), choices=sorted(FUZZY_ENGINES))
+    parser.add_argument("--max-distance", type=int, default=None)
+    parser.add_argument("--distance-units", choices=["wx", "akshara"], default="wx")
+    parser.add_argument("--vowel-sign-cost", type=float, default=None)
+    parser.add_argument("--lexicon", default=DEFAULT_ARTIFACT_PATH)
+    parser.add_argument("--report", default="suggestion_eval.json", help="Where to write the JSON report")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.vowel_sign_cost is not None and not 0 < args.vowel_sign_cost < 1:
+        parser.error("--vowel-sign-cost must be between 0 and 1 (exclusive)")
+
+    if args.worker:
+        print(json.dumps(evaluate_engine(args)))
+        return
+
+    engines = args.engines
+    if args.vowel_sign_cost is not None:
+        engines = [e for e in engines if e in WEIGHTED_ENGINES]
+    lexicon = open_lexicon(args.lexicon)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "lexicon": lexicon_fingerprint(lexicon),
+        "settings": {"queries": args.queries, "seed": args.seed, "categories": args.categories,
+                     "kinds": args.kinds, "max_distance": args.max_distance,
+                     "distance_units": args.distance_units, "vowel_sign_cost": args.vowel_sign_cost},
+        "engines": {},
+    }
+    del lexicon
+
+    worker_argv = [sys.executable, os.path.abspath(__file__), "--queries", str(args.queries),
+                   "--seed", str(args.seed), "--categories", *args.categories, "--kinds", *args.kinds,
+                   "--distance-units", args.distance_units, "--lexicon", args.lexicon]
+    if args.max_distance is not None:
+        worker_argv += ["--max-distance", str(args.max_distance)]
+    if args.vowel_sign_cost is not None:
+        worker_argv += ["--vowel-sign-cost", str(args.vowel_sign_cost)]
+
+    print(f"{'engine':<12}{'kind':<9}{'R@1':>7}{'R@3':>7}{'R@5':>7}{'real':>7}{'mean ms':>9}{'p95 ms':>9}{'peak MB':>9}")
+    for engine in engines:
+        done = subprocess.run(worker_argv + ["--worker", engine], capture_output=True, text=True)
+        if done.returncode != 0:
+            sys.exit(f"{engine} failed:\n{done.stderr}")
+        result = report["engines"][engine] = json.loads(done.stdout.strip().splitlines()[-1])
+        for kind, s in [*result["by_kind"].items(), ("all", result["overall"])]:
+            print(f"{engine:<12}{kind:<9}{s['recall@1']:>7.2f}{s['recall@3']:>7.2f}{s['recall@5']:>7.2f}"
+                  f"{s['real_word']:>7.2f}{s['mean_ms']:>9.2f}{s['p95_ms']:>9.2f}{result['peak_rss_mb']:>9.1f}")
+
+    with open(args.report, "w", encoding="utf-8") as out:
+        json.dump(report, out, indent=2, ensure_ascii=False)
+    print(f"Report → {args.report}")
+
+
+if __name__ == "__main__":
+    main()
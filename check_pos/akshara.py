@@ -0,0 +1,104 @@
+import re
+
+from transliterate import CONSONANTS, MODIFIERS, VOWELS
+
+
+# ----------- Akshara (grapheme cluster) units -----------
+# A Kannada akshara spells as 1-4 WX letters: a consonant cluster, then a
+# vowel (explicit in WX, 'a' included) and optional anusvara / visarga, e.g.
+#   helYikeVya -> he lYi keV ya
+# AksharaCodec gives every distinct akshara a small id and encodes a word
+# as a string of private-use code points, one per akshara. Encoded strings
+# are 2-3x shorter than WX, and every existing kernel (levenshtein.py, the
+# array trie, the NumPy DP, SymSpell) runs on them unchanged, so distances
+# count akshara edits instead of WX letter edits.
+# --------------------------------------------------------
+
+_CONSONANT = "|".join(sorted((re.escape(c) for c in CONSONANTS.values()), key=len, reverse=True))
+_VOWEL = "|".join(sorted((re.escape(v) for v in VOWELS.values()), key=len, reverse=True))
+_MODIFIER = "|".join(re.escape(m) for m in MODIFIERS.values())
+AKSHARA = re.compile(
+    f"((?:{_CONSONANT})*)((?:{_VOWEL})(?:{_MODIFIER})*)"     # (consonants)(vowel + modifiers)
+    f"|((?:{_CONSONANT})+)()"                               # cluster without a vowel (word-final virama)
+    f"|()((?:{_MODIFIER})|.)",                              # anything else stands alone
+    re.S)
+
+CODE_BASE = 0xE000  # first private-use code point
+
+
+def segment(wx_word):
+    """Split a WX word into akshara strings; ''.join(segment(w)) == w."""
+    return [m.group(0) for m in AKSHARA.finditer(wx_word)]
+
+
+class AksharaCodec:
+    """Maps aksharas to ids and WX words to strings of one code point per akshara.
+
+    Ids are assigned on first sight, so queries with unseen aksharas simply
+    extend the table. base_of[id] is the id of the akshara's consonant
+    cluster (-1 for independent vowels and other symbols): two aksharas with
+    the same base differ only in their vowel sign.
+    """
+
+    def __init__(self):
+        self.aksharas = []
+        self.base_of = []
+        self._ids = {}
+        self._bases = {}
+        self._encoded = {}
+
+    def _id(self, match):
+        akshara = match.group(0)
+        akshara_id = self._ids.get(akshara)
+        if akshara_id is None:
+            akshara_id = self._ids[akshara] = len(self.aksharas)
+            self.aksharas.append(akshara)
+            consonants = match.group(1) or match.group(3) or ""
+            self.base_of.append(self._bases.setdefault(consonants, len(self._bases)) if consonants else -1)
+        return akshara_id
+
+    def encode(self, wx_word):
+        encoded = self._encoded.get(wx_word)
+        if encoded is None:
+            encoded = self._encoded[wx_word] = "".join(
+                chr(CODE_BASE + self._id(m)) for m in AKSHARA.finditer(wx_word))
+        return encoded
+
+    def decode(self, encoded):
+        return "".join(self.aksharas[ord(c) - CODE_BASE] for c in encoded)
+
+    def weighted_distance(self, vowel_sign_cost):
+        """Akshara edit distance where swapping only the vowel sign costs vowel_sign_cost (< 1).
+
+        Same contract as levenshtein.edit_distance: with max_distance the
+        result is exact up to max_distance and some larger value beyond it.
+        """
+        base_of = self.base_of
+
+        def distance(s, t, max_distance=None):
+            if s == t:
+                return 0.0
+            if len(s) > len(t):
+                s, t = t, s
+            previous = [float(j) for j in range(len(s) + 1)]
+            for i, tc in enumerate(t, 1):
+                tb = base_of[ord(tc) - CODE_BASE]
+                current = [float(i)]
+                for j, sc in enumerate(s, 1):
+                    if sc == tc:
+                        cost = previous[j - 1]
+                    elif tb >= 0 and base_of[ord(sc) - CODE_BASE] == tb:
+                        cost = previous[j - 1] + vowel_sign_cost
+                    else:
+                        cost = previous[j - 1] + 1
+                    if previous[j] + 1 < cost:
+                        cost = previous[j] + 1
+                    if current[j - 1] + 1 < cost:
+                        cost = current[j - 1] + 1
+                    current.append(cost)
+                if max_distance is not None and min(current) > max_distance:
+                    return min(current)
+                previous = current
+            return previous[-1]
+
+        return distance
@@ -0,0 +1,75 @@
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only the "numpy" fuzzy engine needs it
+    np = None
+
+
+# -------------------------------------------------------
+# Batched Levenshtein: one query against a block of forms
+# -------------------------------------------------------
+# Forms are packed into a padded matrix of code points, one column per form.
+# The DP runs over the query characters; for each one the whole (L + 1, N)
+# block of DP rows is updated with a few array operations:
+#   x[j]   = min(prev[j - 1] + (q != form[j - 1]), prev[j] + 1)
+#   new[j] = min over k <= j of (x[k] + j - k)       (insertions)
+#          = j + cumulative-min(x[k] - k)
+# Column j only depends on columns <= j, so padding never changes the value
+# read back at each form's own length.
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("The numpy fuzzy engine needs numpy: pip install numpy")
+
+
+def pack_forms(forms):
+    """Return (codes, lengths): a (L, N) code-point matrix (one column per form, padded with 0) and the form lengths.
+
+    Forms are stored column-wise so every DP step works on contiguous rows.
+    """
+    require_numpy()
+    lengths = np.fromiter((len(f) for f in forms), dtype=np.int64, count=len(forms))
+    width = int(lengths.max()) if len(forms) else 0
+    top = max((ord(c) for f in forms for c in f), default=0)
+    codes = np.zeros((len(forms), width), dtype=np.uint16 if top < 0xFFFF else np.int32)
+    for i, form in enumerate(forms):
+        codes[i, :len(form)] = [ord(c) for c in form]
+    return np.ascontiguousarray(codes.T), lengths
+
+
+def batched_edit_distance(query, codes, lengths):
+    """Levenshtein distance from query to every packed form (int16 array of length N)."""
+    require_numpy()
+    width, n = codes.shape
+    steps = np.arange(width + 1, dtype=np.int16)[:, None]
+    row = np.broadcast_to(steps, (width + 1, n)).copy()
+    x = np.empty_like(row)
+    for i, c in enumerate(query, 1):
+        x[0] = i
+        np.add(row[:-1], codes != ord(c), out=x[1:])
+        np.minimum(x[1:], row[1:] + 1, out=x[1:])
+        x -= steps
+        np.minimum.accumulate(x, axis=0, out=row)
+        row += steps
+    return row[lengths, np.arange(n)]
+
+
+class PackedForms:
+    """Forms packed into length-sorted blocks so short forms are not padded to the longest one."""
+
+    def __init__(self, forms, block_size=4096):
+        require_numpy()
+        order = sorted(range(len(forms)), key=lambda i: len(forms[i]))
+        self.blocks = []
+        for start in range(0, len(order), block_size):
+            ids = np.array(order[start:start + block_size], dtype=np.int64)
+            codes, lengths = pack_forms([forms[i] for i in ids])
+            self.blocks.append((ids, codes, lengths))
+        self.size = len(forms)
+
+    def distances(self, query):
+        """Levenshtein distance from query to every form, in the original form order."""
+        out = np.empty(self.size, dtype=np.int16)
+        for ids, codes, lengths in self.blocks:
+            out[ids] = batched_edit_distance(query, codes, lengths)
+        return out
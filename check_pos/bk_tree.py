@@ -0,0 +1,84 @@
+import heapq
+
+
+class BKTree:
+    """Burkhard-Keller metric tree over words.
+
+    Every node holds one distinct word, the payload items that were added
+    for it (kept in insertion order) and its children keyed by their
+    distance to the node. Because the distance is a metric, a subtree
+    hanging off edge e of a node at distance d from the query can only
+    contain words within radius r when |e - d| <= r (triangle inequality).
+
+    distance(a, b, max_distance) must return the exact distance when it is
+    <= max_distance and any larger value otherwise (see levenshtein.py).
+    """
+
+    def __init__(self, distance):
+        self.distance = distance
+        self.words = []
+        self.items = []
+        self.children = []
+        self._node_of = {}
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word, item):
+        """Add word with an associated integer payload item (e.g. its scan position)."""
+        node = self._node_of.get(word)
+        if node is not None:
+            self.items[node].append(item)
+            return
+        new = len(self.words)
+        self.words.append(word)
+        self.items.append([item])
+        self.children.append({})
+        self._node_of[word] = new
+        if new == 0:
+            return
+        node = 0
+        while True:
+            d = self.distance(word, self.words[node])
+            child = self.children[node].get(d)
+            if child is None:
+                self.children[node][d] = new
+                return
+            node = child
+
+    def search(self, query, max_distance=None, top_k=None):
+        """Return [(distance, item), ...] sorted by (distance, item).
+
+        max_distance bounds the search radius (None = unbounded); top_k keeps
+        only the k smallest (distance, item) pairs and shrinks the radius to
+        the current k-th distance as better candidates are found.
+        """
+        if not self.words:
+            return []
+        radius = float("inf") if max_distance is None else max_distance
+        found = []  # max-heap of (-distance, -item) when top_k is set
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            children = self.children[node]
+            # Beyond radius + the longest edge neither the node nor a child can qualify
+            limit = None if radius == float("inf") else radius + (max(children) if children else 0)
+            d = self.distance(query, self.words[node], limit)
+            if d <= radius:
+                for item in self.items[node]:
+                    if top_k is None:
+                        found.append((d, item))
+                    elif len(found) < top_k:
+                        heapq.heappush(found, (-d, -item))
+                    elif (d, item) < (-found[0][0], -found[0][1]):
+                        heapq.heapreplace(found, (-d, -item))
+                    else:
+                        break
+                if top_k is not None and len(found) == top_k:
+                    radius = min(radius, -found[0][0])
+            for edge, child in children.items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        if top_k is None:
+            return sorted(found)
+        return sorted((-nd, -ni) for nd, ni in found)
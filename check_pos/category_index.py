@@ -0,0 +1,63 @@
+import os
+
+
+# ----------- Cross-category exact-match index -----------
+# One dict over the forms of every paradigm folder. Each form maps to a
+# category bitmask plus the entries it has in each category, so a single
+# probe answers "is this a form of the predicted category, and if not, of
+# which other one?" and a mis-tagged word is recognized without a fuzzy
+# search in the wrong folder.
+# --------------------------------------------------------
+
+
+class CategoryIndex:
+    """Exact-match index over all categories of a lexicon, with per-form category bitmasks.
+
+    Categories take bits in lexicon.folders order, which is also the order
+    in which non-preferred categories are tried.
+    """
+
+    def __init__(self, lexicon):
+        self.categories = list(lexicon.folders)
+        self.folders = dict(lexicon.folders)
+        self.bits = {category: 1 << i for i, category in enumerate(self.categories)}
+        self._forms = {}    # form -> [mask, {category: [LexiconEntry, ...]}]
+        for category, paradigm_dir in self.folders.items():
+            bit = self.bits[category]
+            for entry in lexicon.entries(paradigm_dir):
+                record = self._forms.get(entry.token)
+                if record is None:
+                    record = self._forms[entry.token] = [0, {}]
+                record[0] |= bit
+                matches = record[1].setdefault(category, [])
+                # First matching line per file, like ParadigmLexicon.lookup
+                if not matches or matches[-1].fpath != entry.fpath:
+                    matches.append(entry)
+
+    @classmethod
+    def from_lexicon(cls, lexicon):
+        """Index built once and cached with the lexicon."""
+        return lexicon.derived_index("categories", None, lambda: cls(lexicon))
+
+    def lookup(self, wx_word, preferred):
+        """Return (category, entries): the preferred category if it has the form, else the first other one.
+
+        (None, []) when no category has the form.
+        """
+        record = self._forms.get(wx_word)
+        if record is None:
+            return None, []
+        mask, by_category = record
+        if mask & self.bits.get(preferred, 0):
+            return preferred, by_category[preferred]
+        for category in self.categories:
+            if mask & self.bits[category]:
+                return category, by_category[category]
+        return None, []
+
+    def category_of_path(self, fpath):
+        """Category whose paradigm folder contains fpath (None if none does)."""
+        for category, paradigm_dir in self.folders.items():
+            if fpath.startswith(paradigm_dir + os.sep):
+                return category
+        return None
@@ -0,0 +1,83 @@
+import os
+import json
+import tempfile
+from collections import OrderedDict
+
+
+class CheckCache:
+    """Bounded LRU of check results keyed by (wx_word, category).
+
+    A value is (matches, closest) as returned by search_in_paradigm_folder
+    and find_closest_words_in_files. The cache can be saved to and loaded
+    from a JSON file; a fingerprint of the lexicon and search settings is
+    stored with it, and a file written for another fingerprint is ignored.
+    """
+
+    def __init__(self, maxsize=100000, fingerprint=None):
+        self.maxsize = maxsize
+        self.fingerprint = fingerprint
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        """Return the cached value (marking it recently used) or None, counting hits and misses."""
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry (e.g. after the lexicon changed); the hit/miss counts are kept."""
+        self._data.clear()
+
+    def load(self, path):
+        """Load entries saved by save(); returns the number loaded (0 if missing or stale)."""
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable check cache {path}: {e}")
+            return 0
+        if saved.get("fingerprint") != self.fingerprint:
+            return 0
+        for wx_word, category, matches, closest in saved.get("entries", []):
+            self.put((wx_word, category), ([tuple(m) for m in matches], [tuple(c) for c in closest]))
+        return len(self._data)
+
+    def save(self, path):
+        """Write the cache (least recently used first) atomically to path."""
+        entries = [[wx_word, category, matches, closest]
+                   for (wx_word, category), (matches, closest) in self._data.items()]
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".check_cache_", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                json.dump({"fingerprint": self.fingerprint, "entries": entries}, out, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = 100.0 * self.hits / lookups if lookups else 0.0
+        return f"cache hits {self.hits}, misses {self.misses} ({rate:.1f}% hit rate), {len(self)} entries"
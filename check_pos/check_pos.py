@@ -1,192 +1,73 @@
 import sys
-import pandas as pd
-import os
+import json
+import time
+import argparse
 import importlib.util
-from wxconv import WXC
+from itertools import islice
+from paradigm_lexicon import PARADIGM_FOLDERS
+from fuzzy_search import DEFAULT_ENGINE, FUZZY_ENGINES, WEIGHTED_ENGINES, get_fuzzy_index
+from check_cache import CheckCache
+from transliterate import KannadaWX
+from morph_analyzer import SuffixTrieAnalyzer, read_extra_roots, roots_file_key
+from category_index import CategoryIndex
+from frequency_store import DEFAULT_FREQUENCY_PATH, build_frequency_store, closest_by_frequency, open_frequency_store
+from sharded_check import ParallelChecker, format_worker_stats
+from lexicon_store import DEFAULT_ARTIFACT_PATH, build_lexicon_artifact, get_lexicon, lexicon_fingerprint, open_lexicon
 
 
 # ----------- Usage -----------
-# python process_pos_input.py category_map.py input.txt output.txt
+# python check_pos.py category_map.py input.txt output.txt
+# python check_pos.py --format jsonl category_map.py input.txt - | jq ...
+# python check_pos.py --build-lexicon
 # -----------------------------
 
 
-# -------------------------------------------------------
-# Algorithm 1 – Memoized Recursive Edit Distance Function
-# -------------------------------------------------------
-def edit_distance(s: str, t: str, memo=None):
-    """
-    Recursive memoized edit-distance implementation.
-    Equivalent to Algorithm 1 EDIT-DISTANCE(s, t, h).
-    """
-    if memo is None:
-        memo = {}
-
-    key = (s, t)
-    if key in memo:
-        return memo[key]
-
-    # Base cases
-    if len(s) == 0:
-        return len(t)
-    if len(t) == 0:
-        return len(s)
+def search_in_paradigm_folder(wx_word, paradigm_dir, lexicon=None, analyzer=None):
+    """Search for a WX word in all .txt files inside a paradigm folder.
 
-    # Recursive cases
-    s_prime = s[:-1]
-    t_prime = t[:-1]
-
-    ka = edit_distance(s_prime, t_prime, memo)
-    kb = edit_distance(s_prime, t, memo) + 1
-    kc = edit_distance(s, t_prime, memo) + 1
-
-    if s[-1] == t[-1]:
-        kd = ka
+    Returns (fpath, base_word, token, lemma) for the first matching line of
+    each file, looked up in the in-memory ParadigmLexicon, or in a
+    SuffixTrieAnalyzer for the folder when one is given (same result, plus
+    any roots added to it).
+    """
+    if analyzer is not None:
+        entries = analyzer.lookup(wx_word)
     else:
-        kd = ka + 1
+        if lexicon is None:
+            lexicon = get_lexicon()
+        entries = lexicon.lookup(wx_word, paradigm_dir)
+    return [(e.fpath, e.base_word, e.token, e.lemma) for e in entries]
 
-    c = min(kb, kc, kd)
-    memo[key] = c
-    return c
 
-
-def read_excel(path):
-    """Safely read Excel file into pandas DataFrame"""
-    try:
-        df = pd.read_excel(path, header=None, dtype=str)
-        df = df.fillna("")
-        return df
-    except Exception as e:
-        print(f"Error reading {path}: {e}")
-        return None
-
-
-def search_in_paradigm_folder(wx_word, paradigm_dir):
-    """Search for a WX word in all .txt files inside a paradigm folder."""
-    matched_files = []
-    # Defensive: if paradigm_dir is not provided or invalid, return empty
-    if not paradigm_dir:
-        return matched_files
-    if not os.path.exists(paradigm_dir):
-        return matched_files
-
-    for root, _, files in os.walk(paradigm_dir):
-        for f in files:
-            if not f.endswith(".txt"):
-                continue
-            fpath = os.path.join(root, f)
-            try:
-                # Read file line-by-line and try to extract the actual token that matches wx_word.
-                with open(fpath, "r", encoding="utf-8") as fin:
-                    for line in fin:
-                        line = line.strip()
-                        if not line:
-                            continue
-
-                        # Clean the line to extract the token (same rules as in find_closest_words_in_files)
-                        token = line.split()[0]
-                        token = token.split('+')[0]
-                        token = token.split('_')[0]
-                        token = token.strip()
-                        if not token:
-                            continue
-
-                        # If exact WX token matches, record the file, the matched token and the lemma/root
-                        if token == wx_word:
-                            base_word = os.path.splitext(f)[0]
-                            # Try to extract lemma/root from the annotation part of the line
-                            lemma = None
-                            parts = line.split(None, 1)
-                            if len(parts) > 1:
-                                ann = parts[1].strip()
-                                # ann format expected like: Uru(N8)+rigeV_ru_DAT
-                                # take portion before first '+' and remove any parenthesis
-                                lemma_part = ann.split('+')[0]
-                                lemma = lemma_part.split('(')[0].strip()
-                            matched_files.append((fpath, base_word, token, lemma))
-                            # Stop scanning this file once we've found a match
-                            break
-            except Exception:
-                pass
-    return matched_files
-
-
-def find_closest_words_in_files(wx_word, paradigm_dir, top_n=3):
+def find_closest_words_in_files(wx_word, paradigm_dir, top_n=3, lexicon=None,
+                                max_distance=None, engine=DEFAULT_ENGINE, units="wx", vowel_sign_cost=None,
+                                frequencies=None, extra_roots=None, roots_key=None):
     """
     Search all paradigm files and find the closest matching words inside them.
     Returns a list of (file_path, found_word, distance).
 
-    Cleans paradigm lines to extract only the true word token
-    (removing grammar suffixes like +, _, or tags).
+    Paradigm lines are cleaned to the true word token (removing grammar
+    suffixes like +, _, or tags) once, when the lexicon is loaded. The
+    search itself runs on the chosen fuzzy engine (see fuzzy_search.py);
+    max_distance optionally bounds the edit distance of suggestions.
+    units="akshara" counts edits in aksharas rather than WX letters, and
+    vowel_sign_cost then makes vowel-sign-only substitutions cheaper.
+    With a FrequencyStore, words at the same distance are ranked by
+    corpus / paradigm frequency instead of file order. Roots of an
+    extra_roots file are suggested too by the stem-suffix engine.
     """
-    closest_matches = []
-    # Defensive: if paradigm_dir is not provided or invalid, return empty
-    if not paradigm_dir:
-        return closest_matches
-    if not os.path.exists(paradigm_dir):
-        return closest_matches
-
-    for root, _, files in os.walk(paradigm_dir):
-        for f in files:
-            if not f.endswith(".txt"):
-                continue
-            fpath = os.path.join(root, f)
-            try:
-                with open(fpath, "r", encoding="utf-8") as fin:
-                    for line in fin:
-                        line = line.strip()
-                        if not line:
-                            continue
-
-                        # --- Clean to keep only the main token ---
-                        token = line.split()[0]       # before any space
-                        token = token.split('+')[0]   # before '+'
-                        token = token.split('_')[0]   # before '_'
-                        token = token.strip()
-
-                        if not token:
-                            continue
-
-                        dist = edit_distance(wx_word, token)
-                        closest_matches.append((fpath, token, dist))
-            except Exception:
-                pass
-
-    # Sort by smallest edit distance
-    closest_matches.sort(key=lambda x: x[2])
-    return closest_matches[:top_n]
-
-
-def main():
-    if len(sys.argv) != 4:
-        print("Usage: python process_pos_input.py category_map.py input.txt output.txt")
-        sys.exit(1)
-
-    map_file = sys.argv[1]
-    input_file = sys.argv[2]
-    output_file = sys.argv[3]
-
-    # Load mapping file dynamically
-    spec = importlib.util.spec_from_file_location("category_map", map_file)
-    category_map = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(category_map)
-    fs_dict = category_map.fs_dict_double
-
-    # Paradigm folders for each category
-    paradigm_folders = {
-        "n": os.path.join("paradigms", "Noun"),
-        "pn": os.path.join("paradigms", "Pronouns"),
-        "v": os.path.join("paradigms", "Verb"),
-    }
-
-    # Initialize WX converter
-    converter = WXC(order="utf2wx", lang="kan")
-
-    # Read input file
-    with open(input_file, "r", encoding="utf-8") as f:
-        lines = [line.strip() for line in f if line.strip()]
-
-    results = []
-
+    if lexicon is None:
+        lexicon = get_lexicon()
+    index = get_fuzzy_index(lexicon, paradigm_dir, engine, units=units, vowel_sign_cost=vowel_sign_cost,
+                            extra_roots=extra_roots, roots_key=roots_key)
+    if frequencies is not None:
+        return closest_by_frequency(index, wx_word, frequencies.scorer(lexicon, paradigm_dir),
+                                    top_n=top_n, max_distance=max_distance)
+    return index.closest(wx_word, top_n=top_n, max_distance=max_distance)
+
+
+def iter_ssf_tokens(lines, fs_dict):
+    """Yield (word, pos_tag, category) for every token to check in SSF lines."""
     for line in lines:
         parts = line.split()
         if len(parts) < 3:
@@ -204,70 +85,403 @@ def main():
         category = fs_dict.get(pos_tag)
         if not category:
             continue
+        yield word, pos_tag, category
 
-        # Convert word to WX
-        wx_word = converter.convert(word)
 
-        # Search inside paradigm folder
-        paradigm_dir = paradigm_folders.get(category)
-        # Defensive: if paradigm_dir is None/empty, skip direct search to avoid passing None to os.path.exists
-        if not paradigm_dir:
-            matches = []
-        else:
-            matches = search_in_paradigm_folder(wx_word, paradigm_dir)
-
-        # If no direct match → compute edit distances
-        if not matches:
-            closest = find_closest_words_in_files(wx_word, paradigm_dir, top_n=3)
-            if closest:
-                suggestion_text = "\n".join(
-                    [f"File: {fp}\nWord: {w}\nEdit Distance: {d}" for fp, w, d in closest]
-                )
-                match_text = (
-                    f"No exact match found for {word} ({wx_word})\n"
-                    f"Closest words found (based on edit distance):\n{suggestion_text}"
-                )
+def iter_tokens(input_file, fs_dict):
+    """Yield (word, pos_tag, category) for every token to check in an SSF file, reading it line by line."""
+    with open(input_file, "r", encoding="utf-8") as f:
+        yield from iter_ssf_tokens(f, fs_dict)
+
+
+def check_word(wx_word, paradigm_dir, lexicon, top_n=3, max_distance=None, engine=DEFAULT_ENGINE,
+               analyzer=None, category_index=None, category=None, units="wx", vowel_sign_cost=None,
+               frequencies=None, extra_roots=None, roots_key=None):
+    """Return (matches, closest) for one WX word: exact matches, else closest words.
+
+    With a CategoryIndex, a word that is not a form of the predicted
+    category is matched against the other categories (in the same probe)
+    before falling back to fuzzy search.
+    """
+    matches = []
+    if category_index is not None and analyzer is None:
+        _, entries = category_index.lookup(wx_word, category)
+        matches = [(e.fpath, e.base_word, e.token, e.lemma) for e in entries]
+    else:
+        # Defensive: if paradigm_dir is None/empty, skip the direct search
+        if paradigm_dir:
+            matches = search_in_paradigm_folder(wx_word, paradigm_dir, lexicon, analyzer)
+        if not matches and category_index is not None:
+            _, entries = category_index.lookup(wx_word, category)
+            matches = [(e.fpath, e.base_word, e.token, e.lemma) for e in entries]
+
+    # If no direct match → compute edit distances
+    closest = []
+    if not matches:
+        closest = find_closest_words_in_files(wx_word, paradigm_dir, top_n=top_n, lexicon=lexicon,
+                                              max_distance=max_distance, engine=engine,
+                                              units=units, vowel_sign_cost=vowel_sign_cost,
+                                              frequencies=frequencies, extra_roots=extra_roots,
+                                              roots_key=roots_key)
+    return matches, closest
+
+
+def format_match_text(word, wx_word, matches, closest, to_utf=None):
+    """Render the 'Matches / Base Words' block of the text output.
+
+    If to_utf is given (a WX -> Kannada function), suggestions are also
+    shown in Kannada script.
+    """
+    if not matches:
+        if closest:
+            suggestion_text = "\n".join(
+                [f"File: {fp}\nWord: {w}{f' ({to_utf(w)})' if to_utf else ''}\nEdit Distance: {d}"
+                 for fp, w, d in closest]
+            )
+            return (
+                f"No exact match found for {word} ({wx_word})\n"
+                f"Closest words found (based on edit distance):\n{suggestion_text}"
+            )
+        return f"No match found for {word} ({wx_word})"
+
+    match_lines = []
+    # matches may contain tuples in forms:
+    # (fpath, base) or (fpath, base, token) or (fpath, base, token, lemma)
+    for item in matches:
+        if len(item) == 4:
+            fpath, base, matched_token, lemma = item
+            if lemma:
+                match_lines.append(f"File: {fpath}\nBase File: {base}\nMatched Token: {matched_token}\nRoot/Lemma: {lemma}")
             else:
-                match_text = f"No match found for {word} ({wx_word})"
+                match_lines.append(f"File: {fpath}\nBase File: {base}\nMatched Token: {matched_token}")
+        elif len(item) == 3:
+            fpath, base, matched_token = item
+            match_lines.append(f"File: {fpath}\nBase File: {base}\nMatched Token: {matched_token}")
+        elif len(item) == 2:
+            fpath, base = item
+            match_lines.append(f"File: {fpath}\nBase File: {base}")
         else:
-            match_lines = []
-            # matches may contain tuples in forms:
-            # (fpath, base) or (fpath, base, token) or (fpath, base, token, lemma)
-            for item in matches:
-                if len(item) == 4:
-                    fpath, base, matched_token, lemma = item
-                    if lemma:
-                        match_lines.append(f"File: {fpath}\nBase File: {base}\nMatched Token: {matched_token}\nRoot/Lemma: {lemma}")
-                    else:
-                        match_lines.append(f"File: {fpath}\nBase File: {base}\nMatched Token: {matched_token}")
-                elif len(item) == 3:
-                    fpath, base, matched_token = item
-                    match_lines.append(f"File: {fpath}\nBase File: {base}\nMatched Token: {matched_token}")
-                elif len(item) == 2:
-                    fpath, base = item
-                    match_lines.append(f"File: {fpath}\nBase File: {base}")
-                else:
-                    match_lines.append(str(item))
-            match_text = "\n".join(match_lines)
-
-        results.append({
-            "word": word,
-            "wx": wx_word,
-            "pos_tag": pos_tag,
-            "category": category,
-            "matches": matches,
-            "result": match_text
-        })
-
-    # Write results to output file
-    with open(output_file, "w", encoding="utf-8") as out:
-        for r in results:
-            out.write(f"Word: {r['word']} → WX: {r['wx']}\n")
-            out.write(f"POS: {r['pos_tag']}, Category: {r['category']}\n")
-            out.write(f"Matches / Base Words:\n{r['result']}\n")
-            out.write("-" * 70 + "\n")
-
-    print(f"✅ Done! Checked paradigms and suggested closest words if needed. Output → {output_file}")
+            match_lines.append(str(item))
+    return "\n".join(match_lines)
+
+
+def write_text_result(out, word, wx_word, pos_tag, category, matched_category, matches, closest, to_utf=None):
+    """Write one token's block of the text output."""
+    out.write(f"Word: {word} → WX: {wx_word}\n")
+    out.write(f"POS: {pos_tag}, Category: {category}\n")
+    if matched_category != category:
+        out.write(f"Cross-category match: found in category {matched_category}, "
+                  f"not the predicted {category}\n")
+    out.write(f"Matches / Base Words:\n{format_match_text(word, wx_word, matches, closest, to_utf)}\n")
+    out.write("-" * 70 + "\n")
+
+
+def result_record(word, wx_word, pos_tag, category, matched_category, matches, closest, to_utf=None):
+    """Return one token's result as a JSON-serializable dict.
+
+    status is "match" (exact matches listed), "suggestions" (closest words,
+    best first) or "no_match".
+    """
+    record = {
+        "token": word,
+        "wx": wx_word,
+        "pos": pos_tag,
+        "category": category,
+        "matched_category": matched_category,
+        "status": "match" if matches else "suggestions" if closest else "no_match",
+        "matches": [dict(zip(("file", "base_word", "token", "lemma"), item)) for item in matches],
+        "suggestions": [],
+    }
+    for rank, (fpath, suggestion, distance) in enumerate(closest, 1):
+        record["suggestions"].append({"rank": rank, "file": fpath, "word": suggestion, "distance": distance})
+        if to_utf:
+            record["suggestions"][-1]["kannada"] = to_utf(suggestion)
+    return record
+
+
+def write_jsonl_result(out, *result):
+    """Write one token as a JSON object (result_record) on its own line."""
+    out.write(json.dumps(result_record(*result), ensure_ascii=False) + "\n")
+
+
+OUTPUT_FORMATS = {"text": write_text_result, "jsonl": write_jsonl_result}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check SSF tokens against the paradigm lexicon and suggest closest words",
+        usage="python check_pos.py category_map.py input.txt output.txt\n"
+              "       python check_pos.py --build-lexicon",
+    )
+    parser.add_argument("map_file", nargs="?", help="category_map.py with fs_dict_double")
+    parser.add_argument("input_file", nargs="?", help="SSF input file")
+    parser.add_argument("output_file", nargs="?", help="Output file ('-' for stdout)")
+    parser.add_argument("--build-lexicon", action="store_true",
+                        help="Compile the paradigm folders into the binary lexicon artifact and exit")
+    parser.add_argument("--lexicon", default=DEFAULT_ARTIFACT_PATH,
+                        help="Path of the compiled lexicon artifact (rebuilt automatically when stale)")
+    parser.add_argument("--fuzzy-engine", default=DEFAULT_ENGINE, choices=sorted(FUZZY_ENGINES),
+                        help="Search engine used for closest-word suggestions")
+    parser.add_argument("--max-distance", type=int, default=None,
+                        help="Only suggest words within this edit distance (default: unbounded)")
+    parser.add_argument("--distance-units", choices=["wx", "akshara"], default="wx",
+                        help="Count edits in WX letters or in Kannada aksharas")
+    parser.add_argument("--vowel-sign-cost", type=float, default=None,
+                        help="With --distance-units akshara: cost of a substitution that only changes "
+                             "the vowel sign (e.g. 0.5; needs --fuzzy-engine brute or bktree)")
+    parser.add_argument("--cache-size", type=int, default=100000,
+                        help="Maximum number of (wx_word, category) results kept in the LRU cache")
+    parser.add_argument("--cache-file", default=None,
+                        help="Persist the check cache in this JSON file across runs")
+    parser.add_argument("--extra-roots", default=None,
+                        help="File of 'category lemma exemplar' lines: roots recognized like an existing "
+                             "paradigm (exact matching then uses the suffix-trie analyzer, and the "
+                             "stem-suffix engine suggests them)")
+    parser.add_argument("--rank-by-frequency", action="store_true",
+                        help="Break ties between suggestions at the same distance by word frequency")
+    parser.add_argument("--frequency-store", default=DEFAULT_FREQUENCY_PATH,
+                        help="Path of the compiled frequency store (rebuilt automatically when stale)")
+    parser.add_argument("--build-frequencies", action="store_true",
+                        help="Compile the frequency store from --corpus and the Distribution sheets and exit")
+    parser.add_argument("--corpus", nargs="+", default=None,
+                        help="Text files whose word counts feed the frequency store "
+                             "(default: Input.txt sample_input.txt)")
+    parser.add_argument("--cross-category", action="store_true",
+                        help="If a word is not a form of its predicted category, accept an exact match "
+                             "from another category (noted in the output) before suggesting corrections")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Check words in this many forked worker processes (output is unchanged)")
+    parser.add_argument("--kannada-suggestions", action="store_true",
+                        help="Also print closest-word suggestions in Kannada script")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="text",
+                        help="Output format: text blocks, or one JSON object per token (jsonl)")
+    parser.add_argument("--batch-size", type=int, default=2000,
+                        help="Tokens read, checked and written per batch (memory does not grow "
+                             "with the input size)")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.vowel_sign_cost is not None:
+        if args.distance_units != "akshara":
+            parser.error("--vowel-sign-cost needs --distance-units akshara")
+        if args.fuzzy_engine not in WEIGHTED_ENGINES:
+            parser.error(f"--vowel-sign-cost needs --fuzzy-engine {' or '.join(WEIGHTED_ENGINES)}")
+        if not 0 < args.vowel_sign_cost < 1:
+            # cheaper than a full substitution, and positive so the BK-tree's triangle inequality holds
+            parser.error("--vowel-sign-cost must be between 0 and 1 (exclusive)")
+    return args
+
+
+def load_category_map(map_file):
+    """Return fs_dict_double (POS tag -> category) from a category_map.py file."""
+    spec = importlib.util.spec_from_file_location("category_map", map_file)
+    category_map = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(category_map)
+    return category_map.fs_dict_double
+
+
+class PosChecker:
+    """Everything a check_pos run needs, loaded once: lexicon, analyzers, indexes, cache and workers.
+
+    options are check_pos's parsed arguments (parse_args([]) for the
+    defaults). check_batch(), records() and write() can be called any number of
+    times, so a long-running caller keeps all of it loaded between inputs;
+    close() saves the cache file and stops the workers.
+    """
+
+    def __init__(self, options, log=sys.stdout, lexicon=None):
+        self.options = options
+        self.log = log
+        # Paradigm folders for each category, served from the mmap-ed compiled lexicon
+        # (or from the given lexicon, e.g. a WatchedLexicon)
+        self.paradigm_folders = PARADIGM_FOLDERS
+        self.lexicon = lexicon = lexicon or open_lexicon(options.lexicon)
+
+        # Table-driven WX converter (falls back to wxconv for unusual words)
+        self.converter = KannadaWX(max_memo=options.cache_size)
+
+        # Roots added on top of the paradigm files are recognized by the suffix-trie analyzer
+        self.analyzers = {}
+        self.roots_key = None
+        fingerprint = f"{lexicon_fingerprint(lexicon)}:{options.max_distance}"
+        if options.distance_units != "wx":
+            fingerprint += f":{options.distance_units}:{options.vowel_sign_cost}"
+        if options.extra_roots:
+            added = self.load_analyzers()
+            print(f"Added {added} roots from {options.extra_roots}", file=log)
+            fingerprint += ":" + self.roots_key
+
+        self.category_index = None
+        if options.cross_category:
+            self.category_index = CategoryIndex.from_lexicon(lexicon)
+            fingerprint += ":cross"
+
+        self.frequencies = None
+        if options.rank_by_frequency:
+            self.frequencies = open_frequency_store(lexicon, options.frequency_store, corpora=options.corpus)
+            fingerprint += f":freq:{self.frequencies.header['corpora']}"
+
+        self.cache = CheckCache(options.cache_size, fingerprint=fingerprint)
+        if options.cache_file:
+            self.cache.load(options.cache_file)
+
+        self.checker = None
+        if options.workers > 1:
+            # Load everything the workers need once, so they share it copy-on-write
+            for paradigm_dir in self.paradigm_folders.values():
+                if lexicon.entries(paradigm_dir):
+                    get_fuzzy_index(lexicon, paradigm_dir, options.fuzzy_engine, units=options.distance_units,
+                                    vowel_sign_cost=options.vowel_sign_cost, extra_roots=options.extra_roots,
+                                    roots_key=self.roots_key).warm_up()
+            self.checker = ParallelChecker(self.check, options.workers)
+
+        self.to_utf = self.converter.wx2utf if options.kannada_suggestions else None
+        self.token_count = self.lookup_count = 0
+
+    def load_analyzers(self):
+        """Get the suffix-trie analyzers with the --extra-roots added; returns the number of roots in the file.
+
+        They are cached with the lexicon under the roots file's hash
+        (roots_key), apart from the plain analyzers, and the stem-suffix
+        engine builds its index from the same ones.
+        """
+        path = self.options.extra_roots
+        added = len(list(read_extra_roots(path, self.paradigm_folders)))
+        self.roots_key = roots_file_key(path)
+        self.analyzers = {d: SuffixTrieAnalyzer.from_lexicon(self.lexicon, d, path, self.roots_key)
+                          for d in self.paradigm_folders.values()}
+        return added
+
+    def reload_lexicon(self):
+        """Bring everything derived from the lexicon up to date after its paradigm files changed.
+
+        Clears the result cache, rebuilds the analyzers with the extra roots
+        and reopens the frequency store (its scores are per entry, so it is
+        rebuilt for the new paradigm files).
+        """
+        self.cache.clear()
+        if self.options.extra_roots:
+            self.load_analyzers()
+        if self.frequencies is not None:
+            self.frequencies.close()
+            self.frequencies = open_frequency_store(self.lexicon, self.options.frequency_store,
+                                                    corpora=self.options.corpus)
+
+    def check(self, key):
+        wx_word, category = key
+        options = self.options
+        paradigm_dir = self.paradigm_folders.get(category)
+        return check_word(wx_word, paradigm_dir, self.lexicon, max_distance=options.max_distance,
+                          engine=options.fuzzy_engine, analyzer=self.analyzers.get(paradigm_dir),
+                          category_index=self.category_index, category=category,
+                          units=options.distance_units, vowel_sign_cost=options.vowel_sign_cost,
+                          frequencies=self.frequencies, extra_roots=options.extra_roots, roots_key=self.roots_key)
+
+    def check_batch(self, batch):
+        """Return (word, wx_word, pos_tag, category, matched_category, matches, closest) for every token of a batch."""
+        # Convert words to WX and resolve every distinct (wx_word, category) of the batch once
+        unique_words = list(dict.fromkeys(word for word, _, _ in batch))
+        wx_words = dict(zip(unique_words, self.converter.utf2wx_many(unique_words)))
+        keys = list(dict.fromkeys((wx_words[word], category) for word, _, category in batch))
+
+        resolved = {}
+        misses = []
+        for key in keys:
+            value = self.cache.get(key)
+            if value is None:
+                misses.append(key)
+            else:
+                resolved[key] = value
+        values = self.checker.map(misses) if self.checker else [self.check(key) for key in misses]
+        for key, value in zip(misses, values):
+            self.cache.put(key, value)
+            resolved[key] = value
+
+        results = []
+        for word, pos_tag, category in batch:
+            wx_word = wx_words[word]
+            matches, closest = resolved[(wx_word, category)]
+            matched_category = category
+            if self.category_index is not None and matches:
+                matched_category = self.category_index.category_of_path(matches[0][0]) or category
+            results.append((word, wx_word, pos_tag, category, matched_category, matches, closest))
+        self.token_count += len(batch)
+        self.lookup_count += len(keys)
+        return results
+
+    def records(self, tokens):
+        """Check a list of (word, pos_tag, category) tokens; returns result_record dicts."""
+        return [result_record(*result, self.to_utf) for result in self.check_batch(tokens)]
+
+    def write(self, tokens, out, output_format=None):
+        """Check (word, pos_tag, category) tokens a batch at a time, writing each batch's results to out.
+
+        Only one batch of tokens (plus the bounded cache) is held in memory.
+        """
+        write_result = OUTPUT_FORMATS[output_format or self.options.format]
+        tokens = iter(tokens)
+        while True:
+            batch = list(islice(tokens, self.options.batch_size))
+            if not batch:
+                break
+            for result in self.check_batch(batch):
+                write_result(out, *result, self.to_utf)
+            out.flush()
+
+    def close(self):
+        if self.checker:
+            self.checker.close()
+            self.checker = None
+        if self.options.cache_file:
+            self.cache.save(self.options.cache_file)
+
+    def summary(self):
+        lines = [f"   {self.token_count} tokens, {self.lookup_count} (wx, category) lookups; {self.cache.summary()}"]
+        if self.checker and self.checker.stats:
+            lines.append(format_worker_stats(self.checker.stats))
+        return "\n".join(lines)
+
+
+def main():
+    args = parse_args()
+
+    if args.build_lexicon:
+        start = time.perf_counter()
+        build_lexicon_artifact(args.lexicon)
+        print(f"✅ Built lexicon artifact → {args.lexicon} ({time.perf_counter() - start:.2f}s)")
+        if not args.map_file and not args.build_frequencies:
+            return
+
+    if args.build_frequencies:
+        start = time.perf_counter()
+        count = build_frequency_store(open_lexicon(args.lexicon), args.frequency_store, corpora=args.corpus)
+        print(f"✅ Built frequency store for {count} entries → {args.frequency_store} "
+              f"({time.perf_counter() - start:.2f}s)")
+        if not args.map_file:
+            return
+
+    if not (args.map_file and args.input_file and args.output_file):
+        print("Usage: python check_pos.py category_map.py input.txt output.txt")
+        sys.exit(1)
+
+    output_file = args.output_file
+    # With '-' the results stream to stdout, so progress messages go to stderr
+    to_stdout = output_file == "-"
+    log = sys.stderr if to_stdout else sys.stdout
+
+    fs_dict = load_category_map(args.map_file)
+    pos_checker = PosChecker(args, log)
+    out = sys.stdout if to_stdout else open(output_file, "w", encoding="utf-8")
+    try:
+        pos_checker.write(iter_tokens(args.input_file, fs_dict), out)
+    finally:
+        if not to_stdout:
+            out.close()
+        worker_summary = pos_checker.summary()
+        pos_checker.close()
+
+    print(f"✅ Done! Checked paradigms and suggested closest words if needed. Output → {output_file}", file=log)
+    print(worker_summary, file=log)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+import os
+import re
+import sys
+import json
+import mmap
+import heapq
+import tempfile
+from array import array
+from collections import Counter
+
+from lexicon_store import lexicon_fingerprint
+from transliterate import KannadaWX
+
+
+# ----------- Compact frequency store -----------
+# python check_pos.py --build-frequencies
+#
+# One uint32 score per lexicon entry, in entry-ID order (the scan order of
+# the folders, as in the compiled lexicon):
+#   score = min(corpus count of the form, 2**20 - 1) << 12
+#         | min(roots sharing the entry's paradigm, 4095)
+# so corpus frequency dominates and the paradigm's size (from the
+# *Distribution*.xlsx sheets) breaks ties between unseen forms.
+#
+# Layout: MAGIC | u32 version | u32 header length | header JSON | padding
+#         | uint32[entries]
+# The header records the lexicon fingerprint, so a store built for other
+# paradigm files is detected as stale.
+# -----------------------------------------------
+
+FREQ_MAGIC = b"KNPFREQ\0"
+FREQ_VERSION = 1
+DEFAULT_FREQUENCY_PATH = os.path.join("paradigms", "paradigm_frequencies.bin")
+DEFAULT_CORPORA = ["Input.txt", "sample_input.txt"]
+DEFAULT_SHEETS = [os.path.join("check_pos", "Verb Distribution.xlsx"),
+                  os.path.join("check_pos", "Pronoun Distribution .xlsx")]
+
+_KANNADA_RUN = re.compile("[ಀ-೿]+")
+
+
+def corpus_counts(paths, converter=None):
+    """Counter of WX forms over every Kannada word in the given text files (missing files are skipped)."""
+    converter = converter or KannadaWX()
+    counts = Counter()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                counts.update(converter.utf2wx(w) for w in _KANNADA_RUN.findall(line))
+    return counts
+
+
+def paradigm_sizes(sheet_paths):
+    """{exemplar lemma: number of roots listed under it} from the Distribution sheets.
+
+    Each sheet has one column per paradigm: a header (VP1, PN1, ...), the
+    exemplar root, then the other roots that inflect the same way.
+    """
+    from openpyxl import load_workbook  # only needed when building the store
+
+    sizes = {}
+    for path in sheet_paths:
+        if not os.path.exists(path):
+            continue
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        for sheet in workbook.worksheets:
+            rows = list(sheet.iter_rows(values_only=True))
+            if len(rows) < 2:
+                continue
+            for column in range(1, len(rows[1])):
+                exemplar = rows[1][column]
+                if not isinstance(exemplar, str) or not exemplar.strip():
+                    continue
+                roots = [row[column] for row in rows[1:] if column < len(row) and row[column] is not None
+                         and str(row[column]).strip()]
+                sizes[exemplar.strip()] = len(roots)
+        workbook.close()
+    return sizes
+
+
+def build_frequency_store(lexicon, path=DEFAULT_FREQUENCY_PATH, corpora=None, sheets=None):
+    """Score every lexicon entry and write the store atomically to path; returns the entry count."""
+    corpora = DEFAULT_CORPORA if corpora is None else corpora
+    sheets = DEFAULT_SHEETS if sheets is None else sheets
+    counts = corpus_counts(corpora)
+    sizes = paradigm_sizes(sheets)
+
+    scores = array("I")
+    for paradigm_dir in lexicon.folders.values():
+        file_size = {}
+        for entry in lexicon.entries(paradigm_dir):
+            if entry.fpath not in file_size:
+                file_size[entry.fpath] = sizes.get(entry.lemma, 0)
+            scores.append((min(counts[entry.token], 0xFFFFF) << 12) | min(file_size[entry.fpath], 0xFFF))
+
+    header = json.dumps({
+        "version": FREQ_VERSION,
+        "byteorder": sys.byteorder,
+        "lexicon": lexicon_fingerprint(lexicon),
+        "entries": len(scores),
+        "corpora": corpora,
+        "sheets": sheets,
+    }).encode("utf-8")
+    prefix = FREQ_MAGIC + array("I", [FREQ_VERSION, len(header)]).tobytes() + header
+    prefix += b"\0" * (-len(prefix) % 8)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".paradigm_frequencies_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(prefix)
+            out.write(scores.tobytes())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(scores)
+
+
+class FrequencyStore:
+    """mmap-ed entry scores; score(entry_id) is one array read."""
+
+    def __init__(self, path=DEFAULT_FREQUENCY_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mm[:len(FREQ_MAGIC)] != FREQ_MAGIC:
+                raise ValueError(f"Not a frequency store: {path}")
+            version, header_len = array("I", self._mm[len(FREQ_MAGIC):len(FREQ_MAGIC) + 8])
+            if version != FREQ_VERSION:
+                raise ValueError(f"Unsupported frequency store version {version} (expected {FREQ_VERSION})")
+            start = len(FREQ_MAGIC) + 8
+            self.header = json.loads(self._mm[start:start + header_len].decode("utf-8"))
+            if self.header["byteorder"] != sys.byteorder:
+                raise ValueError("Frequency store was built on a machine with a different byte order")
+            data_start = start + header_len + (-(start + header_len) % 8)
+            self._view = memoryview(self._mm)[data_start:data_start + 4 * self.header["entries"]]
+            self.scores = self._view.cast("I")
+        except Exception:
+            self.close()
+            raise
+        self._keys = {}
+
+    def close(self):
+        for name in ("scores", "_view"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mm.close()
+
+    def score(self, entry_id):
+        return self.scores[entry_id]
+
+    def scorer(self, lexicon, paradigm_dir):
+        """Return score(fpath, token) for suggestions from one folder (first entry of that form in the file)."""
+        if paradigm_dir not in self._keys:
+            first_id = 0
+            for folder in lexicon.folders.values():
+                if folder == paradigm_dir:
+                    break
+                first_id += len(lexicon.entries(folder))
+            keys = {}
+            for i, entry in enumerate(lexicon.entries(paradigm_dir) if paradigm_dir else [], first_id):
+                keys.setdefault((entry.fpath, entry.token), i)
+            self._keys[paradigm_dir] = keys
+        keys = self._keys[paradigm_dir]
+        return lambda fpath, token: self.scores[keys[(fpath, token)]] if (fpath, token) in keys else 0
+
+
+def open_frequency_store(lexicon, path=DEFAULT_FREQUENCY_PATH, corpora=None, sheets=None, rebuild=True):
+    """Open the frequency store, (re)building it when missing or built for other paradigm files or corpora."""
+    wanted = DEFAULT_CORPORA if corpora is None else corpora
+    try:
+        store = FrequencyStore(path)
+        if not rebuild or (store.header["lexicon"] == lexicon_fingerprint(lexicon)
+                           and store.header["corpora"] == wanted):
+            return store
+        store.close()
+    except (OSError, ValueError, KeyError):
+        if not rebuild:
+            raise
+    build_frequency_store(lexicon, path, corpora, sheets)
+    return FrequencyStore(path)
+
+
+def closest_by_frequency(index, wx_word, score, top_n=3, max_distance=None, limit=None):
+    """Like index.closest, but ties on distance go to the more frequent form (then scan order).
+
+    The first query finds the top_n-th distance D; the second fetches every
+    suggestion within D, which the engine ranks in full (up to limit
+    candidates; None: no cap, so a common D can mean much of the folder).
+    The heap (heapq.nsmallest) only does the final frequency-aware pick of
+    top_n among them.
+    """
+    first = index.closest(wx_word, top_n=top_n, max_distance=max_distance)
+    if len(first) < top_n:
+        candidates = first
+    else:
+        candidates = index.closest(wx_word, top_n=limit or sys.maxsize, max_distance=first[-1][2])
+    best = heapq.nsmallest(top_n, enumerate(candidates),
+                           key=lambda c: (c[1][2], -score(c[1][0], c[1][1]), c[0]))
+    return [candidate for _, candidate in best]
@@ -0,0 +1,298 @@
+from akshara import AksharaCodec
+from batched_distance import PackedForms, np, require_numpy
+from bk_tree import BKTree
+from levenshtein import edit_distance
+from morph_analyzer import SuffixTrieAnalyzer
+from symspell import build_deletion_index
+from trie import ArrayTrie
+
+
+# ----------- Fuzzy search engines -----------
+# Every engine is built once per paradigm folder from the lexicon entries
+# (in scan order) and answers closest(wx_word, top_n, max_distance) with
+# [(file_path, found_word, distance), ...]. Ties on distance keep scan
+# order, so all engines return the same triples as the brute-force scan.
+# --------------------------------------------
+
+
+class FuzzyIndex:
+    """Base class: engines are built from a folder's entries in scan order."""
+
+    name = None
+
+    @classmethod
+    def from_lexicon(cls, lexicon, paradigm_dir, distance=edit_distance):
+        return cls(lexicon.entries(paradigm_dir), distance)
+
+    def warm_up(self):
+        """Build anything the engine would otherwise build lazily on first use."""
+
+    def _positions_by_token(self):
+        positions = {}
+        for pos, e in enumerate(self.entries):
+            positions.setdefault(e.token, []).append(pos)
+        return positions
+
+
+class BruteForceIndex(FuzzyIndex):
+    """Score the query against every entry and sort (the original behaviour)."""
+
+    name = "brute"
+
+    def __init__(self, entries, distance=edit_distance):
+        self.entries = entries
+        self.distance = distance
+
+    def closest(self, wx_word, top_n=3, max_distance=None):
+        closest_matches = [(e.fpath, e.token, self.distance(wx_word, e.token, max_distance)) for e in self.entries]
+        if max_distance is not None:
+            closest_matches = [m for m in closest_matches if m[2] <= max_distance]
+        # Sort by smallest edit distance (stable, so ties keep scan order)
+        closest_matches.sort(key=lambda x: x[2])
+        return closest_matches[:top_n]
+
+
+class BKTreeIndex(FuzzyIndex):
+    """BK-tree over the distinct forms of a folder; payloads are scan positions."""
+
+    name = "bktree"
+
+    def __init__(self, entries, distance=edit_distance):
+        self.entries = entries
+        self.tree = BKTree(distance)
+        for pos, e in enumerate(entries):
+            self.tree.add(e.token, pos)
+
+    def closest(self, wx_word, top_n=3, max_distance=None):
+        hits = self.tree.search(wx_word, max_distance=max_distance, top_k=top_n)
+        return [(self.entries[pos].fpath, self.entries[pos].token, d) for d, pos in hits]
+
+
+class TrieIndex(FuzzyIndex):
+    """Array-backed trie with Levenshtein-row traversal; payloads are scan positions."""
+
+    name = "trie"
+
+    def __init__(self, entries, distance=edit_distance):
+        self.entries = entries
+        positions = self._positions_by_token()
+        self.trie = ArrayTrie(list(positions), list(positions.values()))
+
+    def closest(self, wx_word, top_n=3, max_distance=None):
+        hits = self.trie.search(wx_word, max_distance=max_distance, top_k=top_n)
+        return [(self.entries[pos].fpath, self.entries[pos].token, d) for d, pos in hits]
+
+
+class NumpyIndex(FuzzyIndex):
+    """Vectorized DP of the query against all distinct forms of a folder at once."""
+
+    name = "numpy"
+
+    def __init__(self, entries, distance=edit_distance):
+        require_numpy()
+        self.entries = entries
+        forms = {}
+        self.entry_form = np.fromiter((forms.setdefault(e.token, len(forms)) for e in entries),
+                                      dtype=np.int32, count=len(entries))
+        self.forms = PackedForms(list(forms))
+
+    def closest(self, wx_word, top_n=3, max_distance=None):
+        if not self.entries:
+            return []
+        dist = self.forms.distances(wx_word)[self.entry_form]
+        # Stable sort keeps scan order for ties, like the brute-force scan
+        order = np.argsort(dist, kind="stable")[:top_n]
+        if max_distance is not None:
+            order = order[dist[order] <= max_distance]
+        return [(self.entries[pos].fpath, self.entries[pos].token, int(dist[pos])) for pos in order]
+
+
+class SymSpellIndex(FuzzyIndex):
+    """SymSpell lookup: candidates come from the precomputed deletion index.
+
+    Every form within deletions.max_edits of the query is found, so when at
+    least top_n entries lie within that distance (or max_distance is no
+    larger) the result is exact and costs a few dozen hash probes. Otherwise
+    the query is answered by the fallback engine (the trie by default),
+    which is only built the first time it is needed.
+    """
+
+    name = "symspell"
+
+    def __init__(self, entries, distance=edit_distance, deletions=None, fallback=None):
+        self.entries = entries
+        self.distance = distance
+        if deletions is None:
+            deletions = build_deletion_index(sorted({e.token for e in entries}))
+        self.deletions = deletions
+        self.fallback = fallback or (lambda: TrieIndex(entries, distance))
+        self._fallback_index = None
+        self.positions = self._positions_by_token()
+
+    @classmethod
+    def from_lexicon(cls, lexicon, paradigm_dir, distance=edit_distance):
+        return cls(lexicon.entries(paradigm_dir), distance,
+                   deletions=lexicon.deletion_index(paradigm_dir),
+                   fallback=lambda: get_fuzzy_index(lexicon, paradigm_dir, TrieIndex.name, distance))
+
+    def warm_up(self):
+        if self._fallback_index is None:
+            self._fallback_index = self.fallback()
+
+    def closest(self, wx_word, top_n=3, max_distance=None):
+        limit = self.deletions.max_edits
+        if max_distance is not None and max_distance < limit:
+            limit = max_distance
+        hits = []
+        for token in self.deletions.candidates(wx_word):
+            d = self.distance(wx_word, token, limit)
+            if d <= limit:
+                hits.extend((d, pos) for pos in self.positions[token])
+        hits.sort()
+        exact = len(hits) >= top_n or (max_distance is not None and max_distance <= self.deletions.max_edits)
+        if not exact:
+            if self._fallback_index is None:
+                self._fallback_index = self.fallback()
+            return self._fallback_index.closest(wx_word, top_n=top_n, max_distance=max_distance)
+        return [(self.entries[pos].fpath, self.entries[pos].token, d) for d, pos in hits[:top_n]]
+
+
+class StemSuffixIndex(FuzzyIndex):
+    """Corrects stem and suffix separately using the paradigm classes of a SuffixTrieAnalyzer.
+
+    Every form is stem + a surface suffix of its root's class, so for each
+    split q = q[:i] + q[i:] the stem part is matched against the few root
+    stems and the suffix part against the suffix trie, within a shared
+    budget B. Any form within distance B of q is stem + suffix with
+    d(q[:i], stem) + d(q[i:], suffix) <= B for some split, so the candidates
+    are complete; they are re-scored with the full distance and ordered like
+    the scan (root, then line). Without max_distance, B grows until top_n
+    forms are within it.
+    """
+
+    name = "stem-suffix"
+
+    def __init__(self, entries, distance=edit_distance, analyzer=None):
+        self.distance = distance
+        self.analyzer = analyzer or SuffixTrieAnalyzer.from_entries(entries)
+        self.class_rows = [self.analyzer.suffix_rows(c) for c in range(len(self.analyzer.classes))]
+        suffixes = sorted({suffix for rows in self.class_rows for suffix in rows})
+        self.suffixes = suffixes
+        self.suffix_trie = ArrayTrie(suffixes, [[i] for i in range(len(suffixes))])
+        self.longest_suffix = max((len(s) for s in suffixes), default=0)
+        self.longest_form = max((len(stem) for stem, _, _ in self.analyzer.roots()), default=0) + self.longest_suffix
+
+    @classmethod
+    def from_lexicon(cls, lexicon, paradigm_dir, distance=edit_distance, extra_roots=None, roots_key=None):
+        return cls(lexicon.entries(paradigm_dir), distance,
+                   analyzer=SuffixTrieAnalyzer.from_lexicon(lexicon, paradigm_dir, extra_roots, roots_key))
+
+    def _within(self, wx_word, budget):
+        """{(root_id, row): (fpath, form)} for every form that could lie within budget."""
+        roots = self.analyzer.roots()
+        found = {}
+        for i in range(len(wx_word) + 1):
+            head, tail = wx_word[:i], wx_word[i:]
+            stem_hits = []
+            for root_id, (stem, class_id, fpath) in enumerate(roots):
+                d = self.distance(head, stem, budget)
+                if d <= budget:
+                    stem_hits.append((d, root_id, stem, class_id, fpath))
+            if not stem_hits:
+                continue
+            radius = budget - min(hit[0] for hit in stem_hits)
+            suffix_hits = self.suffix_trie.search(tail, max_distance=radius)
+            for d_stem, root_id, stem, class_id, fpath in stem_hits:
+                rows = self.class_rows[class_id]
+                for d_suffix, suffix_id in suffix_hits:
+                    if d_stem + d_suffix > budget:
+                        break
+                    suffix = self.suffixes[suffix_id]
+                    for row in rows.get(suffix, ()):
+                        found[(root_id, row)] = (fpath, stem + suffix)
+        return found
+
+    def closest(self, wx_word, top_n=3, max_distance=None):
+        if not self.suffixes:
+            return []
+        budget = max_distance if max_distance is not None else min(2, self.longest_form)
+        while True:
+            scored = []
+            for position, (fpath, form) in self._within(wx_word, budget).items():
+                d = self.distance(wx_word, form, budget)
+                if d <= budget:
+                    scored.append((d, position, fpath, form))
+            if max_distance is not None or len(scored) >= top_n or budget >= len(wx_word) + self.longest_form:
+                break
+            budget *= 2
+        scored.sort()
+        return [(fpath, form, d) for d, _, fpath, form in scored[:top_n]]
+
+
+FUZZY_ENGINES = {
+    BruteForceIndex.name: BruteForceIndex,
+    BKTreeIndex.name: BKTreeIndex,
+    TrieIndex.name: TrieIndex,
+    NumpyIndex.name: NumpyIndex,
+    SymSpellIndex.name: SymSpellIndex,
+    StemSuffixIndex.name: StemSuffixIndex,
+}
+DEFAULT_ENGINE = SymSpellIndex.name
+
+
+# Engines whose results stay exact for any metric passed as `distance`
+WEIGHTED_ENGINES = (BruteForceIndex.name, BKTreeIndex.name)
+
+
+class AksharaIndex(FuzzyIndex):
+    """Runs an engine on akshara-encoded forms (see akshara.py) and maps results back to WX.
+
+    Lexicon forms are segmented once, when the index is built. With
+    vowel_sign_cost, substitutions that only change a vowel sign cost less
+    than 1; only engines that take an arbitrary metric support that.
+    """
+
+    name = "akshara"
+
+    def __init__(self, entries, engine=DEFAULT_ENGINE, codec=None, vowel_sign_cost=None):
+        self.codec = codec or AksharaCodec()
+        distance = edit_distance
+        if vowel_sign_cost is not None:
+            if engine not in WEIGHTED_ENGINES:
+                raise ValueError(f"Vowel-sign costs need one of the {', '.join(WEIGHTED_ENGINES)} engines, not {engine}")
+            distance = self.codec.weighted_distance(vowel_sign_cost)
+        encoded = [e._replace(token=self.codec.encode(e.token)) for e in entries]
+        self.inner = FUZZY_ENGINES[engine](encoded, distance)
+
+    @classmethod
+    def from_lexicon(cls, lexicon, paradigm_dir, engine=DEFAULT_ENGINE, vowel_sign_cost=None):
+        codec = lexicon.derived_index("akshara-codec", None, AksharaCodec)
+        return cls(lexicon.entries(paradigm_dir), engine, codec, vowel_sign_cost)
+
+    def warm_up(self):
+        self.inner.warm_up()
+
+    def closest(self, wx_word, top_n=3, max_distance=None):
+        hits = self.inner.closest(self.codec.encode(wx_word), top_n=top_n, max_distance=max_distance)
+        return [(fpath, self.codec.decode(token), d) for fpath, token, d in hits]
+
+
+def get_fuzzy_index(lexicon, paradigm_dir, engine, distance=edit_distance, units="wx", vowel_sign_cost=None,
+                    extra_roots=None, roots_key=None):
+    """Return the engine's index for a folder, built once and cached on the lexicon.
+
+    units="akshara" measures distances in aksharas instead of WX letters.
+    extra_roots (with roots_key, see SuffixTrieAnalyzer.from_lexicon) adds
+    the roots of that file to the stem-suffix engine's index; the other
+    engines only search the paradigm files.
+    """
+    if extra_roots and engine == StemSuffixIndex.name and units == "wx":
+        return lexicon.derived_index(
+            (engine, roots_key), paradigm_dir,
+            lambda: StemSuffixIndex.from_lexicon(lexicon, paradigm_dir, distance, extra_roots, roots_key))
+    if units == "akshara":
+        return lexicon.derived_index(
+            ("akshara", engine, vowel_sign_cost), paradigm_dir,
+            lambda: AksharaIndex.from_lexicon(lexicon, paradigm_dir, engine, vowel_sign_cost))
+    engine_cls = FUZZY_ENGINES[engine]
+    return lexicon.derived_index(engine, paradigm_dir, lambda: engine_cls.from_lexicon(lexicon, paradigm_dir, distance))
@@ -0,0 +1,98 @@
+# -------------------------------------------------------
+# Iterative Levenshtein kernel used by every fuzzy path
+# -------------------------------------------------------
+
+
+def edit_distance(s: str, t: str, max_distance=None):
+    """
+    Levenshtein distance between s and t (unit insert/delete/substitute).
+
+    Iterative two-row DP: O(len(s)·len(t)) time, O(min(len)) memory, no
+    recursion and no substring allocation. Returns the same distances as
+    the old recursive memoized EDIT-DISTANCE(s, t, h).
+
+    With max_distance=k only the diagonal band |i - j| <= k is computed
+    (Ukkonen) and the function returns k + 1 as soon as the distance is
+    known to exceed k, so callers must treat any value > k as "too far".
+    """
+    if s == t:
+        return 0
+
+    # A shared prefix or suffix never changes the distance
+    start = 0
+    stop = min(len(s), len(t))
+    while start < stop and s[start] == t[start]:
+        start += 1
+    end_s, end_t = len(s), len(t)
+    while end_s > start and end_t > start and s[end_s - 1] == t[end_t - 1]:
+        end_s -= 1
+        end_t -= 1
+    s = s[start:end_s]
+    t = t[start:end_t]
+
+    # Keep the shorter string in the inner loop
+    if len(s) > len(t):
+        s, t = t, s
+    n, m = len(s), len(t)
+
+    if max_distance is None:
+        if n == 0:
+            return m
+        return _full_distance(s, t)
+
+    if m - n > max_distance:
+        return max_distance + 1
+    if n == 0:
+        return m
+    return _banded_distance(s, t, max_distance)
+
+
+def _full_distance(s, t):
+    previous = list(range(len(s) + 1))
+    for i, tc in enumerate(t, 1):
+        current = [i]
+        left = i
+        for j, sc in enumerate(s, 1):
+            diag = previous[j - 1] if sc == tc else previous[j - 1] + 1
+            up = previous[j] + 1
+            if up < diag:
+                diag = up
+            left += 1
+            if left < diag:
+                diag = left
+            current.append(diag)
+            left = diag
+        previous = current
+    return previous[-1]
+
+
+def _banded_distance(s, t, k):
+    n = len(s)
+    big = k + 1
+    previous = [j if j <= k else big for j in range(n + 1)]
+    for i, tc in enumerate(t, 1):
+        lo = i - k if i > k else 1
+        hi = i + k if i + k < n else n
+        current = [big] * (n + 1)
+        if i <= k:
+            current[0] = i
+        left = current[lo - 1]
+        row_min = left
+        for j in range(lo, hi + 1):
+            diag = previous[j - 1] if s[j - 1] == tc else previous[j - 1] + 1
+            up = previous[j] + 1
+            if up < diag:
+                diag = up
+            left += 1
+            if left < diag:
+                diag = left
+            if diag > big:
+                diag = big
+            current[j] = diag
+            left = diag
+            if diag < row_min:
+                row_min = diag
+        if row_min > k:
+            return big
+        previous = current
+    return previous[n]
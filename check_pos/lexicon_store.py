@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import mmap
+import hashlib
+import bisect
+import tempfile
+from array import array
+
+from symspell import DEFAULT_MAX_EDITS, DeletionIndex, build_deletion_arrays
+from paradigm_lexicon import PARADIGM_FOLDERS, DerivedIndexCache, LexiconEntry, ParadigmLexicon, iter_paradigm_files, iter_paradigm_entries
+
+
+# ----------- Compiled lexicon artifact -----------
+# python check_pos.py --build-lexicon
+#
+# Layout (all integers are native-endian uint32, recorded in the manifest):
+#   MAGIC | u32 version | u32 manifest length | manifest JSON | padding
+#   followed by the sections listed in the manifest:
+#     str_offsets, str_blob          interned UTF-8 strings (paths, forms, lemmas, analyses)
+#     file_path, file_base           string ids per paradigm file
+#     entry_file, entry_token,
+#     entry_lemma, entry_analysis    one row per paradigm line, in scan order
+#     form_token, form_post          sorted unique forms per folder -> postings range
+#     postings                       entry ids (first matching line of each file)
+#     del_hash, del_form             SymSpell deletes (crc32, sorted) -> form index
+# -------------------------------------------------
+
+MAGIC = b"KNPLEX\0\0"
+ARTIFACT_VERSION = 2
+DEFAULT_ARTIFACT_PATH = os.path.join("paradigms", "paradigm_lexicon.bin")
+NO_STRING = 0xFFFFFFFF
+
+
+def source_manifest(folders):
+    """Return [[paradigm_dir, fpath, mtime_ns, size], ...] for every paradigm file, in scan order."""
+    sources = []
+    for paradigm_dir in folders.values():
+        if not paradigm_dir or not os.path.exists(paradigm_dir):
+            continue
+        for fpath, _ in iter_paradigm_files(paradigm_dir):
+            try:
+                st = os.stat(fpath)
+            except OSError:
+                continue
+            sources.append([paradigm_dir, fpath, st.st_mtime_ns, st.st_size])
+    return sources
+
+
+def lexicon_fingerprint(lexicon):
+    """Short hash identifying the paradigm sources a lexicon serves (changes with any file edit)."""
+    sources = json.dumps([ARTIFACT_VERSION, sorted(lexicon.folders.items()), source_manifest(lexicon.folders)])
+    return hashlib.sha1(sources.encode("utf-8")).hexdigest()[:16]
+
+
+class _StringTable:
+    """Intern strings into ids for the artifact's string section."""
+
+    def __init__(self):
+        self.ids = {}
+        self.blob = bytearray()
+        self.offsets = array("I", [0])
+
+    def add(self, s):
+        if s is None:
+            return NO_STRING
+        sid = self.ids.get(s)
+        if sid is None:
+            sid = len(self.offsets) - 1
+            self.ids[s] = sid
+            self.blob += s.encode("utf-8")
+            self.offsets.append(len(self.blob))
+        return sid
+
+
+def build_lexicon_artifact(path=DEFAULT_ARTIFACT_PATH, folders=None, max_edits=DEFAULT_MAX_EDITS):
+    """Compile the paradigm folders into a single binary artifact at path.
+
+    max_edits sets the delete depth of the stored SymSpell index.
+
+    The file is written to a temporary name and atomically renamed, so
+    concurrent readers never observe a partial artifact.
+    """
+    folders = dict(PARADIGM_FOLDERS if folders is None else folders)
+    sources = source_manifest(folders)
+
+    strings = _StringTable()
+    file_ids = {}
+    file_path, file_base = array("I"), array("I")
+    entry_file, entry_token, entry_lemma, entry_analysis = array("I"), array("I"), array("I"), array("I")
+    form_token, form_post, postings = array("I"), array("I", [0]), array("I")
+    del_hash, del_form = array("I"), array("I")
+    folder_ranges = {}
+
+    for category, paradigm_dir in folders.items():
+        entry_start, form_start = len(entry_file), len(form_token)
+        first_per_file = {}
+        if paradigm_dir and os.path.exists(paradigm_dir):
+            for entry in iter_paradigm_entries(paradigm_dir):
+                fid = file_ids.get(entry.fpath)
+                if fid is None:
+                    fid = file_ids[entry.fpath] = len(file_path)
+                    file_path.append(strings.add(entry.fpath))
+                    file_base.append(strings.add(entry.base_word))
+                eid = len(entry_file)
+                entry_file.append(fid)
+                entry_token.append(strings.add(entry.token))
+                entry_lemma.append(strings.add(entry.lemma))
+                entry_analysis.append(strings.add(entry.analysis))
+                matches = first_per_file.setdefault(entry.token, [])
+                if not matches or entry_file[matches[-1]] != fid:
+                    matches.append(eid)
+        sorted_forms = sorted(first_per_file, key=lambda t: t.encode("utf-8"))
+        for token in sorted_forms:
+            form_token.append(strings.ids[token])
+            postings.extend(first_per_file[token])
+            form_post.append(len(postings))
+        delete_start = len(del_hash)
+        hashes, form_ids = build_deletion_arrays(sorted_forms, max_edits, first_id=form_start)
+        del_hash.extend(hashes)
+        del_form.extend(form_ids)
+        folder_ranges[paradigm_dir] = {
+            "category": category,
+            "entries": [entry_start, len(entry_file)],
+            "forms": [form_start, len(form_token)],
+            "deletes": [delete_start, len(del_hash)],
+        }
+
+    sections = [
+        ("str_offsets", strings.offsets.tobytes()),
+        ("str_blob", bytes(strings.blob)),
+        ("file_path", file_path.tobytes()),
+        ("file_base", file_base.tobytes()),
+        ("entry_file", entry_file.tobytes()),
+        ("entry_token", entry_token.tobytes()),
+        ("entry_lemma", entry_lemma.tobytes()),
+        ("entry_analysis", entry_analysis.tobytes()),
+        ("form_token", form_token.tobytes()),
+        ("form_post", form_post.tobytes()),
+        ("postings", postings.tobytes()),
+        ("del_hash", del_hash.tobytes()),
+        ("del_form", del_form.tobytes()),
+    ]
+    layout = {}
+    offset = 0
+    for name, data in sections:
+        layout[name] = [offset, len(data)]
+        offset += len(data) + (-len(data) % 8)
+
+    manifest = json.dumps({
+        "version": ARTIFACT_VERSION,
+        "byteorder": sys.byteorder,
+        "folders": folder_ranges,
+        "symspell_max_edits": max_edits,
+        "sources": sources,
+        "sections": layout,
+    }).encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".paradigm_lexicon_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(MAGIC)
+            out.write(array("I", [ARTIFACT_VERSION, len(manifest)]).tobytes())
+            out.write(manifest)
+            out.write(b"\0" * (-(len(MAGIC) + 8 + len(manifest)) % 8))
+            for _, data in sections:
+                out.write(data)
+                out.write(b"\0" * (-len(data) % 8))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+class CompiledLexicon(DerivedIndexCache):
+    """Read-only ParadigmLexicon backed by an mmap of the compiled artifact.
+
+    Exact lookups binary-search the sorted forms directly in the mapped
+    pages, so startup costs one mmap and concurrent processes share the
+    page cache. Full entry lists (for fuzzy search) are materialised per
+    folder on first use.
+    """
+
+    def __init__(self, path=DEFAULT_ARTIFACT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+        self._entries = {}
+        self._derived = {}
+
+    def _parse_header(self):
+        mm = self._mm
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a paradigm lexicon artifact: {self.path}")
+        version, manifest_len = array("I", mm[len(MAGIC):len(MAGIC) + 8])
+        if version != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported lexicon artifact version {version} (expected {ARTIFACT_VERSION})")
+        start = len(MAGIC) + 8
+        self.manifest = json.loads(mm[start:start + manifest_len].decode("utf-8"))
+        if self.manifest["byteorder"] != sys.byteorder:
+            raise ValueError("Lexicon artifact was built on a machine with a different byte order")
+        data_start = start + manifest_len + (-(start + manifest_len) % 8)
+
+        view = memoryview(mm)
+        self._views = [view]
+        for name, (offset, length) in self.manifest["sections"].items():
+            section = view[data_start + offset:data_start + offset + length]
+            if name != "str_blob":
+                section = section.cast("I")
+            self._views.append(section)
+            setattr(self, "_" + name, section)
+        self.folders = {r["category"]: d for d, r in self.manifest["folders"].items()}
+
+    def close(self):
+        for v in reversed(getattr(self, "_views", [])):
+            v.release()
+        self._views = []
+        self._mm.close()
+
+    def sources(self):
+        return self.manifest["sources"]
+
+    def _string(self, sid):
+        if sid == NO_STRING:
+            return None
+        return bytes(self._str_blob[self._str_offsets[sid]:self._str_offsets[sid + 1]]).decode("utf-8")
+
+    def _entry(self, eid):
+        fid = self._entry_file[eid]
+        return LexiconEntry(
+            self._string(self._file_path[fid]),
+            self._string(self._file_base[fid]),
+            self._string(self._entry_token[eid]),
+            self._string(self._entry_lemma[eid]),
+            self._string(self._entry_analysis[eid]),
+        )
+
+    def _form_bytes(self, i):
+        sid = self._form_token[i]
+        return bytes(self._str_blob[self._str_offsets[sid]:self._str_offsets[sid + 1]])
+
+    def lookup(self, wx_word, paradigm_dir):
+        """Return the LexiconEntry list for an exact WX form (binary search over sorted forms)."""
+        ranges = self.manifest["folders"].get(paradigm_dir)
+        if not ranges:
+            return []
+        lo, hi = ranges["forms"]
+        key = wx_word.encode("utf-8")
+        i = bisect.bisect_left(_FormKeys(self), key, lo, hi)
+        if i == hi or self._form_bytes(i) != key:
+            return []
+        return [self._entry(eid) for eid in self._postings[self._form_post[i]:self._form_post[i + 1]]]
+
+    def entries(self, paradigm_dir):
+        """Return all entries of a paradigm folder in scan order."""
+        if paradigm_dir not in self._entries:
+            ranges = self.manifest["folders"].get(paradigm_dir)
+            self._entries[paradigm_dir] = [self._entry(eid) for eid in range(*ranges["entries"])] if ranges else []
+        return self._entries[paradigm_dir]
+
+    def lookup_category(self, wx_word, category):
+        return self.lookup(wx_word, self.folders.get(category))
+
+    def deletion_index(self, paradigm_dir, max_edits=DEFAULT_MAX_EDITS):
+        """SymSpell deletion index for a folder, read straight from the mapped arrays."""
+        ranges = self.manifest["folders"].get(paradigm_dir)
+        if ranges and max_edits == self.manifest["symspell_max_edits"]:
+            lo, hi = ranges["deletes"]
+            return DeletionIndex(self._del_hash, self._del_form, self._form_string, max_edits, lo, hi)
+        return DeletionIndex(array("I"), array("I"), self._form_string, max_edits)
+
+    def _form_string(self, i):
+        return self._string(self._form_token[i])
+
+    def load_all(self):
+        return self
+
+
+class _FormKeys:
+    """Sequence view of the sorted form bytes, for bisect."""
+
+    def __init__(self, lexicon):
+        self._lexicon = lexicon
+
+    def __getitem__(self, i):
+        return self._lexicon._form_bytes(i)
+
+
+def is_artifact_stale(lexicon, folders):
+    """True when the artifact was built from other folders or any paradigm file changed."""
+    if lexicon.folders != folders:
+        return True
+    return lexicon.sources() != source_manifest(folders)
+
+
+def open_lexicon(path=DEFAULT_ARTIFACT_PATH, folders=None, rebuild=True):
+    """Open the compiled lexicon, (re)building it when missing or stale.
+
+    Falls back to parsing the text files in memory when the artifact
+    cannot be written (e.g. a read-only checkout).
+    """
+    folders = dict(PARADIGM_FOLDERS if folders is None else folders)
+    lexicon = None
+    try:
+        lexicon = CompiledLexicon(path)
+        if not rebuild or not is_artifact_stale(lexicon, folders):
+            return lexicon
+        lexicon.close()
+        lexicon = None
+    except (OSError, ValueError, KeyError):
+        if lexicon is not None:
+            lexicon.close()
+        if not rebuild:
+            raise
+    try:
+        build_lexicon_artifact(path, folders)
+        return CompiledLexicon(path)
+    except OSError as e:
+        print(f"Could not use compiled lexicon at {path} ({e}); parsing paradigm files instead.")
+        return ParadigmLexicon(folders)
+
+
+_default_lexicon = None
+
+
+def get_lexicon():
+    """Return the process-wide lexicon (opened on first call)."""
+    global _default_lexicon
+    if _default_lexicon is None:
+        _default_lexicon = open_lexicon()
+    return _default_lexicon
@@ -0,0 +1,150 @@
+import os
+import time
+import threading
+
+from lexicon_store import source_manifest
+from paradigm_lexicon import PARADIGM_FOLDERS, ParadigmLexicon, read_paradigm_file
+from symspell import DEFAULT_MAX_EDITS
+
+
+# ----------- Hot-reloading lexicon for long-running checkers -----------
+# WatchedLexicon serves lookups from an immutable snapshot (a loaded
+# ParadigmLexicon). A background thread polls the paradigm files' mtimes;
+# when some change, it re-reads only those files, rebuilds the affected
+# folders from the per-file entries it keeps, rebuilds their derived
+# indexes (fuzzy engines etc.), and then swaps the snapshot reference in
+# one assignment. Requests never wait on the reload: until the swap they
+# see the old snapshot, afterwards the new one, fully built.
+# -----------------------------------------------------------------------
+
+
+class WatchedLexicon:
+    """Lexicon facade (same interface as ParadigmLexicon) that reloads edited paradigm files.
+
+    Derived indexes are built through the facade, so their builders are
+    remembered and re-run against the new snapshot, in the reload thread,
+    for every folder that changed.
+    """
+
+    def __init__(self, folders=None, poll_interval=2.0, log=print):
+        self.folders = dict(PARADIGM_FOLDERS if folders is None else folders)
+        self.poll_interval = poll_interval
+        self.log = log
+        self.reloads = 0
+        self._files = {}        # fpath -> (mtime_ns, size, [LexiconEntry, ...])
+        self._builders = {}     # (name, paradigm_dir) -> build callable
+        self._local = threading.local()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        manifest = source_manifest(self.folders)
+        self._snapshot = self._build_snapshot(manifest, set(self.folders.values()), None)
+        self._manifest = manifest
+
+    # -- lexicon interface, served from the current snapshot --
+
+    def _current(self):
+        # The reload thread sees the snapshot it is building; everyone else the published one
+        return getattr(self._local, "building", None) or self._snapshot
+
+    def lookup(self, wx_word, paradigm_dir):
+        return self._current().lookup(wx_word, paradigm_dir)
+
+    def entries(self, paradigm_dir):
+        return self._current().entries(paradigm_dir)
+
+    def lookup_category(self, wx_word, category):
+        return self._current().lookup_category(wx_word, category)
+
+    def deletion_index(self, paradigm_dir, max_edits=DEFAULT_MAX_EDITS):
+        return self._current().deletion_index(paradigm_dir, max_edits)
+
+    def derived_index(self, name, paradigm_dir, build):
+        self._builders.setdefault((name, paradigm_dir), build)
+        return self._current().derived_index(name, paradigm_dir, build)
+
+    def load_all(self):
+        return self
+
+    # -- reloading --
+
+    def _build_snapshot(self, manifest, changed_dirs, previous):
+        """Return a loaded ParadigmLexicon, re-reading only files whose (mtime, size) changed."""
+        snapshot = ParadigmLexicon(self.folders)
+        by_dir = {}
+        for paradigm_dir, fpath, mtime_ns, size in manifest:
+            by_dir.setdefault(paradigm_dir, []).append((fpath, mtime_ns, size))
+        files = {}
+        for paradigm_dir in self.folders.values():
+            if previous is not None and paradigm_dir not in changed_dirs:
+                # Untouched folder: share the previous snapshot's tables
+                snapshot._forms[paradigm_dir] = previous._forms[paradigm_dir]
+                snapshot._entries[paradigm_dir] = previous._entries[paradigm_dir]
+                for fpath, _, _ in by_dir.get(paradigm_dir, []):
+                    files[fpath] = self._files[fpath]
+                continue
+            scan = []
+            for fpath, mtime_ns, size in by_dir.get(paradigm_dir, []):
+                cached = self._files.get(fpath)
+                if cached is None or cached[:2] != (mtime_ns, size):
+                    cached = (mtime_ns, size, read_paradigm_file(fpath, os.path.splitext(os.path.basename(fpath))[0]))
+                files[fpath] = cached
+                scan.extend(cached[2])
+            snapshot.set_entries(paradigm_dir, scan)
+        self._files = files
+        return snapshot
+
+    def check_for_changes(self):
+        """Reload if any paradigm file was added, removed or modified; returns True if it did."""
+        with self._reload_lock:
+            manifest = source_manifest(self.folders)
+            if manifest == self._manifest:
+                return False
+            start = time.perf_counter()
+            old = {fpath: (d, mtime_ns, size) for d, fpath, mtime_ns, size in self._manifest}
+            new = {fpath: (d, mtime_ns, size) for d, fpath, mtime_ns, size in manifest}
+            changed_files = sorted(f for f in old.keys() | new.keys() if old.get(f) != new.get(f))
+            changed_dirs = {(new.get(f) or old.get(f))[0] for f in changed_files}
+            previous = self._snapshot
+            snapshot = self._build_snapshot(manifest, changed_dirs, previous)
+
+            # Carry over derived indexes of untouched folders; rebuild the rest before publishing
+            self._local.building = snapshot
+            try:
+                for (name, paradigm_dir), index in previous._derived.items():
+                    if paradigm_dir is not None and paradigm_dir not in changed_dirs:
+                        snapshot._derived[(name, paradigm_dir)] = index
+                for (name, paradigm_dir), build in list(self._builders.items()):
+                    if (name, paradigm_dir) not in snapshot._derived:
+                        snapshot.derived_index(name, paradigm_dir, build)
+            finally:
+                self._local.building = None
+
+            self._snapshot = snapshot
+            self._manifest = manifest
+            self.reloads += 1
+            self.log(f"Reloaded {len(changed_files)} paradigm file(s) in {time.perf_counter() - start:.3f}s: "
+                     + ", ".join(changed_files))
+            return True
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_for_changes()
+            except Exception as e:  # keep serving the last good snapshot
+                self.log(f"Paradigm reload failed: {e}")
+
+    def start(self):
+        """Start polling in a daemon thread; returns self."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name="paradigm-watch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
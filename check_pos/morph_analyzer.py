@@ -0,0 +1,292 @@
+import os
+import hashlib
+from array import array
+from collections import Counter
+
+from paradigm_lexicon import LexiconEntry, iter_paradigm_entries
+
+
+# ----------- Suffix-trie morphological analyzer -----------
+# A paradigm file is one exemplar root expanded through its class's suffix
+# table, e.g. every line of UruN8_word_split.txt is "Ur" + a suffix:
+#   Urannu  Uru(N8)+rannu_ru_ACC   ->  stem "Ur", suffix "annu", lemma tail "u"
+# The analyzer keeps each table once (as (surface suffix, lemma tail,
+# analysis tail) rows relative to the stem) plus one small record per root,
+# and recognizes a word by walking a trie of the reversed suffixes from the
+# end of the word: every node that ends a suffix proposes the remaining
+# prefix as a stem, which is one dict probe. Cost is O(len(word)) plus the
+# number of matching roots.
+# ---------------------------------------------------------
+
+
+class ParadigmClass:
+    """One suffix table, shared by every root inflected like its exemplar.
+
+    Row i describes line i of the exemplar file relative to the stem: a root
+    with stem s produces surface form s + suffix, lemma s + lemma tail and
+    analysis s + analysis tail. Rows are stored as ids into the analyzer's
+    string table; an analysis tail is kept as its '+'-separated morpheme
+    pieces, which repeat heavily across rows and classes. residue is what a
+    citation form adds to its stem (Uru = "Ur" + "u").
+    """
+
+    __slots__ = ("name", "residue", "suffixes", "lemmas", "analysis_start")
+
+    def __init__(self, name, residue):
+        self.name = name
+        self.residue = residue
+        self.suffixes = array("I")
+        self.lemmas = array("i")            # -1: line has no annotation
+        self.analysis_start = array("I")    # row i's pieces are pieces[start[i]:start[i + 1]]
+
+    def __len__(self):
+        return len(self.suffixes)
+
+    def stem_of(self, lemma):
+        """Stem a new citation form inflected like this class (ValueError if it does not fit)."""
+        if not lemma.endswith(self.residue) or len(lemma) == len(self.residue):
+            raise ValueError(f"{lemma!r} does not end in {self.residue!r} like the {self.name} paradigm")
+        return lemma[:len(lemma) - len(self.residue)]
+
+
+class SuffixTrieAnalyzer:
+    """Recognizes paradigm surface forms from roots + per-class suffix tables.
+
+    lookup() returns the same LexiconEntry list as ParadigmLexicon.lookup
+    (first matching line of each file, files in scan order), so the base
+    file and lemma agree with search_in_paradigm_folder. add_root() adds a
+    root inflected like an existing one without writing a paradigm file.
+
+    The reversed-suffix trie uses the parallel-array layout of ArrayTrie;
+    the classes ending at a node are a linked list in the end_* arrays.
+    """
+
+    def __init__(self):
+        self.classes = []
+        self._class_by_name = {}
+        self._class_by_table = {}     # sha1 of a table -> class_id
+        self._strings = []
+        self._string_ids = {}
+        self._pieces = array("I")
+        self._roots = []            # (stem, class_id, fpath, base_word), in scan order
+        self._roots_by_stem = {}    # (class_id, stem) -> [root_id, ...]
+        self.chars = array("I", [0])            # node 0 is the trie root (empty suffix)
+        self.first_child = array("i", [-1])
+        self.next_sibling = array("i", [-1])
+        self.first_end = array("i", [-1])
+        self.end_class = array("I")
+        self.end_row = array("I")
+        self.end_next = array("i")
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build from LexiconEntry rows in scan order (one paradigm file after another)."""
+        analyzer = cls()
+        by_file = {}
+        for entry in entries:
+            by_file.setdefault((entry.fpath, entry.base_word), []).append(entry)
+        for (fpath, base_word), rows in by_file.items():
+            analyzer._add_file(fpath, base_word, rows)
+        return analyzer
+
+    @classmethod
+    def from_folder(cls, paradigm_dir):
+        return cls.from_entries(iter_paradigm_entries(paradigm_dir))
+
+    @classmethod
+    def from_lexicon(cls, lexicon, paradigm_dir, extra_roots=None, roots_key=None):
+        """Analyzer for one folder, built once and cached with the lexicon.
+
+        With extra_roots (a file read by read_extra_roots) the folder's roots
+        from it are added to a separate analyzer, cached under roots_key (a
+        hash of the file), so the plain one never sees them.
+        """
+        if not extra_roots:
+            return lexicon.derived_index("suffix-trie", paradigm_dir,
+                                         lambda: cls.from_entries(lexicon.entries(paradigm_dir)))
+
+        def build():
+            analyzer = cls.from_entries(lexicon.entries(paradigm_dir))
+            for folder, lemma, like in read_extra_roots(extra_roots, lexicon.folders):
+                if folder == paradigm_dir:
+                    analyzer.add_root(lemma, like)
+            return analyzer
+        return lexicon.derived_index(("suffix-trie", roots_key), paradigm_dir, build)
+
+    def _string_id(self, text):
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self._strings)
+            self._strings.append(text)
+        return string_id
+
+    def _add_file(self, fpath, base_word, entries):
+        lemmas = [e.lemma for e in entries if e.lemma is not None]
+        stem = os.path.commonprefix([e.token for e in entries] + lemmas)
+        lemma = Counter(lemmas).most_common(1)[0][0] if lemmas else stem
+        n = len(stem)
+        paradigm_class = ParadigmClass(base_word, lemma[n:])
+        pieces = array("I")
+        paradigm_class.analysis_start.append(0)
+        for e in entries:
+            paradigm_class.suffixes.append(self._string_id(e.token[n:]))
+            paradigm_class.lemmas.append(-1 if e.lemma is None else self._string_id(e.lemma[n:]))
+            if e.analysis is not None:
+                pieces.extend(self._string_id(p) for p in e.analysis[n:].split("+"))
+            paradigm_class.analysis_start.append(len(pieces))
+        class_id = self._add_class(paradigm_class, pieces)
+        self._class_by_name.setdefault(lemma, class_id)
+        self._add_root(stem, class_id, fpath, base_word)
+
+    def _add_class(self, paradigm_class, pieces):
+        """Register a table (analysis_start relative to pieces) and index its suffixes; identical tables are stored once."""
+        key = hashlib.sha1(b"\0".join([
+            paradigm_class.residue.encode("utf-8"), paradigm_class.suffixes.tobytes(),
+            paradigm_class.lemmas.tobytes(), paradigm_class.analysis_start.tobytes(), pieces.tobytes(),
+        ])).digest()
+        class_id = self._class_by_table.get(key)
+        if class_id is not None:
+            self._class_by_name.setdefault(paradigm_class.name, class_id)
+            return class_id
+        offset = len(self._pieces)
+        self._pieces.extend(pieces)
+        paradigm_class.analysis_start = array("I", (start + offset for start in paradigm_class.analysis_start))
+        class_id = self._class_by_table[key] = len(self.classes)
+        self.classes.append(paradigm_class)
+        self._class_by_name[paradigm_class.name] = class_id
+        seen = set()
+        for row, suffix_id in enumerate(paradigm_class.suffixes):
+            if suffix_id in seen:
+                continue        # only the first line with a given suffix can be reported
+            seen.add(suffix_id)
+            node = 0
+            for ch in reversed(self._strings[suffix_id]):
+                node = self._child(node, ord(ch), create=True)
+            self.end_class.append(class_id)
+            self.end_row.append(row)
+            self.end_next.append(self.first_end[node])
+            self.first_end[node] = len(self.end_class) - 1
+        return class_id
+
+    def _child(self, node, code, create=False):
+        child = self.first_child[node]
+        while child != -1:
+            if self.chars[child] == code:
+                return child
+            child = self.next_sibling[child]
+        if not create:
+            return -1
+        child = len(self.chars)
+        self.chars.append(code)
+        self.first_child.append(-1)
+        self.next_sibling.append(self.first_child[node])
+        self.first_end.append(-1)
+        self.first_child[node] = child
+        return child
+
+    def _add_root(self, stem, class_id, fpath, base_word):
+        root_id = len(self._roots)
+        self._roots.append((stem, class_id, fpath, base_word))
+        self._roots_by_stem.setdefault((class_id, stem), []).append(root_id)
+
+    def add_root(self, lemma, like, fpath=None, base_word=None):
+        """Add a root inflected like an existing paradigm.
+
+        like is the exemplar's lemma (e.g. "Uru") or base file name (e.g.
+        "UruN8_word_split"). Matches report fpath/base_word, which default
+        to the file name the paradigm generator would have written
+        (e.g. bIruN8_word_split.txt next to the exemplar file).
+        """
+        class_id = self._class_by_name.get(like)
+        if class_id is None:
+            raise KeyError(f"Unknown paradigm {like!r}")
+        paradigm_class = self.classes[class_id]
+        stem = paradigm_class.stem_of(lemma)
+        exemplar = next(r for r in self._roots if r[1] == class_id)
+        if base_word is None:
+            exemplar_lemma = exemplar[0] + paradigm_class.residue
+            exemplar_base = exemplar[3]
+            if exemplar_base.startswith(exemplar_lemma):
+                base_word = lemma + exemplar_base[len(exemplar_lemma):]
+            else:
+                base_word = f"{lemma}_{exemplar_base}"
+        if fpath is None:
+            fpath = os.path.join(os.path.dirname(exemplar[2]), base_word + ".txt")
+        self._add_root(stem, class_id, fpath, base_word)
+
+    def __len__(self):
+        return len(self._roots)
+
+    def _entry(self, root_id, row, token=None):
+        stem, class_id, fpath, base_word = self._roots[root_id]
+        paradigm_class = self.classes[class_id]
+        if token is None:
+            token = stem + self._strings[paradigm_class.suffixes[row]]
+        lemma_id = paradigm_class.lemmas[row]
+        if lemma_id < 0:
+            return LexiconEntry(fpath, base_word, token, None, None)
+        pieces = self._pieces[paradigm_class.analysis_start[row]:paradigm_class.analysis_start[row + 1]]
+        return LexiconEntry(fpath, base_word, token, stem + self._strings[lemma_id],
+                            stem + "+".join([self._strings[p] for p in pieces]))
+
+    def lookup(self, wx_word):
+        """Return [LexiconEntry, ...] for wx_word: the first matching line of each root, in root order."""
+        found = {}
+        node = 0
+        i = len(wx_word)
+        while True:
+            end = self.first_end[node]
+            if end != -1:
+                stem = wx_word[:i]
+                while end != -1:
+                    for root_id in self._roots_by_stem.get((self.end_class[end], stem), ()):
+                        found[root_id] = self.end_row[end]
+                    end = self.end_next[end]
+            if i == 0:
+                break
+            i -= 1
+            node = self._child(node, ord(wx_word[i]))
+            if node == -1:
+                break
+        return [self._entry(root_id, found[root_id], wx_word) for root_id in sorted(found)]
+
+    def roots(self):
+        """[(stem, class_id, fpath), ...] in root order (paradigm files first, then added roots)."""
+        return [(stem, class_id, fpath) for stem, class_id, fpath, _ in self._roots]
+
+    def suffix_rows(self, class_id):
+        """{surface suffix: [row, ...]} for a class, rows in line order."""
+        rows = {}
+        for row, suffix_id in enumerate(self.classes[class_id].suffixes):
+            rows.setdefault(self._strings[suffix_id], []).append(row)
+        return rows
+
+    def expand(self):
+        """Yield every LexiconEntry the roots generate, like reading the expanded paradigm files."""
+        for root_id, (_, class_id, _, _) in enumerate(self._roots):
+            for row in range(len(self.classes[class_id])):
+                yield self._entry(root_id, row)
+
+
+def read_extra_roots(path, folders):
+    """Yield (paradigm folder, lemma, exemplar) for the roots listed in a text file.
+
+    One 'category lemma exemplar' per line ('#' comments); folders maps a
+    category to its paradigm folder.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) != 3 or parts[0] not in folders:
+                raise ValueError(f"{path}:{line_no}: expected 'category lemma exemplar', got {line!r}")
+            category, lemma, like = parts
+            yield folders[category], lemma, like
+
+
+def roots_file_key(path):
+    """Short hash of a roots file's content, the cache key of the analyzers built with it."""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
@@ -0,0 +1,161 @@
+import os
+from collections import namedtuple
+
+from symspell import DEFAULT_MAX_EDITS, build_deletion_index
+
+
+# Paradigm folders for each category (relative to the project directory)
+PARADIGM_FOLDERS = {
+    "n": os.path.join("paradigms", "Noun"),
+    "pn": os.path.join("paradigms", "Pronouns"),
+    "v": os.path.join("paradigms", "Verb"),
+}
+
+
+# One parsed paradigm line, e.g.
+#   kaliwanu kali(V6)+wa_#_PAST+anu_a_3SM
+# gives token="kaliwanu", lemma="kali", analysis="kali(V6)+wa_#_PAST+anu_a_3SM"
+LexiconEntry = namedtuple("LexiconEntry", ["fpath", "base_word", "token", "lemma", "analysis"])
+
+
+def clean_token(line):
+    """Extract the surface WX token from a stripped paradigm line ('' if none)."""
+    token = line.split()[0]       # before any space
+    token = token.split('+')[0]   # before '+'
+    token = token.split('_')[0]   # before '_'
+    return token.strip()
+
+
+def split_annotation(line):
+    """Return (lemma, analysis) for a stripped paradigm line.
+
+    The annotation is expected like: Uru(N8)+rigeV_ru_DAT
+    The lemma is the portion before the first '+' without any parenthesis.
+    Both are None when the line has no annotation column.
+    """
+    parts = line.split(None, 1)
+    if len(parts) < 2:
+        return None, None
+    ann = parts[1].strip()
+    lemma_part = ann.split('+')[0]
+    return lemma_part.split('(')[0].strip(), ann
+
+
+def iter_paradigm_files(paradigm_dir):
+    """Yield (fpath, base_word) for every .txt file under paradigm_dir, in os.walk order."""
+    for root, _, files in os.walk(paradigm_dir):
+        for f in files:
+            if not f.endswith(".txt"):
+                continue
+            yield os.path.join(root, f), os.path.splitext(f)[0]
+
+
+def read_paradigm_file(fpath, base_word):
+    """Return the LexiconEntry list of one paradigm file, in line order.
+
+    An unreadable file gives the lines read before the error (usually none).
+    """
+    entries = []
+    try:
+        with open(fpath, "r", encoding="utf-8") as fin:
+            for line in fin:
+                line = line.strip()
+                if not line:
+                    continue
+                token = clean_token(line)
+                if not token:
+                    continue
+                lemma, analysis = split_annotation(line)
+                entries.append(LexiconEntry(fpath, base_word, token, lemma, analysis))
+    except Exception:
+        pass
+    return entries
+
+
+def iter_paradigm_entries(paradigm_dir):
+    """Yield a LexiconEntry for every non-empty line of every paradigm file.
+
+    Files and lines come in the same order the old per-token scan visited
+    them, so anything built on top keeps its tie-breaking order.
+    Unreadable files are skipped (lines read before an error are kept).
+    """
+    for fpath, base_word in iter_paradigm_files(paradigm_dir):
+        yield from read_paradigm_file(fpath, base_word)
+
+
+class DerivedIndexCache:
+    """Mixin caching per-folder structures derived from a lexicon's entries."""
+
+    def derived_index(self, name, paradigm_dir, build):
+        """Return build(), built once per (name, folder) and kept with the lexicon."""
+        key = (name, paradigm_dir)
+        if key not in self._derived:
+            self._derived[key] = build()
+        return self._derived[key]
+
+
+class ParadigmLexicon(DerivedIndexCache):
+    """In-memory surface-form index over the paradigm folders.
+
+    Each paradigm folder is parsed once (lazily, on first use) into:
+      - forms:   WX surface form -> [LexiconEntry, ...] with at most one
+                 entry per file (the first matching line, as the old scan did)
+      - entries: every LexiconEntry in file/line scan order, used by the
+                 fuzzy search paths
+    """
+
+    def __init__(self, folders=None):
+        self.folders = dict(PARADIGM_FOLDERS if folders is None else folders)
+        self._forms = {}
+        self._entries = {}
+        self._derived = {}
+
+    def _load(self, paradigm_dir):
+        self.set_entries(paradigm_dir, iter_paradigm_entries(paradigm_dir))
+
+    def set_entries(self, paradigm_dir, scan_entries):
+        """(Re)build a folder's index from its entries in scan order."""
+        forms = {}
+        entries = []
+        for entry in scan_entries:
+            entries.append(entry)
+            matches = forms.setdefault(entry.token, [])
+            if not matches or matches[-1].fpath != entry.fpath:
+                matches.append(entry)
+        self._forms[paradigm_dir] = forms
+        self._entries[paradigm_dir] = entries
+
+    def _ensure_loaded(self, paradigm_dir):
+        if paradigm_dir not in self._forms:
+            self._load(paradigm_dir)
+
+    def load_all(self):
+        """Parse every configured category folder up front."""
+        for paradigm_dir in self.folders.values():
+            self._ensure_loaded(paradigm_dir)
+        return self
+
+    def lookup(self, wx_word, paradigm_dir):
+        """Return the LexiconEntry list for an exact WX form (O(1) dict probe)."""
+        if not paradigm_dir or not os.path.exists(paradigm_dir):
+            return []
+        self._ensure_loaded(paradigm_dir)
+        return self._forms[paradigm_dir].get(wx_word, [])
+
+    def entries(self, paradigm_dir):
+        """Return all entries of a paradigm folder in scan order."""
+        if not paradigm_dir or not os.path.exists(paradigm_dir):
+            return []
+        self._ensure_loaded(paradigm_dir)
+        return self._entries[paradigm_dir]
+
+    def lookup_category(self, wx_word, category):
+        return self.lookup(wx_word, self.folders.get(category))
+
+    def deletion_index(self, paradigm_dir, max_edits=DEFAULT_MAX_EDITS):
+        """SymSpell deletion index over the distinct forms of a folder (built on first use)."""
+        def build():
+            forms = sorted(self._forms[paradigm_dir]) if self.entries(paradigm_dir) else []
+            return build_deletion_index(forms, max_edits)
+        return self.derived_index(("deletes", max_edits), paradigm_dir, build)
+
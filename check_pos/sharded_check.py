@@ -0,0 +1,87 @@
+import gc
+import os
+import time
+import multiprocessing
+
+
+# ----------- Multi-process sharded checking -----------
+# The parent loads the lexicon and builds every index it will need, then
+# forks a pool: workers inherit those structures copy-on-write instead of
+# loading their own. Keys are sent to workers in contiguous shards and the
+# results come back in shard order, so callers see exactly the sequence a
+# single-process loop would produce.
+# ------------------------------------------------------
+
+_check = None   # the per-key check function, set in every worker by the pool initializer
+
+
+def _set_check(check):
+    global _check
+    _check = check
+
+
+def _check_shard(shard):
+    start = time.perf_counter()
+    values = [_check(key) for key in shard]
+    return os.getpid(), values, time.perf_counter() - start
+
+
+class ParallelChecker:
+    """A pool of forked workers that checks batches of keys, keeping input order.
+
+    The pool is forked once, when the checker is created, so everything
+    check needs must already be loaded; map() can then be called for
+    batch after batch (streaming output) without re-forking. stats maps a
+    worker pid to [keys checked, busy seconds] over all batches.
+    """
+
+    def __init__(self, check, workers, shards_per_worker=8):
+        self.workers = workers
+        self.shards_per_worker = shards_per_worker
+        self.stats = {}
+        # Keep the collector from touching (and so copying) every inherited object
+        gc.freeze()
+        try:
+            # Forked workers get check from the initializer (not pickled), including
+            # any worker the pool forks later to replace one that died
+            self._pool = multiprocessing.get_context("fork").Pool(workers, initializer=_set_check,
+                                                                   initargs=(check,))
+        finally:
+            gc.unfreeze()
+
+    def map(self, keys):
+        """Return [check(key) for key in keys]."""
+        if not keys:
+            return []
+        size = max(1, -(-len(keys) // (self.workers * self.shards_per_worker)))
+        shards = [keys[i:i + size] for i in range(0, len(keys), size)]
+        values = []
+        for pid, shard_values, seconds in self._pool.imap(_check_shard, shards):
+            values.extend(shard_values)
+            worker = self.stats.setdefault(pid, [0, 0.0])
+            worker[0] += len(shard_values)
+            worker[1] += seconds
+        return values
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            self._pool.terminate()
+            self._pool.join()
+
+
+def format_worker_stats(stats):
+    """One summary line per worker: keys checked, busy time and throughput."""
+    lines = []
+    for n, (pid, (count, seconds)) in enumerate(sorted(stats.items()), 1):
+        rate = count / seconds if seconds else float("inf")
+        lines.append(f"   worker {n} (pid {pid}): {count} lookups in {seconds:.2f}s ({rate:.1f}/s)")
+    return "\n".join(lines)
@@ -0,0 +1,93 @@
+import zlib
+import bisect
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional: only makes building faster
+    np = None
+
+
+# ----------- SymSpell deletion-neighbourhood index -----------
+# Every lexicon form is expanded into all strings reachable by deleting up
+# to max_edits characters. Two words within Levenshtein distance d always
+# share such a delete with <= d deletions on each side, so looking up the
+# deletes of a query finds every form within max_edits (plus a few false
+# candidates, which the caller verifies with the true edit distance).
+#
+# Deletes are stored as crc32 hashes in a sorted uint32 array alongside the
+# id of the form they came from; a hash collision only adds a candidate.
+# -------------------------------------------------------------
+
+DEFAULT_MAX_EDITS = 2
+
+
+def generate_deletes(word, max_edits=DEFAULT_MAX_EDITS):
+    """Return the set of strings obtained from word by deleting 0..max_edits characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(max_edits):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def delete_hash(s):
+    return zlib.crc32(s.encode("utf-8"))
+
+
+def build_deletion_arrays(forms, max_edits=DEFAULT_MAX_EDITS, first_id=0):
+    """Return (hashes, form_ids) uint32 arrays sorted by (hash, form id).
+
+    forms is a sequence of distinct strings; form ids are first_id + index.
+    """
+    keyed = []
+    for i, form in enumerate(forms, first_id):
+        keyed.extend((h << 32) | i for h in {delete_hash(d) for d in generate_deletes(form, max_edits)})
+    if np is not None:
+        # NumPy sorts without holding the GIL, so a rebuild in a background
+        # thread (see lexicon_watch.py) does not stall request threads
+        packed = np.sort(np.array(keyed, dtype=np.uint64))
+        hashes, form_ids = array("I"), array("I")
+        hashes.frombytes((packed >> np.uint64(32)).astype(np.uint32).tobytes())
+        form_ids.frombytes((packed & np.uint64(0xFFFFFFFF)).astype(np.uint32).tobytes())
+        return hashes, form_ids
+    keyed.sort()
+    return array("I", (k >> 32 for k in keyed)), array("I", (k & 0xFFFFFFFF for k in keyed))
+
+
+class DeletionIndex:
+    """Query side of the deletion index over (hashes, form_ids) sequences.
+
+    hashes and form_ids may be arrays or memoryviews of a mapped artifact,
+    restricted to [lo, hi); form_string(form_id) returns the form for an id.
+    """
+
+    def __init__(self, hashes, form_ids, form_string, max_edits=DEFAULT_MAX_EDITS, lo=0, hi=None):
+        self.hashes = hashes
+        self.form_ids = form_ids
+        self.form_string = form_string
+        self.max_edits = max_edits
+        self.lo = lo
+        self.hi = len(hashes) if hi is None else hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def candidates(self, word):
+        """Return the set of forms sharing at least one delete with word."""
+        hashes, form_ids, hi = self.hashes, self.form_ids, self.hi
+        ids = set()
+        for h in {delete_hash(d) for d in generate_deletes(word, self.max_edits)}:
+            i = bisect.bisect_left(hashes, h, self.lo, hi)
+            while i < hi and hashes[i] == h:
+                ids.add(form_ids[i])
+                i += 1
+        return {self.form_string(i) for i in ids}
+
+
+def build_deletion_index(forms, max_edits=DEFAULT_MAX_EDITS):
+    """In-memory DeletionIndex over a list of distinct forms."""
+    forms = list(forms)
+    hashes, form_ids = build_deletion_arrays(forms, max_edits)
+    return DeletionIndex(hashes, form_ids, forms.__getitem__, max_edits)
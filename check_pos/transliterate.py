@@ -0,0 +1,203 @@
+import re
+
+
+# ----------- Kannada <-> WX transliteration -----------
+# Table-driven conversion for well-formed Kannada words (letters, vowel
+# signs, virama, anusvara, visarga and digits). It produces exactly what
+# wxconv's WXC(lang="kan") produces for such words; anything outside these
+# tables (Latin text, nukta, ZWJ/ZWNJ, rare signs, malformed sequences) is
+# handed to wxconv so the output never differs. Results are memoized, so
+# repeated words in a document cost one dict lookup.
+# ------------------------------------------------------
+
+CONSONANTS = {
+    "ಕ": "k", "ಖ": "K", "ಗ": "g", "ಘ": "G", "ಙ": "f",
+    "ಚ": "c", "ಛ": "C", "ಜ": "j", "ಝ": "J", "ಞ": "F",
+    "ಟ": "t", "ಠ": "T", "ಡ": "d", "ಢ": "D", "ಣ": "N",
+    "ತ": "w", "ಥ": "W", "ದ": "x", "ಧ": "X", "ನ": "n",
+    "ಪ": "p", "ಫ": "P", "ಬ": "b", "ಭ": "B", "ಮ": "m",
+    "ಯ": "y", "ರ": "r", "ಱ": "rY", "ಲ": "l", "ಳ": "lY", "ವ": "v",
+    "ಶ": "S", "ಷ": "R", "ಸ": "s", "ಹ": "h",
+}
+
+VOWELS = {
+    "ಅ": "a", "ಆ": "A", "ಇ": "i", "ಈ": "I", "ಉ": "u", "ಊ": "U", "ಋ": "q",
+    "ಎ": "eV", "ಏ": "e", "ಐ": "E", "ಒ": "oV", "ಓ": "o", "ಔ": "O",
+}
+
+VOWEL_SIGNS = {
+    "ಾ": "A", "ಿ": "i", "ೀ": "I", "ು": "u", "ೂ": "U", "ೃ": "q",
+    "ೆ": "eV", "ೇ": "e", "ೈ": "E", "ೊ": "oV", "ೋ": "o", "ೌ": "O",
+}
+
+VIRAMA = "್"
+MODIFIERS = {"ಂ": "M", "ಃ": "H"}
+DIGITS = {chr(0x0CE6 + i): str(i) for i in range(10)}
+
+_WX_CONSONANTS = {wx: utf for utf, wx in CONSONANTS.items()}
+_WX_VOWELS = {wx: utf for utf, wx in VOWELS.items()}
+_WX_SIGNS = {wx: utf for utf, wx in VOWEL_SIGNS.items()}
+_WX_SIGNS["a"] = ""
+_WX_MODIFIERS = {wx: utf for utf, wx in MODIFIERS.items()}
+# Longest symbols first so 'lY' / 'eV' win over 'l' / 'e'
+_WX_TOKEN = re.compile("|".join(sorted(
+    (re.escape(s) for s in list(_WX_CONSONANTS) + list(_WX_VOWELS) + list(_WX_MODIFIERS)),
+    key=len, reverse=True)) + "|[0-9]|.", re.S)
+
+
+def fast_utf2wx(word):
+    """Table-driven Kannada -> WX; returns None when the word needs wxconv."""
+    out = []
+    pending = False     # a consonant still waiting for its vowel
+    vocalic = False     # previous character can carry anusvara/visarga
+    for ch in word:
+        wx = CONSONANTS.get(ch)
+        if wx is not None:
+            if pending:
+                out.append("a")
+            out.append(wx)
+            pending = vocalic = True
+            continue
+        wx = VOWEL_SIGNS.get(ch)
+        if wx is not None:
+            if not pending:
+                return None
+            out.append(wx)
+            pending = False
+            continue
+        if ch == VIRAMA:
+            if not pending:
+                return None
+            pending = vocalic = False
+            continue
+        wx = VOWELS.get(ch)
+        if wx is not None:
+            if pending:
+                out.append("a")
+            out.append(wx)
+            pending = False
+            vocalic = True
+            continue
+        wx = MODIFIERS.get(ch)
+        if wx is not None:
+            if not vocalic:
+                return None
+            if pending:
+                out.append("a")
+            out.append(wx)
+            pending = vocalic = False
+            continue
+        wx = DIGITS.get(ch)
+        if wx is not None:
+            if pending:
+                out.append("a")
+            out.append(wx)
+            pending = vocalic = False
+            continue
+        return None
+    if pending:
+        out.append("a")
+    return "".join(out)
+
+
+def fast_wx2utf(wx):
+    """Table-driven WX -> Kannada; returns None when the word needs wxconv."""
+    out = []
+    pending = False     # a consonant whose vowel has not been seen yet
+    vocalic = False
+    for symbol in _WX_TOKEN.findall(wx):
+        utf = _WX_CONSONANTS.get(symbol)
+        if utf is not None:
+            if pending:
+                out.append(VIRAMA)
+            out.append(utf)
+            pending = True
+            vocalic = False
+            continue
+        if symbol in _WX_VOWELS:
+            if pending:
+                # wxconv keeps rY/lY + q as consonant + virama + vowel letter
+                if symbol == "q" and out[-1] in ("ಱ", "ಳ"):
+                    return None
+                out.append(_WX_SIGNS[symbol])
+            elif out:
+                # wxconv rewrites vowel-after-vowel sequences irregularly
+                return None
+            else:
+                out.append(_WX_VOWELS[symbol])
+            pending = False
+            vocalic = True
+            continue
+        utf = _WX_MODIFIERS.get(symbol)
+        if utf is not None:
+            if not vocalic:
+                return None
+            out.append(utf)
+            vocalic = False
+            continue
+        if symbol.isdigit():
+            if pending:
+                return None
+            out.append(symbol)
+            vocalic = False
+            continue
+        return None
+    if pending:
+        out.append(VIRAMA)
+    return "".join(out)
+
+
+class KannadaWX:
+    """Memoizing Kannada <-> WX converter with a wxconv fallback.
+
+    wxconv is only imported if a word falls outside the fast tables. With
+    max_memo, each memo is cleared when it reaches that many words, which
+    bounds memory on unbounded input streams.
+    """
+
+    def __init__(self, max_memo=None):
+        self.max_memo = max_memo
+        self._to_wx = {}
+        self._to_utf = {}
+        self._wxconv = {}
+        self.fallbacks = 0
+
+    def _wxconv_convert(self, order, text):
+        converter = self._wxconv.get(order)
+        if converter is None:
+            from wxconv import WXC
+            converter = self._wxconv[order] = WXC(order=order, lang="kan")
+        self.fallbacks += 1
+        return converter.convert(text)
+
+    def utf2wx(self, word):
+        wx = self._to_wx.get(word)
+        if wx is None:
+            wx = fast_utf2wx(word)
+            if wx is None:
+                wx = self._wxconv_convert("utf2wx", word)
+            if self.max_memo and len(self._to_wx) >= self.max_memo:
+                self._to_wx.clear()
+            self._to_wx[word] = wx
+        return wx
+
+    def wx2utf(self, wx):
+        word = self._to_utf.get(wx)
+        if word is None:
+            word = fast_wx2utf(wx)
+            if word is None:
+                word = self._wxconv_convert("wx2utf", wx)
+            if self.max_memo and len(self._to_utf) >= self.max_memo:
+                self._to_utf.clear()
+            self._to_utf[wx] = word
+        return word
+
+    def utf2wx_many(self, words):
+        """Convert a whole token list in one call."""
+        return [self.utf2wx(w) for w in words]
+
+    def wx2utf_many(self, wx_words):
+        return [self.wx2utf(w) for w in wx_words]
+
+    # WXC-compatible entry point
+    convert = utf2wx
@@ -0,0 +1,106 @@
+import heapq
+from array import array
+
+
+class ArrayTrie:
+    """Compact, array-backed trie over a set of words for fuzzy traversal.
+
+    Nodes live in parallel arrays (character, first child, next sibling,
+    word id) instead of per-node dicts. Searching walks the trie carrying one
+    Levenshtein DP row per node, so a prefix shared by thousands of
+    inflected forms is scored once, and a subtree is skipped as soon as the
+    minimum of its row exceeds the search radius.
+
+    items[w] holds the integer payloads of word w in ascending order (e.g.
+    the scan positions of every lexicon entry with that form).
+    """
+
+    def __init__(self, words, items):
+        self.words = list(words)
+        self.items = items
+        self.chars = array("I", [0])          # node 0 is the root
+        self.first_child = array("i", [-1])
+        self.next_sibling = array("i", [-1])
+        self.word_id = array("i", [-1])
+
+        order = sorted(range(len(self.words)), key=lambda w: self.words[w])
+        path = [0]          # path[depth] = node id for the previous word's prefix
+        previous = ""
+        for w in order:
+            word = self.words[w]
+            common = 0
+            limit = min(len(word), len(previous))
+            while common < limit and word[common] == previous[common]:
+                common += 1
+            # Words are sorted, so the last child of the branching node is on the previous path
+            last_child = path[common + 1] if len(path) > common + 1 else -1
+            del path[common + 1:]
+            for depth in range(common, len(word)):
+                node = len(self.chars)
+                self.chars.append(ord(word[depth]))
+                self.first_child.append(-1)
+                self.next_sibling.append(-1)
+                self.word_id.append(-1)
+                if depth == common and last_child != -1:
+                    self.next_sibling[last_child] = node
+                else:
+                    self.first_child[path[depth]] = node
+                path.append(node)
+            self.word_id[path[len(word)]] = w
+            previous = word
+
+    def __len__(self):
+        return len(self.chars)
+
+    def search(self, query, max_distance=None, top_k=None):
+        """Return [(distance, item), ...] sorted by (distance, item).
+
+        Same contract as BKTree.search: max_distance bounds the radius
+        (None = unbounded) and top_k shrinks it to the current k-th distance.
+        """
+        radius = float("inf") if max_distance is None else max_distance
+        found = []  # max-heap of (-distance, -item) when top_k is set
+        codes = [ord(c) for c in query]
+        n = len(codes)
+        chars, first_child, next_sibling, word_id = self.chars, self.first_child, self.next_sibling, self.word_id
+
+        stack = [(0, list(range(n + 1)))]
+        while stack:
+            node, row = stack.pop()
+            w = word_id[node]
+            if w >= 0 and row[n] <= radius:
+                d = row[n]
+                for item in self.items[w]:
+                    if top_k is None:
+                        found.append((d, item))
+                    elif len(found) < top_k:
+                        heapq.heappush(found, (-d, -item))
+                    elif (d, item) < (-found[0][0], -found[0][1]):
+                        heapq.heapreplace(found, (-d, -item))
+                    else:
+                        break
+                if top_k is not None and len(found) == top_k:
+                    radius = min(radius, -found[0][0])
+            if min(row) > radius:
+                continue
+            child = first_child[node]
+            while child != -1:
+                c = chars[child]
+                current = [row[0] + 1]
+                left = row[0] + 1
+                for j in range(1, n + 1):
+                    diag = row[j - 1] if codes[j - 1] == c else row[j - 1] + 1
+                    up = row[j] + 1
+                    if up < diag:
+                        diag = up
+                    left += 1
+                    if left < diag:
+                        diag = left
+                    current.append(diag)
+                    left = diag
+                if min(current) <= radius:
+                    stack.append((child, current))
+                child = next_sibling[child]
+        if top_k is None:
+            return sorted(found)
+        return sorted((-nd, -ni) for nd, ni in found)
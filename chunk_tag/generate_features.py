@@ -1,53 +1,57 @@
+import os
 import sys
 # from datasets import ClassLabel, load_dataset, load_metric, DownloadMode
 from transformers import AutoModelForTokenClassification, AutoConfig, AutoTokenizer, TrainingArguments, Trainer, DataCollatorForTokenClassification, EarlyStoppingCallback, IntervalStrategy
 import numpy as np
 import torch
 import pickle
+import logging
 import argparse
 
-with open("chunk_encoding_dict.pickle","rb") as f:
-	encoding_dict = pickle.load(f)
-
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description="Token Classification")
-parser.add_argument("--input", type=str, help="Input file path")
-parser.add_argument("--output", type=str, help="Output file path")
-parser.add_argument("--model", type=str, help="Model path")
-args = parser.parse_args()
-
-tokenizer_path = args.model
-model_path = args.model
-
-# Load the tokenizer from the saved folder
-tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
-
-# Load the model from the saved folder
-model = AutoModelForTokenClassification.from_pretrained(model_path)
-
-pos_data = []
-sentence_data = []
-pos_file = args.input
-
-with open(pos_file,"r",encoding='utf-8') as f:
-	data = f.readlines()
-
-sent = []
-tok = []
-#print(f"len of data : {len(data)}")
-for i in range(len(data)):
-    #print(f"line -->{i}")
-    if (data[i] != "\n") and ("<Sentence" not in data[i]) and ("</Sentence>" not in data[i]):
-        pos = data[i].split("\t")[2].strip()
-        token = data[i].split("\t")[1].strip()
-        sent.append(pos)
-        tok.append(token)
-    elif data[i]=="\n" or i == (len(data)-1):
-        pos_data.append(sent)
-        sentence_data.append(tok)
-        sent = []
-        tok = []
-#print(f"Len of sentence_data: {len(sentence_data)}")
+logger = logging.getLogger(__name__)
+
+ENCODING_DICT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chunk_encoding_dict.pickle")
+
+
+def load_encoding_dict(path=ENCODING_DICT_PATH):
+    """Return the {tag id: chunk tag} table the model's labels refer to."""
+    with open(path,"rb") as f:
+        return pickle.load(f)
+
+
+def load_model(model_path):
+    """Return (tokenizer, model) loaded from a model folder."""
+    # Load the tokenizer from the saved folder
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+
+    # Load the model from the saved folder
+    model = AutoModelForTokenClassification.from_pretrained(model_path)
+    return tokenizer, model
+
+
+def read_pos_sentences(data):
+    """Return (sentence_data, pos_data): the words and POS tags of every sentence in POS output lines."""
+    pos_data = []
+    sentence_data = []
+    sent = []
+    tok = []
+    #print(f"len of data : {len(data)}")
+    for i in range(len(data)):
+        #print(f"line -->{i}")
+        if (data[i] != "\n") and ("<Sentence" not in data[i]) and ("</Sentence>" not in data[i]):
+            pos = data[i].split("\t")[2].strip()
+            token = data[i].split("\t")[1].strip()
+            sent.append(pos)
+            tok.append(token)
+        elif data[i]=="\n" or i == (len(data)-1):
+            pos_data.append(sent)
+            sentence_data.append(tok)
+            sent = []
+            tok = []
+    #print(f"Len of sentence_data: {len(sentence_data)}")
+    return sentence_data, pos_data
+
+
 def get_predictions( sentence, tokenizer, model ):
   # Let us first tokenize the sentence - split words into subwords
   tok_sentence = tokenizer(sentence, return_tensors='pt')
@@ -81,39 +85,130 @@ def get_predictions( sentence, tokenizer, model ):
     return predicted_labels
 
 
-predicted_chunk_tags = []
-print(f"Len of pos tags:{len(pos_data)}")
-print(f"Len of Sentence :{len(sentence_data)}")
-
-print(sentence_data,pos_data)
-for i in range(len(sentence_data)):
-    d = sentence_data[i]
-    sentence = " ".join(d)
-    sentence = sentence.replace("\u200c","")
-    
-
-    predicted_labels = get_predictions(sentence=sentence, 
-                                   tokenizer=tokenizer,
-                                   model=model
-                                   )
-    chunk = []
-    print(i,len(sentence.split(" ")),len(predicted_labels))
-
-    for index in range(len(sentence.split(' '))):
-        #print(f"Label : {predicted_labels[index]}")
-        tag_id = int(predicted_labels[index].split("_")[1])
-        tag = encoding_dict[tag_id]
-        chunk.append(tag)
-        
-    predicted_chunk_tags.append(chunk)
+def get_batch_predictions( sentences, tokenizer, model ):
+  """get_predictions for several sentences in one padded forward pass."""
+  tok_sentences = tokenizer(sentences, return_tensors='pt', padding=True)
 
-outfile = args.output
+  with torch.no_grad():
+    logits = model(**tok_sentences).logits.argmax(-1)
 
-with open(outfile,"w",encoding='utf-8') as outf:
+  batch_labels = []
+  for b in range(len(sentences)):
+    predicted_tokens_classes = [model.config.id2label[t.item()] for t in logits[b]]
+    predicted_labels = []
+    previous_token_id = 0
+    # padding and special tokens have no word id; only the first sub-word of a word is labelled
+    word_ids = tok_sentences.word_ids(batch_index=b)
+    for word_index in range(len(word_ids)):
+        if word_ids[word_index] == None:
+            previous_token_id = word_ids[word_index]
+        elif word_ids[word_index] == previous_token_id:
+            previous_token_id = word_ids[word_index]
+        else:
+            predicted_labels.append( predicted_tokens_classes[ word_index ] )
+            previous_token_id = word_ids[word_index]
+    batch_labels.append(predicted_labels)
+  return batch_labels
+
+
+def tag_sentences(sentence_data, pos_data, tokenizer, model, encoding_dict, batch_size=1, tag_cache=None, loader=None):
+    """Return the predicted chunk tags of every sentence (lists of words).
+
+    With batch_size > 1, that many sentences go through the model in one
+    padded forward pass. Each distinct sentence is predicted once, and
+    with a tag_cache (tag_cache.TagCacheView) only those it does not
+    hold; the new predictions are added to it. If tokenizer and model are
+    None, loader() returns them, and is only called if some sentence has
+    to go through the model.
+    """
+    predicted_chunk_tags = []
+    logger.debug("Len of pos tags:%d", len(pos_data))
+    logger.debug("Len of Sentence :%d", len(sentence_data))
+
+    logger.debug("%s %s", sentence_data, pos_data)
+    sentences = [" ".join(d).replace("\u200c","") for d in sentence_data]
+    distinct = list(dict.fromkeys(sentences))
+    labels = tag_cache.get_many(distinct) if tag_cache is not None else {}
+    missing = [sentence for sentence in distinct if sentence not in labels]
+    predicted = {}
+    if missing and model is None:
+        tokenizer, model = loader()
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        if batch_size > 1:
+            batch_labels = get_batch_predictions(batch, tokenizer, model)
+        else:
+            batch_labels = [get_predictions(sentence=batch[0], 
+                                            tokenizer=tokenizer,
+                                            model=model
+                                            )]
+        predicted.update(zip(batch, batch_labels))
+    if tag_cache is not None and predicted:
+        tag_cache.put_many(predicted)
+    labels.update(predicted)
+
+    for i, sentence in enumerate(sentences):
+        predicted_labels = labels[sentence]
+        chunk = []
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%d %d %d", i, len(sentence.split(" ")), len(predicted_labels))
+
+        for index in range(len(sentence.split(' '))):
+            #print(f"Label : {predicted_labels[index]}")
+            tag_id = int(predicted_labels[index].split("_")[1])
+            tag = encoding_dict[tag_id]
+            chunk.append(tag)
+            
+        predicted_chunk_tags.append(chunk)
+    return predicted_chunk_tags
+
+
+def feature_lines(sentence_data, pos_data, predicted_chunk_tags):
+    """Yield the lines of the feature file ('word, POS tag, chunk tag', blank line after a sentence)."""
     for i in range(len(sentence_data)):
         s = sentence_data[i]
         p = pos_data[i]
         c = predicted_chunk_tags[i]
         for j in range(len(s)):
-            outf.write(f"{s[j]}\t{p[j]}\t{c[j]}\n")
-        outf.write("\n")
+            yield f"{s[j]}\t{p[j]}\t{c[j]}\n"
+        yield "\n"
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Token Classification")
+    parser.add_argument("--input", type=str, help="Input file path")
+    parser.add_argument("--output", type=str, help="Output file path")
+    parser.add_argument("--model", type=str, help="Model path")
+    parser.add_argument("--tag-cache", type=str, default=None,
+                        help="SQLite sentence tag cache to read and fill (default: none, the model tags every sentence)")
+    parser.add_argument("--no-tag-cache", action="store_true", help="Ignore --tag-cache and run the model on every sentence")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG also logs the words, sub-word ids and labels of every sentence")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s")
+
+    encoding_dict = load_encoding_dict()
+
+    tag_cache = None
+    if args.tag_cache and not args.no_tag_cache:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+        from tag_cache import SentenceTagCache
+        tag_cache = SentenceTagCache(args.tag_cache).for_model("chunk", args.model)
+
+    with open(args.input,"r",encoding='utf-8') as f:
+        data = f.readlines()
+    sentence_data, pos_data = read_pos_sentences(data)
+
+    # The model is only loaded if some sentence is not in the tag cache
+    predicted_chunk_tags = tag_sentences(sentence_data, pos_data, None, None, encoding_dict,
+                                         tag_cache=tag_cache, loader=lambda: load_model(args.model))
+    if tag_cache is not None:
+        print(tag_cache.summary())
+
+    with open(args.output,"w",encoding='utf-8') as outf:
+        outf.writelines(feature_lines(sentence_data, pos_data, predicted_chunk_tags))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,12 @@ import os
 
 def read_feature_file_and_create_ssf_sentences(file_path, opr):
     """Read a feature file and create ssf sentences."""
+    with open(file_path, 'r', encoding='utf-8') as fin:
+        return create_ssf_sentences(fin.readlines(), opr)
+
+
+def create_ssf_sentences(lines, opr):
+    """Create ssf sentences from the lines of a feature file."""
     sent_count = 1
     cntr = 1
     subcntr = 1
@@ -14,7 +20,6 @@ def read_feature_file_and_create_ssf_sentences(file_path, opr):
     prev_sent_count = 0
     sentences = []
     if opr == 1:
-        lines = open(file_path, 'r', encoding='utf-8').readlines()
         sent_string += "<Sentence id='" + str(sent_count) + "'>\n"
         for line in lines:
             line = line.strip()
@@ -60,7 +65,6 @@ def read_feature_file_and_create_ssf_sentences(file_path, opr):
                     subcntr = 1
                     prev_tag = ''
     else:
-        lines = open(file_path, 'r', encoding='utf-8').readlines()
         sent_string += "<Sentence id='" + str(sent_count) + "'>\n"
         for line in lines:
             line = line.strip()
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import platform
+import resource
+from contextlib import contextmanager
+
+
+# ----------- Per-stage instrumentation -----------
+# PipelineMetrics records, for every stage of a run: wall and CPU time,
+# the process's peak RSS when the stage ended, and sentences/tokens per
+# second over the corpus the run processed. Stages may nest (the model
+# load runs inside the first tagging stage that needs it); a nested
+# stage is reported on its own and excluded from its parent's times, so
+# "pos" is inference and "pos_model_load" is loading. With a profile
+# directory, each outermost stage is run under cProfile and its stats are
+# written to <profile_dir>/<stage>.prof (and a top-30 .txt summary).
+# When stages run concurrently, their times overlap; the caller then sets
+# elapsed, and the total wall time is that rather than the sum.
+# --------------------------------------------------
+
+PROFILE_TOP = 30
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size in MB of this process (or, with RUSAGE_CHILDREN, its largest child)."""
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def corpus_volume(conll_lines):
+    """(sentences, tokens) of CoNLL lines (one word per line, blank line after a sentence)."""
+    sentences = tokens = 0
+    for line in conll_lines:
+        if line.strip():
+            tokens += 1
+        else:
+            sentences += 1
+    return sentences, tokens
+
+
+class PipelineMetrics:
+    """Wall/CPU time, peak RSS and throughput of each stage; see the module comment."""
+
+    def __init__(self, profile_dir=None):
+        self.profile_dir = profile_dir
+        self.stages = {}
+        self.sentences = 0
+        self.tokens = 0
+        self.started = time.time()
+        self.elapsed = None
+        self._open = []   # [name, nested wall, nested cpu] of the stages being timed
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    def set_volume(self, sentences, tokens):
+        self.sentences = sentences
+        self.tokens = tokens
+
+    @contextmanager
+    def stage(self, name):
+        profiler = None
+        if self.profile_dir and not self._open:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        frame = [name, 0.0, 0.0]
+        self._open.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._open.pop()
+            if self._open:
+                self._open[-1][1] += wall
+                self._open[-1][2] += cpu
+            if profiler is not None:
+                profiler.disable()
+                self._dump_profile(name, profiler)
+            self.add(name, wall - frame[1], cpu - frame[2], peak_rss_mb())
+
+    def add(self, name, wall, cpu, rss_mb):
+        """Record one run of a stage timed elsewhere (e.g. a child process)."""
+        entry = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_mb": 0.0})
+        entry["calls"] += 1
+        entry["wall_s"] += wall
+        entry["cpu_s"] += cpu
+        entry["peak_rss_mb"] = max(entry["peak_rss_mb"], rss_mb)
+
+    def _dump_profile(self, name, profiler):
+        path = os.path.join(self.profile_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        with open(os.path.join(self.profile_dir, f"{name}.txt"), "w", encoding="utf-8") as out:
+            pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+    def report(self):
+        """The metrics as a JSON-serializable dict."""
+        stages = {}
+        for name, entry in self.stages.items():
+            stage = {key: round(value, 4) if isinstance(value, float) else value for key, value in entry.items()}
+            if self.sentences and not name.endswith("_model_load"):
+                stage["sentences_per_s"] = round(self.sentences / entry["wall_s"], 1) if entry["wall_s"] else None
+                stage["tokens_per_s"] = round(self.tokens / entry["wall_s"], 1) if entry["wall_s"] else None
+            stages[name] = stage
+        wall = self.elapsed if self.elapsed is not None else sum(entry["wall_s"] for entry in self.stages.values())
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+            "python": platform.python_version(),
+            "sentences": self.sentences,
+            "tokens": self.tokens,
+            "stages": stages,
+            "total": {
+                "wall_s": round(wall, 4),
+                "cpu_s": round(sum(entry["cpu_s"] for entry in self.stages.values()), 4),
+                "model_load_s": round(sum(entry["wall_s"] for name, entry in self.stages.items()
+                                          if name.endswith("_model_load")), 4),
+                "peak_rss_mb": round(max([entry["peak_rss_mb"] for entry in self.stages.values()] or [0.0]), 1),
+                "sentences_per_s": round(self.sentences / wall, 1) if wall and self.sentences else None,
+                "tokens_per_s": round(self.tokens / wall, 1) if wall and self.tokens else None,
+            },
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump(self.report(), out, indent=2)
+
+    def table(self):
+        """The per-stage metrics as printable lines."""
+        report = self.report()
+        lines = [f"{'stage':<18}{'wall s':>9}{'cpu s':>9}{'sent/s':>10}{'tok/s':>11}{'peak MB':>9}"]
+        rate = lambda value, width: f"{value:>{width}.1f}" if value else " " * width
+        for name, s in [*report["stages"].items(), ("total", report["total"])]:
+            lines.append(f"{name:<18}{s['wall_s']:>9.3f}{s['cpu_s']:>9.3f}{rate(s.get('sentences_per_s'), 10)}"
+                         f"{rate(s.get('tokens_per_s'), 11)}{s['peak_rss_mb']:>9.1f}")
+        return lines
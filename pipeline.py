@@ -0,0 +1,422 @@
+import io
+import os
+import sys
+import time
+import queue
+import threading
+from contextlib import nullcontext
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+for _stage_dir in ("Token", "pos_tag", "chunk_tag", "check_pos"):
+    sys.path.insert(0, os.path.join(PROJECT_DIR, _stage_dir))
+
+import tokenizer_for_indian_languages_on_files as tokenizer  # noqa: E402
+import create_conll  # noqa: E402
+import read_feature_files_and_convert_into_ssf as ssf_converter  # noqa: E402
+import check_pos  # noqa: E402
+from stage_cache import model_fingerprint  # noqa: E402
+from instrumentation import corpus_volume, peak_rss_mb  # noqa: E402
+
+
+# ----------- In-process pipeline -----------
+# The same six stages all.py used to run as separate `python` processes,
+# called as functions. Each stage takes and returns the lines its script
+# would have read and written, so the output is identical, but nothing
+# touches the disk unless intermediate files are asked for. A Pipeline
+# loads both models and the lexicon once and can then run any number of
+# inputs.
+# -------------------------------------------
+
+STAGES = ["tokenized", "conll", "pos", "chunk", "ssf"]
+INTERMEDIATE_FILES = {
+    "tokenized": "tokenized_output.txt",
+    "conll": "conll_output.txt",
+    "pos": "Final_POS_Output.txt",
+    "chunk": "chunk_output.txt",
+    "ssf": "ssf_output.txt",
+}
+
+
+def use_project_dir():
+    """Make the project directory the working directory.
+
+    check_pos names the paradigm folders, the compiled lexicon and the
+    frequency store relative to it, and reports suggestions with those
+    relative paths, so in-process callers run from there just as all.py
+    runs the check_pos script.
+    """
+    os.chdir(PROJECT_DIR)
+
+
+def _lines(text):
+    """Split text the way readlines() splits a file (on '\n' only, keeping the newlines)."""
+    return io.StringIO(text).readlines()
+
+
+def tokenize_text(text, lang):
+    """Stage 1: raw text -> tokenizer output lines."""
+    sentences = tokenizer.split_sentences(text, tokenizer.language_type(lang))
+    return _lines(tokenizer.format_sentences(sentences) + "\n")
+
+
+def to_conll(tokenized_lines):
+    """Stage 2: tokenizer output lines -> CoNLL lines (one word per line)."""
+    return list(create_conll.conll_lines(tokenized_lines))
+
+
+def pos_tag(conll_lines, tokenizer_model, encoding_dict, batch_size=1, tag_cache=None, loader=None):
+    """Stage 3: CoNLL lines -> POS output lines, tagged by (tokenizer, model).
+
+    tokenizer_model may be (None, None) with a loader returning the pair
+    when the model is first needed (see run_pos_new.tag_sentences).
+    """
+    return pos_tag_many([conll_lines], tokenizer_model, encoding_dict, batch_size, tag_cache, loader)[0]
+
+
+def chunk_tag(pos_lines, tokenizer_model, encoding_dict, batch_size=1, tag_cache=None, loader=None):
+    """Stage 4: POS output lines -> feature lines (word, POS tag, chunk tag)."""
+    return chunk_tag_many([pos_lines], tokenizer_model, encoding_dict, batch_size, tag_cache, loader)[0]
+
+
+def _split(flat, sizes):
+    parts = []
+    start = 0
+    for size in sizes:
+        parts.append(flat[start:start + size])
+        start += size
+    return parts
+
+
+def pos_tag_many(documents, tokenizer_model, encoding_dict, batch_size=1, tag_cache=None, loader=None):
+    """pos_tag for several documents' CoNLL lines, their sentences sharing model batches."""
+    import run_pos_new
+    sentence_data = [run_pos_new.read_sentences(lines) for lines in documents]
+    flat = [sentence for sentences in sentence_data for sentence in sentences]
+    tags = run_pos_new.tag_sentences(flat, *tokenizer_model, encoding_dict, batch_size=batch_size,
+                                     tag_cache=tag_cache, loader=loader)
+    return [list(run_pos_new.pos_lines(sentences, document_tags))
+            for sentences, document_tags in zip(sentence_data, _split(tags, map(len, sentence_data)))]
+
+
+def chunk_tag_many(documents, tokenizer_model, encoding_dict, batch_size=1, tag_cache=None, loader=None):
+    """chunk_tag for several documents' POS lines, their sentences sharing model batches."""
+    import generate_features
+    parsed = [generate_features.read_pos_sentences(lines) for lines in documents]
+    flat_words = [sentence for sentences, _ in parsed for sentence in sentences]
+    flat_pos = [pos for _, pos_data in parsed for pos in pos_data]
+    tags = generate_features.tag_sentences(flat_words, flat_pos, *tokenizer_model, encoding_dict,
+                                           batch_size=batch_size, tag_cache=tag_cache, loader=loader)
+    return [list(generate_features.feature_lines(sentences, pos_data, document_tags))
+            for (sentences, pos_data), document_tags in zip(parsed, _split(tags, [len(s) for s, _ in parsed]))]
+
+
+def to_ssf(feature_lines):
+    """Stage 5: feature lines -> SSF lines with chunk brackets."""
+    return _lines("\n".join(ssf_converter.create_ssf_sentences(feature_lines, 1)) + "\n")
+
+
+# ----------- Streaming execution -----------
+# Pipeline.stream() runs the stages concurrently on batches of sentences,
+#   tokenizer + CoNLL -> POS -> chunk + SSF -> check_pos + output
+# one thread per stage, connected by bounded queues. A stage that gets
+# queue_size batches ahead of the next one blocks (backpressure), so only
+# a few batches are in memory whatever the corpus size, and since every
+# stage takes its batches in FIFO order the output keeps the input order.
+# torch releases the GIL during a forward pass, so the model stages
+# overlap with the Python text stages and the lexicon checks.
+# --------------------------------------------
+
+_DONE = object()
+POLL_SECONDS = 0.1
+
+
+class _Stopped(Exception):
+    """Raised in a stage thread when another stage has failed."""
+
+
+def sentence_batches(lines, lang, batch_sentences):
+    """Yield lists of at most batch_sentences tokenized sentences from raw text lines.
+
+    The tokenizer splits every line on its own, so this gives the same
+    sentences as tokenize_text on the whole text.
+    """
+    lang_type = tokenizer.language_type(lang)
+    batch = []
+    for line in lines:
+        batch += tokenizer.split_sentences(line, lang_type)
+        while len(batch) >= batch_sentences:
+            yield batch[:batch_sentences]
+            batch = batch[batch_sentences:]
+    if batch:
+        yield batch
+
+
+class _StageThread(threading.Thread):
+    """Applies function to every batch from inbox (a queue, or an iterable for the first stage).
+
+    Results go to outbox (None for the last stage). wall and cpu exclude
+    the time spent waiting on the queues.
+    """
+
+    def __init__(self, name, function, inbox, outbox, stop):
+        super().__init__(name=f"stream-{name}", daemon=True)
+        self.stage = name
+        self.function = function
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stop = stop
+        self.error = None
+        self.waited = self.wall = self.cpu = 0.0
+
+    def _receive(self):
+        while True:
+            start = time.perf_counter()
+            while True:
+                if self.stop.is_set():
+                    raise _Stopped()
+                try:
+                    item = self.inbox.get(timeout=POLL_SECONDS)
+                    break
+                except queue.Empty:
+                    continue
+            self.waited += time.perf_counter() - start
+            if item is _DONE:
+                return
+            yield item
+
+    def _send(self, item):
+        start = time.perf_counter()
+        while True:
+            if self.stop.is_set():
+                raise _Stopped()
+            try:
+                self.outbox.put(item, timeout=POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        self.waited += time.perf_counter() - start
+
+    def run(self):
+        start, cpu = time.perf_counter(), time.thread_time()
+        try:
+            batches = self._receive() if isinstance(self.inbox, queue.Queue) else self.inbox
+            for batch in batches:
+                result = self.function(batch)
+                if self.outbox is not None:
+                    self._send(result)
+            if self.outbox is not None:
+                self._send(_DONE)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self.error = e
+            self.stop.set()
+        finally:
+            self.wall = time.perf_counter() - start - self.waited
+            self.cpu = time.thread_time() - cpu
+
+
+class Pipeline:
+    """Tokenizer, POS tagger, chunk tagger, SSF conversion and check_pos in one process.
+
+    Both models, the category map and the lexicon (with its indexes) are
+    loaded when the pipeline is created (the models on first use if not
+    preload) and reused by every run().
+    check_options are check_pos's parsed arguments (default:
+    check_pos.parse_args([])); lexicon replaces the compiled lexicon (e.g.
+    with a WatchedLexicon). batch_size sentences share one padded forward
+    pass of each model. With a tag_cache (tag_cache.SentenceTagCache) the
+    models only see sentences it has no labels for. With metrics
+    (instrumentation.PipelineMetrics), run() times every stage and model
+    load.
+    """
+
+    def __init__(self, pos_model, chunk_model, lang, check_options=None,
+                 category_map=os.path.join(PROJECT_DIR, "check_pos", "category_map.py"), log=print,
+                 lexicon=None, batch_size=1, preload=True, tag_cache=None, metrics=None):
+        self.pos_model_path = pos_model
+        self.chunk_model_path = chunk_model
+        self.lang = lang
+        self.log = log
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self._pos = self._chunk = None
+        self._encodings = {}
+        self.tag_caches = []
+        if tag_cache is not None:
+            self.tag_caches = [tag_cache.for_model("pos", pos_model), tag_cache.for_model("chunk", chunk_model)]
+        if preload:
+            self.load_models()
+        self.fs_dict = check_pos.load_category_map(category_map)
+        self.checker = check_pos.PosChecker(check_options or check_pos.parse_args([]), lexicon=lexicon)
+
+    def load_models(self):
+        self.pos_tagger()
+        self.chunk_tagger()
+
+    def pos_tagger(self):
+        """((tokenizer, model), encoding_dict) of the POS model, loaded on first use."""
+        import run_pos_new
+        if self._pos is None:
+            self.log(f"Loading POS model from {self.pos_model_path}")
+            with self._timed("pos_model_load"):
+                self._pos = run_pos_new.load_model(self.pos_model_path)
+        return self._pos, self._encoding("pos")
+
+    def chunk_tagger(self):
+        """((tokenizer, model), encoding_dict) of the chunk model, loaded on first use."""
+        import generate_features
+        if self._chunk is None:
+            self.log(f"Loading chunk model from {self.chunk_model_path}")
+            with self._timed("chunk_model_load"):
+                self._chunk = generate_features.load_model(self.chunk_model_path)
+        return self._chunk, self._encoding("chunk")
+
+    def _timed(self, stage):
+        return self.metrics.stage(stage) if self.metrics is not None else nullcontext()
+
+    def _encoding(self, tagger):
+        if tagger not in self._encodings:
+            import run_pos_new
+            import generate_features
+            module = run_pos_new if tagger == "pos" else generate_features
+            self._encodings[tagger] = module.load_encoding_dict()
+        return self._encodings[tagger]
+
+    def _stage_args(self, tagger):
+        """(tokenizer_model, encoding_dict, batch_size, tag_cache, loader) for pos_tag/chunk_tag.
+
+        A model that is not loaded yet is passed as a loader, so with a tag
+        cache it is only loaded once some sentence misses the cache.
+        """
+        load = self.pos_tagger if tagger == "pos" else self.chunk_tagger
+        loaded = self._pos if tagger == "pos" else self._chunk
+        tag_cache = self.tag_caches[tagger == "chunk"] if self.tag_caches else None
+        return (loaded or (None, None), self._encoding(tagger), self.batch_size, tag_cache,
+                lambda: load()[0])
+
+    def stages(self, text, cache=None, force=()):
+        """Yield (stage name, lines) for stages 1-5 on raw text.
+
+        With a StageCache, a stage whose key (input, code version, model,
+        parameters) is cached is not run, unless it is in force; its output
+        comes from the cache, and the models are only loaded if a stage
+        that needs them has to run.
+        """
+        steps = [
+            ("tokenized", lambda _: tokenize_text(text, self.lang), None, self.lang),
+            ("conll", to_conll, None, None),
+            ("pos", lambda lines: pos_tag(lines, *self._stage_args("pos")),
+             self.pos_model_path, None),
+            ("chunk", lambda lines: chunk_tag(lines, *self._stage_args("chunk")),
+             self.chunk_model_path, None),
+            ("ssf", to_ssf, None, None),
+        ]
+        lines = None
+        for stage, compute, model_dir, params in steps:
+            with self._timed(stage):
+                if cache is None:
+                    lines = compute(lines)
+                else:
+                    stage_input = text if lines is None else "".join(lines)
+                    key = cache.key(stage, stage_input, model_fingerprint(model_dir) if model_dir else None, params)
+                    cached = cache.get(key) if stage not in force else None
+                    if cached is not None:
+                        self.log(f"   {stage}: from stage cache")
+                        lines = _lines(cached)
+                    else:
+                        lines = compute(lines)
+                        cache.put(key, "".join(lines))
+            if stage == "conll" and self.metrics is not None:
+                self.metrics.set_volume(*corpus_volume(lines))
+            yield stage, lines
+
+    def run(self, text, out, intermediate_dir=None, cache=None, force=()):
+        """Run every stage on raw text and write check_pos's output to the file object out.
+
+        With intermediate_dir, each stage's output is also written there
+        under the file names all.py has always used. cache and force are
+        passed to stages().
+        """
+        for stage, lines in self.stages(text, cache, force):
+            if intermediate_dir:
+                with open(os.path.join(intermediate_dir, INTERMEDIATE_FILES[stage]), "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+        with self._timed("check"):
+            self.checker.write(check_pos.iter_ssf_tokens(lines, self.fs_dict), out)
+
+    def stream(self, lines, out, batch_sentences=64, queue_size=4):
+        """Run every stage concurrently on raw text lines, writing check_pos's output to out in input order.
+
+        lines is any iterable of lines (e.g. an open file, read as the
+        tokenizer stage needs them). Sentences travel in batches of
+        batch_sentences, and each queue between stages holds at most
+        queue_size batches. The output is the same as run()'s. Both models
+        are loaded before the stages start; the stage cache and
+        intermediate files do not apply.
+        """
+        start = time.perf_counter()
+        self.load_models()
+        volume = [0, 0]
+
+        def tokenize_batch(sentences):
+            conll = to_conll(_lines(tokenizer.format_sentences(sentences) + "\n"))
+            sentence_count, token_count = corpus_volume(conll)
+            volume[0] += sentence_count
+            volume[1] += token_count
+            return conll
+
+        def chunk_and_convert(lines):
+            return list(check_pos.iter_ssf_tokens(to_ssf(chunk_tag(lines, *self._stage_args("chunk"))), self.fs_dict))
+
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=queue_size) for _ in range(3)]
+        threads = [
+            _StageThread("tokenized+conll", tokenize_batch,
+                         sentence_batches(lines, self.lang, batch_sentences), queues[0], stop),
+            _StageThread("pos", lambda lines: pos_tag(lines, *self._stage_args("pos")), queues[0], queues[1], stop),
+            _StageThread("chunk+ssf", chunk_and_convert, queues[1], queues[2], stop),
+            _StageThread("check", lambda tokens: self.checker.write(tokens, out), queues[2], None, stop),
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            stop.set()
+        for thread in threads:
+            if thread.error is not None:
+                raise thread.error
+        if self.metrics is not None:
+            self.metrics.set_volume(*volume)
+            for thread in threads:
+                self.metrics.add(thread.stage, thread.wall, thread.cpu, peak_rss_mb())
+            self.metrics.elapsed = time.perf_counter() - start
+
+    def check_texts(self, texts, timings=None):
+        """Run every stage on several texts at once; returns a list of result_record dicts per text.
+
+        Sentences of all texts share model batches and the word checks are
+        deduplicated across texts. If timings is a dict, the seconds spent
+        in each stage are added to it.
+        """
+        timings = {} if timings is None else timings
+
+        def timed(stage, function, *args):
+            start = time.perf_counter()
+            value = function(*args)
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+            return value
+
+        documents = timed("tokenize", lambda: [tokenize_text(text, self.lang) for text in texts])
+        documents = timed("conll", lambda: [to_conll(lines) for lines in documents])
+        documents = timed("pos", pos_tag_many, documents, *self._stage_args("pos"))
+        documents = timed("chunk", chunk_tag_many, documents, *self._stage_args("chunk"))
+        documents = timed("ssf", lambda: [to_ssf(lines) for lines in documents])
+        tokens = [list(check_pos.iter_ssf_tokens(lines, self.fs_dict)) for lines in documents]
+        records = timed("check", self.checker.records, [token for document in tokens for token in document])
+        return _split(records, map(len, tokens))
+
+    def close(self):
+        self.checker.close()
@@ -87,6 +87,38 @@ def _prepare_input_path(input_arg):
     raise FileNotFoundError(f"Input path not found and not a Drive URL: {input_arg}")
 
 
+def conll_lines(data):
+    """Yield the CoNLL output lines (one word per line, a blank line after each sentence) for tokenizer output lines."""
+    data = [i for i in data if i != "\n"]
+
+    key_words = ["<document", "<head>", "</head>", "</document"]
+    for i in range(len(data)):
+        line = data[i]
+        # print(f"Line --> {line}")
+
+        flag = 0
+        for key in key_words:
+            if key in line:
+                flag = 1
+                # f.write(f"{line}")
+                break
+        if flag == 0:
+            if "((" in line or "))" in line or "<Sentence" in line:
+                # f.write(f"{line}")
+                continue
+            # print(f"Line --> {line}")
+            if "</Sentence" in line:
+                yield "\n"
+            else:
+                parts = line.split("\t")
+                if len(parts) < 2:
+                    continue
+                word = parts[1]
+                if "\n" in word:
+                    word = word.replace("\n", "")
+                yield f"{word}\n"
+
+
 def main():
     inputfile = sys.argv[1]
     inputfile_local = _prepare_input_path(inputfile)
@@ -94,41 +126,10 @@ def main():
     with open(inputfile_local, "r", encoding='utf-8') as f:
         data = f.readlines()
 
-    data = [i for i in data if i != "\n"]
-
     output = sys.argv[2]
 
-    key_words = ["<document", "<head>", "</head>", "</document"]
     with open(output, "w", encoding='utf-8') as outf:
-        for i in range(len(data)):
-            line = data[i]
-            # print(f"Line --> {line}")
-            if i < len(data) - 1:
-                next_line = data[i + 1]
-            else:
-                next_line = "NULL"
-
-            flag = 0
-            for key in key_words:
-                if key in line:
-                    flag = 1
-                    # f.write(f"{line}")
-                    break
-            if flag == 0:
-                if "((" in line or "))" in line or "<Sentence" in line:
-                    # f.write(f"{line}")
-                    continue
-                # print(f"Line --> {line}")
-                if "</Sentence" in line:
-                    outf.write("\n")
-                else:
-                    parts = line.split("\t")
-                    if len(parts) < 2:
-                        continue
-                    word = parts[1]
-                    if "\n" in word:
-                        word = word.replace("\n", "")
-                    outf.write(f"{word}\n")
+        outf.writelines(conll_lines(data))
 
 
 if __name__ == '__main__':
@@ -7,8 +7,11 @@ from transformers import AutoModelForTokenClassification, AutoConfig, AutoTokeni
 import numpy as np
 import torch
 import pickle
+import logging
 import argparse
 
+logger = logging.getLogger(__name__)
+
 
 def _ensure_gdown():
     try:
@@ -73,43 +76,42 @@ def _prepare_path(path_arg, expect_dir=False):
     raise FileNotFoundError(f"Path not found and not a Drive URL: {path_arg}")
 
 
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description="Token Classification")
-parser.add_argument("--input", type=str, help="Input file path")
-parser.add_argument("--output", type=str, help="Output file path")
-parser.add_argument("--model", type=str, help="Model path")
-#parser.add_argument("--path", type=str, help="path")
-args = parser.parse_args()
+ENCODING_DICT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "encoding_dict.pickle")
+
 
-#dict_path = args.path
+def load_encoding_dict(path=ENCODING_DICT_PATH):
+    """Return the {tag id: POS tag} table the model's labels refer to."""
+    with open(path, "rb") as f:
+        return pickle.load(f)
 
-with open(f"encoding_dict.pickle","rb") as f:
-    encoding_dict = pickle.load(f)
 
-# If model is a Drive URL or non-local path, download it and use the local folder
-tokenizer_path = _prepare_path(args.model, expect_dir=True) if args.model else None
-model_path = tokenizer_path
+def load_model(model_arg):
+    """Return (tokenizer, model) loaded from a model folder (or a Drive URL, downloaded first)."""
+    # If model is a Drive URL or non-local path, download it and use the local folder
+    tokenizer_path = _prepare_path(model_arg, expect_dir=True)
+    model_path = tokenizer_path
 
-# Load the tokenizer from the saved folder
-tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+    # Load the tokenizer from the saved folder
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
 
-# Load the model from the saved folder
-model = AutoModelForTokenClassification.from_pretrained(model_path)
+    # Load the model from the saved folder
+    model = AutoModelForTokenClassification.from_pretrained(model_path)
+    return tokenizer, model
 
-sentence_data = []
-# Prepare input file - supports local path or Drive URL
-conll_file = _prepare_path(args.input, expect_dir=False) if args.input else None
 
-with open(conll_file, "r", encoding='utf-8') as f:
-    data = f.readlines()
+def read_sentences(data):
+    """Group CoNLL lines (one word per line, blank line after a sentence) into lists of words."""
+    sentence_data = []
+    sent = []
+    for i in range(len(data)):
+        if data[i] != "\n":
+            sent.append(data[i].strip())
+        else:
+            sentence_data.append(sent)
+            sent = []
+    return sentence_data
+
 
-sent = []
-for i in range(len(data)):
-	if data[i] != "\n":
-		sent.append(data[i].strip())
-	else:
-		sentence_data.append(sent)
-		sent = []
 cnt = 0
 def get_predictions( sentence, tokenizer, model ):
   # Let us first tokenize the sentence - split words into subwords
@@ -132,7 +134,7 @@ def get_predictions( sentence, tokenizer, model ):
     # we need to assign the named entity label to the head word and not the following sub-words
     word_ids = tok_sentence.word_ids()
     cnt+=1
-    print(f"{cnt}-->Word IDs\n{word_ids}")
+    logger.debug("%d-->Word IDs\n%s", cnt, word_ids)
     for word_index in range(len(word_ids)):
         if word_ids[word_index] == None:
             previous_token_id = word_ids[word_index]
@@ -142,55 +144,154 @@ def get_predictions( sentence, tokenizer, model ):
             predicted_labels.append( predicted_tokens_classes[ word_index ] )
             previous_token_id = word_ids[word_index]
     
-    print(len(predicted_labels))
-    print(sentence)
-    print(predicted_labels)
+    logger.debug("%d labels for %s\n%s", len(predicted_labels), sentence, predicted_labels)
     return predicted_labels
 
 
-predicted_pos_tags = []
-for i in range(len(sentence_data)):
-    d = sentence_data[i]
-    print(len(d))
-    sentence = " ".join(d)
-    if "\u200c" in sentence:
-        print("200c",sentence)
-    if "\u200b" in sentence:
-        print("200b",sentence)
-    if "\u200d" in sentence:
-        print("200d",sentence)
-
-    sentence = sentence.replace("\u200b","")
-    sentence = sentence.replace("\u200c","")
-    sentence = sentence.replace("\u200d","")    
-
-    predicted_labels = get_predictions(sentence=sentence, 
-                                   tokenizer=tokenizer,
-                                   model=model
-                                   )
-    pos = []
-    #print(len(sentence.split(" ")))
-    #print(len(predicted_labels))
-
-    for index in range(len(sentence.split(' '))):
-        #print(f"Label : {predicted_labels[index]}")
-        tag_id = int(predicted_labels[index].split("_")[1])
-        tag = encoding_dict[tag_id]
-        pos.append(tag)
-        
-    predicted_pos_tags.append(pos)
-
-outfile = args.output
-
-with open(outfile,"w",encoding='utf-8') as outf:
+def get_batch_predictions( sentences, tokenizer, model ):
+  """get_predictions for several sentences in one padded forward pass."""
+  tok_sentences = tokenizer(sentences, return_tensors='pt', padding=True)
+
+  with torch.no_grad():
+    logits = model(**tok_sentences).logits.argmax(-1)
+
+  batch_labels = []
+  for b in range(len(sentences)):
+    predicted_tokens_classes = [model.config.id2label[t.item()] for t in logits[b]]
+    predicted_labels = []
+    previous_token_id = 0
+    # padding and special tokens have no word id; only the first sub-word of a word is labelled
+    word_ids = tok_sentences.word_ids(batch_index=b)
+    for word_index in range(len(word_ids)):
+        if word_ids[word_index] == None:
+            previous_token_id = word_ids[word_index]
+        elif word_ids[word_index] == previous_token_id:
+            previous_token_id = word_ids[word_index]
+        else:
+            predicted_labels.append( predicted_tokens_classes[ word_index ] )
+            previous_token_id = word_ids[word_index]
+    batch_labels.append(predicted_labels)
+  return batch_labels
+
+
+def tag_sentences(sentence_data, tokenizer, model, encoding_dict, batch_size=1, tag_cache=None, loader=None):
+    """Return the predicted POS tags of every sentence (lists of words).
+
+    With batch_size > 1, that many sentences go through the model in one
+    padded forward pass. Each distinct sentence is predicted once, and
+    with a tag_cache (tag_cache.TagCacheView) only those it does not
+    hold; the new predictions are added to it. If tokenizer and model are
+    None, loader() returns them, and is only called if some sentence has
+    to go through the model.
+    """
+    sentences = []
+    for i in range(len(sentence_data)):
+        d = sentence_data[i]
+        logger.debug("sentence of %d words", len(d))
+        sentence = " ".join(d)
+        if "\u200c" in sentence:
+            logger.debug("200c %s", sentence)
+        if "\u200b" in sentence:
+            logger.debug("200b %s", sentence)
+        if "\u200d" in sentence:
+            logger.debug("200d %s", sentence)
+
+        sentence = sentence.replace("\u200b","")
+        sentence = sentence.replace("\u200c","")
+        sentence = sentence.replace("\u200d","")    
+        sentences.append(sentence)
+
+    predicted_pos_tags = []
+    distinct = list(dict.fromkeys(sentences))
+    labels = tag_cache.get_many(distinct) if tag_cache is not None else {}
+    missing = [sentence for sentence in distinct if sentence not in labels]
+    predicted = {}
+    if missing and model is None:
+        tokenizer, model = loader()
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        if batch_size > 1:
+            batch_labels = get_batch_predictions(batch, tokenizer, model)
+        else:
+            batch_labels = [get_predictions(sentence=batch[0], 
+                                            tokenizer=tokenizer,
+                                            model=model
+                                            )]
+        predicted.update(zip(batch, batch_labels))
+    if tag_cache is not None and predicted:
+        tag_cache.put_many(predicted)
+    labels.update(predicted)
+
+    for sentence in sentences:
+        predicted_labels = labels[sentence]
+        pos = []
+        #print(len(sentence.split(" ")))
+        #print(len(predicted_labels))
+
+        for index in range(len(sentence.split(' '))):
+            #print(f"Label : {predicted_labels[index]}")
+            tag_id = int(predicted_labels[index].split("_")[1])
+            tag = encoding_dict[tag_id]
+            pos.append(tag)
+            
+        predicted_pos_tags.append(pos)
+    return predicted_pos_tags
+
+
+def pos_lines(sentence_data, predicted_pos_tags):
+    """Yield the lines of the POS output file (<Sentence> blocks of 'index, word, tag')."""
     for i in range(len(sentence_data)):
         s = sentence_data[i]
         #t = [i.replace("__","_") for i in predicted_pos_tags[i]]
         t = [i for i in predicted_pos_tags[i]]
-        outf.write(f"<Sentence id='{i+1}'>\n")
+        yield f"<Sentence id='{i+1}'>\n"
         for j in range(len(s)):
-            outf.write(f"{j+1}\t{s[j]}\t{t[j]}\n")
-        outf.write("</Sentence>\n")
+            yield f"{j+1}\t{s[j]}\t{t[j]}\n"
+        yield "</Sentence>\n"
         if i != (len(sentence_data)-1):
-            outf.write("\n")
+            yield "\n"
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Token Classification")
+    parser.add_argument("--input", type=str, help="Input file path")
+    parser.add_argument("--output", type=str, help="Output file path")
+    parser.add_argument("--model", type=str, help="Model path")
+    #parser.add_argument("--path", type=str, help="path")
+    parser.add_argument("--tag-cache", type=str, default=None,
+                        help="SQLite sentence tag cache to read and fill (default: none, the model tags every sentence)")
+    parser.add_argument("--no-tag-cache", action="store_true", help="Ignore --tag-cache and run the model on every sentence")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG also logs the words, sub-word ids and labels of every sentence")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s")
+
+    encoding_dict = load_encoding_dict()
+    model_dir = _prepare_path(args.model, expect_dir=True)
+
+    tag_cache = None
+    if args.tag_cache and not args.no_tag_cache:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+        from tag_cache import SentenceTagCache
+        tag_cache = SentenceTagCache(args.tag_cache).for_model("pos", model_dir)
+
+    # Prepare input file - supports local path or Drive URL
+    conll_file = _prepare_path(args.input, expect_dir=False) if args.input else None
+
+    with open(conll_file, "r", encoding='utf-8') as f:
+        data = f.readlines()
+    sentence_data = read_sentences(data)
+
+    # The model is only loaded if some sentence is not in the tag cache
+    predicted_pos_tags = tag_sentences(sentence_data, None, None, encoding_dict, tag_cache=tag_cache,
+                                       loader=lambda: load_model(model_dir))
+    if tag_cache is not None:
+        print(tag_cache.summary())
+
+    with open(args.output,"w",encoding='utf-8') as outf:
+        outf.writelines(pos_lines(sentence_data, predicted_pos_tags))
+
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import queue
+import shlex
+import socket
+import argparse
+import threading
+import socketserver
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pipeline import PROJECT_DIR, Pipeline, use_project_dir
+import check_pos
+
+
+# ----------- Local spell-check server -----------
+# python server.py --port 8765                 (HTTP on 127.0.0.1)
+# python server.py --socket /tmp/kn-check.sock (HTTP over a Unix socket)
+#
+#   POST /check    body: raw text (or JSON {"text": ...})
+#                  -> {"tokens": [check_pos result records]}
+#   GET  /metrics  queue depth, batch sizes, per-stage latency percentiles
+#   GET  /health
+#
+# The models, category map and lexicon are loaded once. Requests are
+# queued; a single batcher thread takes every request that arrives within
+# --batch-window of the first one (up to --max-batch) and runs them
+# through the pipeline together, so their sentences share padded model
+# batches and their words share lookups.
+# ------------------------------------------------
+
+LATENCY_WINDOW = 1000   # the percentiles cover the most recent samples
+
+
+def percentiles(values):
+    """{"count", "mean", "p50", "p90", "p99", "max"} of a sequence of numbers."""
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    pick = lambda p: values[min(len(values) - 1, int(p / 100 * len(values)))]
+    return {"count": len(values), "mean": round(sum(values) / len(values), 3), "p50": round(pick(50), 3),
+            "p90": round(pick(90), 3), "p99": round(pick(99), 3), "max": round(values[-1], 3)}
+
+
+class ServerMetrics:
+    """Counters and recent samples of batch sizes and latencies (ms), safe to update from any thread."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.time()
+        self.requests = self.errors = self.batches = 0
+        self.batch_requests = deque(maxlen=window)
+        self.batch_tokens = deque(maxlen=window)
+        self.latency = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def _sample(self, name, ms):
+        self.latency.setdefault(name, deque(maxlen=self._window)).append(ms)
+
+    def record_batch(self, requests, tokens, stage_seconds):
+        with self._lock:
+            self.batches += 1
+            self.batch_requests.append(requests)
+            self.batch_tokens.append(tokens)
+            for stage, seconds in stage_seconds.items():
+                self._sample(stage, seconds * 1000)
+
+    def record_request(self, queue_wait, total, failed=False):
+        with self._lock:
+            self.requests += 1
+            self.errors += failed
+            self._sample("queue_wait", queue_wait * 1000)
+            self._sample("request", total * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "requests": self.requests,
+                "errors": self.errors,
+                "batches": self.batches,
+                "batch_requests": percentiles(self.batch_requests),
+                "batch_tokens": percentiles(self.batch_tokens),
+                "latency_ms": {name: percentiles(samples) for name, samples in self.latency.items()},
+            }
+
+
+class MicroBatcher:
+    """Collects concurrent check requests into batches for one pipeline thread."""
+
+    def __init__(self, pipeline, metrics, window=0.01, max_batch=16, lexicon=None):
+        self.pipeline = pipeline
+        self.metrics = metrics
+        self.window = window
+        self.max_batch = max_batch
+        self.lexicon = lexicon
+        self._reloads = getattr(lexicon, "reloads", 0)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def submit(self, text):
+        """Queue a text; returns a Future of its list of result records."""
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)   # finish this batch, then stop
+                    break
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch):
+        reloads = getattr(self.lexicon, "reloads", 0)
+        if reloads != self._reloads:
+            # The paradigm files changed: cached results, analyzers and frequency scores may be stale
+            self.pipeline.checker.reload_lexicon()
+            self._reloads = reloads
+        started = time.perf_counter()
+        timings = {}
+        try:
+            results = self.pipeline.check_texts([text for text, _, _ in batch], timings)
+        except Exception as e:
+            for _, future, queued in batch:
+                future.set_exception(e)
+                self.metrics.record_request(started - queued, time.perf_counter() - queued, failed=True)
+            return
+        timings["batch"] = time.perf_counter() - started
+        self.metrics.record_batch(len(batch), sum(map(len, results)), timings)
+        for (_, future, queued), records in zip(batch, results):
+            future.set_result(records)
+            self.metrics.record_request(started - queued, time.perf_counter() - queued)
+
+
+def make_handler(batcher, metrics):
+    class CheckHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok"})
+            elif self.path == "/metrics":
+                snapshot = metrics.snapshot()
+                snapshot["queue_depth"] = batcher.queue_depth()
+                snapshot["check_cache"] = batcher.pipeline.checker.cache.summary()
+                snapshot["tag_cache"] = {view.tagger: {"hits": view.hits, "misses": view.misses}
+                                         for view in batcher.pipeline.tag_caches}
+                if batcher.lexicon is not None:
+                    snapshot["lexicon_reloads"] = batcher.lexicon.reloads
+                self._reply(200, snapshot)
+            else:
+                self._reply(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/check":
+                self._reply(404, {"error": f"unknown path {self.path}"})
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8")
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                try:
+                    body = json.loads(body)["text"]
+                except (ValueError, KeyError, TypeError):
+                    self._reply(400, {"error": 'expected a JSON object {"text": ...}'})
+                    return
+            try:
+                records = batcher.submit(body).result()
+            except Exception as e:
+                self._reply(500, {"error": str(e)})
+                return
+            self._reply(200, {"tokens": records})
+
+        def address_string(self):
+            # Unix socket clients have no (host, port) address
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    return CheckHandler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        socketserver.UnixStreamServer.server_bind(self)
+        # BaseHTTPRequestHandler reads these from HTTPServer
+        self.server_name = socket.gethostname()
+        self.server_port = 0
+
+
+def create_server(handler, host="127.0.0.1", port=8765, socket_path=None):
+    if socket_path:
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running spell-check server (models and lexicon loaded once)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--pos-model", default=os.path.join("pos_tag", "xlm-base-2"), help="POS Model folder path")
+    parser.add_argument("--chunk-model", default=os.path.join("chunk_tag", "checkpoint-18381"),
+                        help="Chunk Model folder path")
+    parser.add_argument("--lang", default="kn", help="Language code passed to the tokenizer")
+    parser.add_argument("--batch-window", type=float, default=10.0,
+                        help="Milliseconds to wait for more requests to join a batch")
+    parser.add_argument("--max-batch", type=int, default=16, help="Most requests per batch")
+    parser.add_argument("--model-batch-size", type=int, default=16,
+                        help="Sentences per padded forward pass of each model")
+    parser.add_argument("--watch", type=float, default=None, metavar="SECONDS",
+                        help="Reload edited paradigm files, polling at this interval")
+    parser.add_argument("--check-args", default="",
+                        help="check_pos options, e.g. \"--fuzzy-engine trie --cross-category\"")
+    parser.add_argument("--tag-cache", default=os.path.join(PROJECT_DIR, "tag_cache.sqlite"),
+                        help="SQLite cache of the POS and chunk labels of each sentence, keyed by model")
+    parser.add_argument("--no-tag-cache", action="store_true", help="Run the models on every sentence")
+    args = parser.parse_args()
+
+    use_project_dir()
+    check_options = check_pos.parse_args(shlex.split(args.check_args))
+    lexicon = None
+    if args.watch:
+        if check_options.workers > 1:
+            parser.error("--watch cannot be combined with check_pos --workers (forked workers keep the old lexicon)")
+        from lexicon_watch import WatchedLexicon
+        lexicon = WatchedLexicon(poll_interval=args.watch).start()
+    tag_cache = None
+    if not args.no_tag_cache:
+        from tag_cache import SentenceTagCache
+        tag_cache = SentenceTagCache(args.tag_cache)
+
+    pipeline = Pipeline(os.path.join(PROJECT_DIR, args.pos_model), os.path.join(PROJECT_DIR, args.chunk_model),
+                        args.lang, check_options, lexicon=lexicon, batch_size=args.model_batch_size,
+                        tag_cache=tag_cache)
+    metrics = ServerMetrics()
+    batcher = MicroBatcher(pipeline, metrics, window=args.batch_window / 1000, max_batch=args.max_batch,
+                           lexicon=lexicon)
+    server = create_server(make_handler(batcher, metrics), args.host, args.port, args.socket)
+    print(f"✅ Listening on {args.socket or f'http://{args.host}:{args.port}'} (POST /check, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.stop()
+        pipeline.close()
+        if tag_cache is not None:
+            tag_cache.close()
+        if lexicon is not None:
+            lexicon.stop()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
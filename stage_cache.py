@@ -0,0 +1,129 @@
+import os
+import json
+import hashlib
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ----------- Content-addressed stage cache -----------
+# Each pipeline stage's output is stored under
+#   sha256(stage, sha256(input), code version, model fingerprint, params)
+# The code version hashes the stage's source files (and label tables), and
+# the model fingerprint is the (path, size, mtime) manifest of the model
+# folder, so editing the code, retraining a model or changing the input
+# each invalidate exactly the stages they feed. A rerun takes every stage
+# it can from the cache and computes from the first invalidated one.
+# Entries are plain files; reading one refreshes its mtime, and the least
+# recently used ones are evicted beyond max_bytes.
+# ------------------------------------------------------
+
+DEFAULT_STAGE_CACHE_DIR = os.path.join(PROJECT_DIR, ".stage_cache")
+
+# Files whose content defines each stage's behaviour (relative to the project directory).
+# pipeline.py drives every stage in process (sentence splitting, batching,
+# glue between stages), so it is part of each one.
+STAGE_SOURCES = {
+    "tokenized": ["pipeline.py", "Token/tokenizer_for_indian_languages_on_files.py"],
+    "conll": ["pipeline.py", "pos_tag/create_conll.py"],
+    "pos": ["pipeline.py", "pos_tag/run_pos_new.py", "pos_tag/encoding_dict.pickle"],
+    "chunk": ["pipeline.py", "chunk_tag/generate_features.py", "chunk_tag/chunk_encoding_dict.pickle"],
+    "ssf": ["pipeline.py", "chunk_tag/read_feature_files_and_convert_into_ssf.py"],
+}
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def code_version(stage):
+    """Hash of the stage's source files."""
+    digest = hashlib.sha256()
+    for relative in STAGE_SOURCES[stage]:
+        path = os.path.join(PROJECT_DIR, relative)
+        digest.update(relative.encode("utf-8") + b"\0")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def model_fingerprint(model_dir):
+    """Short hash of a model folder's (relative path, size, mtime_ns) manifest; weights are not read."""
+    if not model_dir or not os.path.exists(model_dir):
+        return f"missing:{model_dir}"
+    manifest = []
+    for root, dirs, files in os.walk(model_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            manifest.append([os.path.relpath(path, model_dir), st.st_size, st.st_mtime_ns])
+    return hashlib.sha1(json.dumps(manifest).encode("utf-8")).hexdigest()[:16]
+
+
+class StageCache:
+    """Directory of stage outputs keyed by content; LRU-evicted beyond max_bytes."""
+
+    def __init__(self, directory=DEFAULT_STAGE_CACHE_DIR, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(stage, input_text, model=None, params=None):
+        parts = [stage, sha256_text(input_text), code_version(stage), model or "", params or ""]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".out")
+
+    def get(self, key):
+        """Return the cached text for key (marking it recently used) or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+
+    def put(self, key, text):
+        """Store text atomically under key, then evict least recently used entries beyond max_bytes."""
+        fd, tmp_path = tempfile.mkstemp(prefix=".stage_", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+                out.write(text)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".out"):
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+
+    def summary(self):
+        return f"stage cache hits {self.hits}, misses {self.misses}"
@@ -0,0 +1,86 @@
+import os
+import json
+import sqlite3
+import threading
+
+from stage_cache import PROJECT_DIR, model_fingerprint
+
+
+# ----------- Sentence-level tagging cache -----------
+# A SQLite file mapping (tagger, model fingerprint, sentence) to the
+# labels the model predicted for the sentence's words. The sentence is
+# the exact string the tagger feeds its model, i.e. already normalized
+# by the tagger (words joined by single spaces, zero-width characters
+# removed), so a cached answer is the model's answer. Labels are stored
+# before the encoding-dict mapping. Taggers look up all sentences of a
+# run in bulk and only send the misses (deduplicated) to the model.
+# -----------------------------------------------------
+
+DEFAULT_TAG_CACHE_PATH = os.path.join(PROJECT_DIR, "tag_cache.sqlite")
+LOOKUP_CHUNK = 500  # SQLite variables per IN (...) query
+
+
+class SentenceTagCache:
+    """Persistent store of per-sentence model labels; one connection, usable from any thread."""
+
+    def __init__(self, path=DEFAULT_TAG_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS labels (tagger TEXT, model TEXT, sentence TEXT, "
+                             "labels TEXT, PRIMARY KEY (tagger, model, sentence)) WITHOUT ROWID")
+
+    def for_model(self, tagger, model_dir):
+        """Return a TagCacheView for one tagger ("pos" or "chunk") and the model in model_dir."""
+        return TagCacheView(self, tagger, model_fingerprint(model_dir))
+
+    def get_many(self, tagger, model, sentences):
+        """{sentence: labels} for the given sentences that are cached."""
+        found = {}
+        sentences = list(sentences)
+        with self._lock:
+            for start in range(0, len(sentences), LOOKUP_CHUNK):
+                chunk = sentences[start:start + LOOKUP_CHUNK]
+                rows = self._db.execute(
+                    f"SELECT sentence, labels FROM labels WHERE tagger = ? AND model = ? "
+                    f"AND sentence IN ({','.join('?' * len(chunk))})", [tagger, model, *chunk])
+                found.update((sentence, json.loads(labels)) for sentence, labels in rows)
+        return found
+
+    def put_many(self, tagger, model, labels_by_sentence):
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)",
+                                 [(tagger, model, sentence, json.dumps(labels))
+                                  for sentence, labels in labels_by_sentence.items()])
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class TagCacheView:
+    """The cache seen by one tagger and model, counting hits and misses."""
+
+    def __init__(self, cache, tagger, model):
+        self.cache = cache
+        self.tagger = tagger
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, sentences):
+        found = self.cache.get_many(self.tagger, self.model, sentences)
+        self.hits += len(found)
+        self.misses += len(sentences) - len(found)
+        return found
+
+    def put_many(self, labels_by_sentence):
+        self.cache.put_many(self.tagger, self.model, labels_by_sentence)
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = 100.0 * self.hits / lookups if lookups else 0.0
+        return f"{self.tagger} tag cache hits {self.hits}, misses {self.misses} ({rate:.1f}% hit rate)"
@@ -84,22 +84,15 @@ def tokenize(list_s):
     return tkns
 
 
-def read_file_and_tokenize(input_file, output_file, lang_type):
-    """Read file and tokenize."""
-    string_sentences = ''
-    file_read = open(input_file, 'r', encoding='utf-8')
-    text = file_read.read().strip().replace(u'0xff', '')
+def split_sentences(text, lang_type):
+    """Split raw text into sentences, each a list of tokens."""
+    text = text.strip().replace(u'0xff', '')
     if lang_type == 0:
         sentences = re.findall('.*?।|.*?\n', text + '\n', re.UNICODE)
-        endMarkers = ['?', '।', '!', '|']
-    elif lang_type == 1:
-        sentences = re.findall('.*?\n', text + '\n', re.UNICODE)
-        endMarkers = ['؟', '!', '|', '۔']
     else:
         sentences = re.findall('.*?\n', text + '\n', re.UNICODE)
-        endMarkers = ['?', '.', '!', '|']
-    count_sentence = 1
-    for index, sentence in enumerate(sentences):
+    tokenized = []
+    for sentence in sentences:
         if sentence.strip() != '':
             list_tokens = tokenize(sentence.split())
             end_sentence_markers = [index + 1 for index, token in enumerate(list_tokens) if token in [ '.', '۔', '؟', '।',  '|']]
@@ -109,23 +102,30 @@ def read_file_and_tokenize(input_file, output_file, lang_type):
                 end_sentence_markers_with_sentence_end_positions = [0] + end_sentence_markers
                 sentence_boundaries = list(zip(end_sentence_markers_with_sentence_end_positions, end_sentence_markers_with_sentence_end_positions[1:]))
                 for start, end in sentence_boundaries:
-                    individual_sentence = list_tokens[start: end]
-                    string_sentences += '<Sentence id=\'' + \
-                        str(count_sentence) + '\'>\n'
-                    mapped_tokens = list(map(lambda token_index: str(
-                        token_index[0] + 1) + '\t' + token_index[1].strip() + '\tunk', list(enumerate(individual_sentence))))
-                    string_sentences += '\n'.join(mapped_tokens) + \
-                        '\n</Sentence>\n\n'
-                    count_sentence += 1
+                    tokenized.append([token.strip() for token in list_tokens[start: end]])
             else:
-                string_sentences += '<Sentence id=\'' + \
-                        str(count_sentence) + '\'>\n'
-                mapped_tokens = list(map(lambda token_index: str(
-                    token_index[0] + 1) + '\t' + token_index[1].strip() + '\tunk', list(enumerate(list_tokens))))
-                string_sentences += '\n'.join(mapped_tokens) + \
-                    '\n</Sentence>\n\n'
-                count_sentence += 1
-        write_data_to_file(output_file, string_sentences)
+                tokenized.append([token.strip() for token in list_tokens])
+    return tokenized
+
+
+def format_sentences(sentences):
+    """Render tokenized sentences in the tokenizer's output format (one 'index, token, unk' line per token)."""
+    string_sentences = ''
+    for count_sentence, individual_sentence in enumerate(sentences, 1):
+        string_sentences += '<Sentence id=\'' + \
+            str(count_sentence) + '\'>\n'
+        mapped_tokens = list(map(lambda token_index: str(
+            token_index[0] + 1) + '\t' + token_index[1] + '\tunk', list(enumerate(individual_sentence))))
+        string_sentences += '\n'.join(mapped_tokens) + \
+            '\n</Sentence>\n\n'
+    return string_sentences
+
+
+def read_file_and_tokenize(input_file, output_file, lang_type):
+    """Read file and tokenize."""
+    with open(input_file, 'r', encoding='utf-8') as file_read:
+        text = file_read.read()
+    write_data_to_file(output_file, format_sentences(split_sentences(text, lang_type)))
 
 
 def write_data_to_file(output_file, data):
@@ -134,6 +134,18 @@ def write_data_to_file(output_file, data):
         file_write.write(data + '\n')
 
 
+def language_type(lang):
+    """Map a two digit ISO code to the sentence end marker type (0, 1 or 2)."""
+    if lang in ['hi', 'or', 'mn', 'as', 'bn', 'pa']:
+        return 0
+    elif lang == 'ur':
+        return 1
+    elif lang in ['en', 'gu', 'mr', 'ml', 'kn', 'te', 'ta']:
+        return 2
+    else:
+        return 0
+
+
 def main():
     """Pass arguments and call functions here."""
     parser = argparse.ArgumentParser()
@@ -146,14 +158,7 @@ def main():
     args = parser.parse_args()
     if os.path.isdir(args.inp) and not os.path.isdir(args.out):
         os.makedirs(args.out)
-    if args.lang in ['hi', 'or', 'mn', 'as', 'bn', 'pa']:
-        lang = 0
-    elif args.lang == 'ur':
-        lang = 1
-    elif args.lang in ['en', 'gu', 'mr', 'ml', 'kn', 'te', 'ta']:
-        lang = 2
-    else:
-        lang = 0
+    lang = language_type(args.lang)
     if os.path.isdir(args.inp):
         for root, dirs, files in os.walk(args.inp):
             for fl in files: